@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: MemoryManager intake throughput vs. shard count.
+
+Each worker thread repeatedly stores, reads and removes its own emails,
+the way concurrent webhook intake and analysis workers touch the store.
+
+    python scripts/benchmark_memory_manager.py --threads 8 --ops 20000
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.memory_manager import MemoryManager
+from cellophanemail.features.email_protection.sharded_memory_manager import ShardedMemoryManager
+
+
+def make_store(shards: int, capacity: int):
+    if shards == 1:
+        return MemoryManager(capacity=capacity)
+    return ShardedMemoryManager(shards=shards, capacity=capacity)
+
+
+def make_emails(worker: int, count: int):
+    return [
+        EphemeralEmail(
+            message_id=f"w{worker}-{i}",
+            from_address="sender@example.com",
+            to_addresses=["shield@cellophanemail.com"],
+            subject="Benchmark",
+            text_body="Body text " * 20,
+            user_email="user@example.com",
+        )
+        for i in range(count)
+    ]
+
+
+def run_threads(shards: int, threads: int, ops: int) -> float:
+    store = make_store(shards, capacity=threads * ops)
+    batches = [make_emails(worker, ops) for worker in range(threads)]
+    start_barrier = threading.Barrier(threads + 1)
+
+    def worker(emails):
+        loop = asyncio.new_event_loop()
+        start_barrier.wait()
+        for email in emails:
+            store.store_email(email)
+            store.get_email(email.message_id)
+            loop.run_until_complete(store.remove_email(email.message_id))
+        loop.close()
+
+    pool = [threading.Thread(target=worker, args=(batch,)) for batch in batches]
+    for thread in pool:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return threads * ops * 3 / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=20000, help="emails per thread")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.ops} emails (store + get + remove)")
+    print(f"{'shards':>6}  {'ops/s':>12}")
+    for shards in args.shards:
+        print(f"{shards:>6}  {run_threads(shards, args.threads, args.ops):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
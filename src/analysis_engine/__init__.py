@@ -15,9 +15,12 @@ from .scoring import (
 )
 from .analyzer import IAnalyzer
 from .prompts import (
+    ANALYSIS_INSTRUCTIONS,
+    ANALYSIS_CONTENT_TEMPLATE,
     ANALYSIS_PROMPT,
     REPHRASE_PROMPT,
     format_analysis_prompt,
+    format_analysis_content,
     format_rephrase_prompt,
 )
 from .rephraser import (
@@ -49,9 +52,12 @@ __all__ = [
     # Interface
     "IAnalyzer",
     # Prompts
+    "ANALYSIS_INSTRUCTIONS",
+    "ANALYSIS_CONTENT_TEMPLATE",
     "ANALYSIS_PROMPT",
     "REPHRASE_PROMPT",
     "format_analysis_prompt",
+    "format_analysis_content",
     "format_rephrase_prompt",
     # Rephraser
     "build_rephrase_context",
@@ -1,11 +1,9 @@
 # ABOUTME: LLM prompts for Four Horseman analysis
 # ABOUTME: Identical prompts ensure consistent analysis across platforms
 
-ANALYSIS_PROMPT = """Analyze this content for the Four Horsemen of toxic communication.
-
-CONTENT TO ANALYZE:
-From: {sender}
-Content: {content}
+# Static instruction block. It comes first and never varies, so backends can
+# cache it as a prompt prefix (Anthropic prompt caching, llama.cpp KV reuse).
+ANALYSIS_INSTRUCTIONS = """Analyze the content below for the Four Horsemen of toxic communication.
 
 FOUR HORSEMEN DETECTION:
 Detect each pattern with confidence (0.0-1.0) and severity (low/medium/high).
@@ -28,18 +26,29 @@ CONTEMPT is the MOST DESTRUCTIVE pattern - weight it heavily (Gottman research).
    - Refusing to participate in discussion
 
 RESPOND WITH VALID JSON ONLY:
-{{
+{
     "horsemen_detected": [
-        {{
+        {
             "horseman": "criticism|contempt|defensiveness|stonewalling",
             "confidence": 0.0,
             "severity": "low|medium|high",
             "indicators": ["specific phrase or pattern"]
-        }}
+        }
     ],
     "safe": true,
     "reasoning": "Detailed explanation of analysis"
-}}"""
+}"""
+
+# Per-message part, appended after the instructions
+ANALYSIS_CONTENT_TEMPLATE = """CONTENT TO ANALYZE:
+From: {sender}
+Content: {content}"""
+
+ANALYSIS_PROMPT = (
+    ANALYSIS_INSTRUCTIONS.replace("{", "{{").replace("}", "}}")
+    + "\n\n"
+    + ANALYSIS_CONTENT_TEMPLATE
+)
 
 
 REPHRASE_PROMPT = """You are a communication expert who helps people express themselves constructively.
@@ -73,6 +82,11 @@ def format_analysis_prompt(content: str, sender: str = "") -> str:
     return ANALYSIS_PROMPT.format(content=content, sender=sender or "unknown")
 
 
+def format_analysis_content(content: str, sender: str = "") -> str:
+    """Format only the per-message part, for backends that send ANALYSIS_INSTRUCTIONS separately."""
+    return ANALYSIS_CONTENT_TEMPLATE.format(content=content, sender=sender or "unknown")
+
+
 def format_rephrase_prompt(
     content: str,
     detected_patterns: str,
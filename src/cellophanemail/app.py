@@ -23,6 +23,12 @@ from .providers.postmark.webhook import PostmarkWebhookHandler
 from .providers.gmail.webhook import GmailWebhookHandler
 from .features.email_protection.memory_manager_singleton import get_memory_manager
 from .features.email_protection.background_cleanup import BackgroundCleanupService
+from .features.email_protection.analyzer_executor import shutdown_analyzer_executor
+from .features.email_protection.analyzer_registry import get_analyzer_registry, provide_analyzer
+from .features.email_protection.llama_worker_pool import shutdown_llama_worker_pool
+from .core.email_delivery.batch_queue import close_batch_queues
+from .core.email_delivery.http_client import close_http_client
+from .features.privacy_integration.privacy_webhook_orchestrator import shutdown_orchestrators
 
 logger = logging.getLogger(__name__)
 
@@ -80,10 +86,18 @@ async def lifespan(app: Litestar):
         grace_period_minutes=1
     )
     
-    # Start scheduled cleanup every 60 seconds
-    await _cleanup_service.start_scheduled_cleanup(interval_seconds=60)
+    # Expiry is indexed, so a cleanup pass only touches expired emails and
+    # can run every second
+    await _cleanup_service.start_scheduled_cleanup(interval_seconds=1)
     
-    logger.info("Background cleanup service started (60s intervals, 1min grace period)")
+    logger.info("Background cleanup service started (1s intervals, 1min grace period)")
+    
+    # Build and warm the shared analyzer so no request pays model/client setup
+    try:
+        analyzer = await get_analyzer_registry().warm_up()
+        logger.info(f"Analyzer registry warmed up ({type(analyzer).__name__})")
+    except Exception as e:
+        logger.error(f"Analyzer warm-up failed, analyzers will be built on first use: {e}")
     
     yield  # Application runs here
     
@@ -93,6 +107,19 @@ async def lifespan(app: Litestar):
     if _cleanup_service:
         await _cleanup_service.stop_scheduled_cleanup()
         logger.info("Background cleanup service stopped")
+    
+    # Finish queued emails, then send pending delivery batches while the
+    # analyzers and the pooled HTTP client are still available
+    await shutdown_orchestrators()
+    await close_batch_queues()
+    
+    # Release shared analyzers and their worker threads
+    get_analyzer_registry().clear()
+    shutdown_llama_worker_pool()
+    shutdown_analyzer_executor(wait=False)
+    
+    # Close pooled delivery connections
+    await close_http_client()
 
 
 @get("/favicon.ico")
@@ -187,6 +214,7 @@ def create_app() -> Litestar:
         dependencies={
             "plugin_manager": Provide(lambda: plugin_manager, sync_to_thread=False),
             "settings": Provide(lambda: settings, sync_to_thread=False),
+            "analyzer": Provide(provide_analyzer, sync_to_thread=False),
         },
         debug=settings.debug,
         pdb_on_exception=settings.debug if not settings.testing else False,  # Disable pdb during tests
@@ -89,6 +89,9 @@ class Settings(BaseSettings):
     postmark_from_email: str = Field(default="", description="Default from email for Postmark")
     postmark_from_address: str = Field(default="", description="Default from address for Postmark (alias for from_email)")
     postmark_dry_run: bool = Field(default=False, description="Enable Postmark dry-run mode")
+    postmark_batch_delivery: bool = Field(default=True, description="Coalesce outbound Postmark sends into /email/batch calls")
+    postmark_batch_window_ms: int = Field(default=50, description="Max time a message waits for a Postmark batch to fill")
+    postmark_batch_max_size: int = Field(default=500, description="Max messages per Postmark batch call (API limit 500)")
     
     # Plugin settings
     enabled_plugins: str = Field(
@@ -0,0 +1,162 @@
+"""Coalescing delivery queue for senders with a batch API.
+
+Messages submitted within a short window (or until the batch is full) are
+flushed together in one ``send_batch`` call. Each caller awaits its own
+result; entries that fail are re-queued on their own, so one bad recipient
+never causes the rest of the batch to be re-sent.
+"""
+
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Every live queue, so the application lifespan can flush them on shutdown
+_queues: "weakref.WeakSet[BatchDeliveryQueue]" = weakref.WeakSet()
+
+
+@dataclass
+class BatchDeliveryOutcome:
+    """Final result of a message submitted to the batch queue."""
+    success: bool
+    attempts: int
+    error_message: Optional[str] = None
+    message_id: Optional[str] = None
+
+
+class BatchDeliveryQueue:
+    """
+    Buffers outbound messages and flushes them through ``sender.send_batch``.
+
+    A flush happens when ``max_batch_size`` messages are pending or
+    ``window_ms`` after the first message of a batch arrived, whichever
+    comes first.
+    """
+
+    def __init__(self, sender, max_batch_size: int = 500, window_ms: int = 50, max_retries: int = 3):
+        """
+        Args:
+            sender: Email sender exposing ``async send_batch(messages)``
+            max_batch_size: Messages per batch call (Postmark allows 500)
+            window_ms: How long the first message of a batch waits for company
+            max_retries: Delivery attempts per message
+        """
+        self.sender = sender
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_seconds = max(0, window_ms) / 1000
+        self.max_retries = max(1, max_retries)
+
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks = set()
+        self._stats = {"batches_sent": 0, "messages_sent": 0, "messages_failed": 0, "retries": 0}
+        self.closed = False
+        _queues.add(self)
+
+    async def submit(self, to_address: str, subject: str, content: str, headers: Dict[str, str]) -> BatchDeliveryOutcome:
+        """
+        Queue a message and wait until it is delivered or out of retries.
+
+        Failed entries go back through the queue (and coalesce with other
+        retries) after the same exponential backoff as single sends.
+        """
+        if self.closed:
+            raise RuntimeError("Batch delivery queue is closed")
+        message = {"to_address": to_address, "subject": subject, "content": content, "headers": headers}
+        error_message = None
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                result = await self._enqueue(message)
+            except Exception as e:
+                # Transport failure for the whole batch: retry this entry
+                error_message, retryable = str(e), True
+            else:
+                if result.success:
+                    return BatchDeliveryOutcome(True, attempt, message_id=result.message_id)
+                error_message = result.message or "Batch delivery failed"
+                retryable = result.retryable
+
+            if not retryable or attempt == self.max_retries:
+                return BatchDeliveryOutcome(False, attempt, error_message=error_message)
+
+            self._stats["retries"] += 1
+            await asyncio.sleep(0.1 * (2 ** attempt))  # 0.2s, 0.4s, 0.8s
+
+        return BatchDeliveryOutcome(False, self.max_retries, error_message=error_message)
+
+    def _enqueue(self, message: Dict[str, Any]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._schedule_flush)
+        return future
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        messages = [message for message, _ in batch]
+        try:
+            results = await self.sender.send_batch(messages)
+        except Exception as e:
+            logger.error(f"Batch send of {len(batch)} messages failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._stats["batches_sent"] += 1
+        for (_, future), result in zip(batch, results):
+            self._stats["messages_sent" if result.success else "messages_failed"] += 1
+            if not future.done():
+                future.set_result(result)
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_exception(RuntimeError("No result returned for batch entry"))
+        logger.debug(f"Flushed batch of {len(batch)} messages")
+
+    async def flush(self) -> None:
+        """Send everything pending now and wait for in-flight batches (used on shutdown)."""
+        self._schedule_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*list(self._flush_tasks), return_exceptions=True)
+
+    async def close(self) -> None:
+        """Refuse new messages and deliver everything already queued."""
+        self.closed = True
+        await self.flush()
+        _queues.discard(self)
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = dict(self._stats)
+        stats["pending"] = len(self._pending)
+        return stats
+
+
+async def close_batch_queues() -> int:
+    """Flush and close every batch queue (called from the application lifespan)."""
+    queues = list(_queues)
+    for queue in queues:
+        try:
+            await queue.close()
+        except Exception as e:
+            logger.error(f"Flushing batch delivery queue failed: {e}")
+    if queues:
+        logger.info(f"Flushed {len(queues)} batch delivery queue(s)")
+    return len(queues)
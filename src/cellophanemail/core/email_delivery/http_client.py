@@ -0,0 +1,83 @@
+"""Shared, pooled HTTP client for API-based email senders.
+
+Creating an httpx.AsyncClient per message costs a TCP + TLS handshake on
+every send. One long-lived client per event loop keeps connections alive
+(HTTP/2 when the h2 package is installed) and is closed from the Litestar
+lifespan on shutdown.
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from typing import Optional
+
+import httpx
+
+# Optional HTTP/2 support with graceful degradation
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# httpx clients are bound to the loop they first run on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name}, using default {default}")
+        return default
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build a pooled client from environment configuration.
+
+    DELIVERY_HTTP_MAX_CONNECTIONS, DELIVERY_HTTP_MAX_KEEPALIVE,
+    DELIVERY_HTTP_KEEPALIVE_EXPIRY, DELIVERY_HTTP_TIMEOUT_SECONDS and
+    DELIVERY_HTTP_CONNECT_TIMEOUT_SECONDS tune the pool; DELIVERY_HTTP2=false
+    forces HTTP/1.1.
+    """
+    limits = httpx.Limits(
+        max_connections=_env_number("DELIVERY_HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_number("DELIVERY_HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=_env_number("DELIVERY_HTTP_KEEPALIVE_EXPIRY", 30.0, float),
+    )
+    timeout = httpx.Timeout(
+        _env_number("DELIVERY_HTTP_TIMEOUT_SECONDS", 10.0, float),
+        connect=_env_number("DELIVERY_HTTP_CONNECT_TIMEOUT_SECONDS", 5.0, float),
+    )
+
+    http2 = os.getenv("DELIVERY_HTTP2", "true").lower() not in ("false", "0", "no")
+    if http2 and not HTTP2_AVAILABLE:
+        logger.info("h2 not installed, delivery client using HTTP/1.1 keep-alive")
+        http2 = False
+
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the pooled client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_http_client()
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's client (called from the application lifespan)."""
+    loop = asyncio.get_running_loop()
+    client: Optional[httpx.AsyncClient] = _clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Delivery HTTP client closed")
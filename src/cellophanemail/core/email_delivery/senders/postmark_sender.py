@@ -1,15 +1,43 @@
 """Postmark API-based email sender implementation."""
 
 import httpx
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
 from ..base import BaseEmailSender
+from ..http_client import get_http_client
+
+# Postmark accepts at most 500 messages per /email/batch call
+MAX_BATCH_SIZE = 500
+
+# Postmark error codes that will fail again if retried unchanged
+# (300 invalid email request, 406 inactive recipient)
+NON_RETRYABLE_ERROR_CODES = frozenset({300, 406})
+
+
+@dataclass
+class BatchSendResult:
+    """Outcome of one message within a Postmark batch call."""
+    success: bool
+    error_code: int = 0
+    message: str = ""
+    message_id: Optional[str] = None
+
+    @property
+    def retryable(self) -> bool:
+        return not self.success and self.error_code not in NON_RETRYABLE_ERROR_CODES
 
 
 class PostmarkEmailSender(BaseEmailSender):
     """Postmark API-based email sender using REST API calls."""
     
-    def __init__(self, config: Dict[str, Any]):
-        """Initialize Postmark sender with configuration."""
+    def __init__(self, config: Dict[str, Any], http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize Postmark sender with configuration.
+        
+        Args:
+            config: Sender configuration
+            http_client: Optional client to use instead of the shared pooled client
+        """
         super().__init__(
             service_domain=config['SMTP_DOMAIN'],
             username=config['EMAIL_USERNAME']
@@ -19,6 +47,36 @@ class PostmarkEmailSender(BaseEmailSender):
         self.api_token = config['POSTMARK_API_TOKEN']
         self.from_email = config.get('POSTMARK_FROM_EMAIL', f'noreply@{self.service_domain}')
         self.api_url = 'https://api.postmarkapp.com/email'
+        self.batch_api_url = 'https://api.postmarkapp.com/email/batch'
+        self._http_client = http_client
+
+    def _build_payload(self, to_address: str, subject: str, content: str, headers: Dict[str, str]) -> Dict[str, Any]:
+        """Build the Postmark message payload shared by single and batch sends."""
+        payload = {
+            "From": headers.get('From', self.from_email),
+            "To": to_address,
+            "Subject": subject,
+            "TextBody": content
+        }
+
+        # Add optional headers if present
+        if headers.get('Message-ID'):
+            payload['MessageID'] = headers['Message-ID']
+        if headers.get('In-Reply-To'):
+            payload['InReplyTo'] = headers['In-Reply-To']
+        if headers.get('References'):
+            payload['References'] = headers['References']
+        if headers.get('Reply-To'):
+            payload['ReplyTo'] = headers['Reply-To']
+
+        return payload
+
+    def _request_headers(self) -> Dict[str, str]:
+        return {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'X-Postmark-Server-Token': self.api_token
+        }
     
     async def send_email(self, to_address: str, subject: str, content: str, headers: Dict[str, str]) -> bool:
         """
@@ -36,49 +94,79 @@ class PostmarkEmailSender(BaseEmailSender):
             bool: True if email sent successfully, False otherwise
         """
         try:
-            # Build Postmark API payload
-            payload = {
-                "From": headers.get('From', self.from_email),
-                "To": to_address,
-                "Subject": subject,
-                "TextBody": content
-            }
-            
-            # Add optional headers if present
-            if headers.get('Message-ID'):
-                payload['MessageID'] = headers['Message-ID']
-            if headers.get('In-Reply-To'):
-                payload['InReplyTo'] = headers['In-Reply-To']
-            if headers.get('References'):
-                payload['References'] = headers['References']
-            if headers.get('Reply-To'):
-                payload['ReplyTo'] = headers['Reply-To']
+            payload = self._build_payload(to_address, subject, content, headers)
             
-            # Prepare request headers
-            request_headers = {
-                'Accept': 'application/json',
-                'Content-Type': 'application/json',
-                'X-Postmark-Server-Token': self.api_token
-            }
+            # Send API request over the pooled keep-alive connection
+            client = self._http_client or get_http_client()
+            response = await client.post(
+                self.api_url,
+                json=payload,
+                headers=self._request_headers()
+            )
             
-            # Send API request
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    json=payload,
-                    headers=request_headers
-                )
-                
-                if response.status_code == 200:
-                    # Log success (basic logging for now)
-                    print(f"✅ Postmark email sent successfully to {to_address}")
-                    return True
-                else:
-                    # Log API error
-                    print(f"❌ Postmark API error {response.status_code}: {response.text}")
-                    return False
+            if response.status_code == 200:
+                # Log success (basic logging for now)
+                print(f"✅ Postmark email sent successfully to {to_address}")
+                return True
+            else:
+                # Log API error
+                print(f"❌ Postmark API error {response.status_code}: {response.text}")
+                return False
                     
         except Exception as e:
             # Log error but don't crash (matching SMTP error handling)
             print(f"❌ Postmark sending failed: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[BatchSendResult]:
+        """
+        Send up to MAX_BATCH_SIZE messages in one /email/batch call.
+        
+        Args:
+            messages: Dicts with to_address, subject, content and headers keys
+            
+        Returns:
+            One BatchSendResult per message, in the same order
+        """
+        if not messages:
+            return []
+        if len(messages) > MAX_BATCH_SIZE:
+            raise ValueError(f"Postmark batch limit is {MAX_BATCH_SIZE} messages, got {len(messages)}")
+
+        payload = [
+            self._build_payload(m['to_address'], m['subject'], m['content'], m.get('headers') or {})
+            for m in messages
+        ]
+
+        try:
+            client = self._http_client or get_http_client()
+            response = await client.post(
+                self.batch_api_url,
+                json=payload,
+                headers=self._request_headers()
+            )
+        except Exception as e:
+            print(f"❌ Postmark batch sending failed: {e}")
+            return [BatchSendResult(success=False, message=str(e)) for _ in messages]
+
+        if response.status_code != 200:
+            # Whole-call rejection (auth, malformed request): every entry failed the same way
+            print(f"❌ Postmark batch API error {response.status_code}: {response.text}")
+            error = f"Postmark API error {response.status_code}"
+            return [BatchSendResult(success=False, message=error) for _ in messages]
+
+        entries = response.json()
+        results = []
+        for index in range(len(messages)):
+            entry = entries[index] if index < len(entries) else {}
+            error_code = int(entry.get('ErrorCode', -1))
+            results.append(BatchSendResult(
+                success=error_code == 0,
+                error_code=error_code,
+                message=entry.get('Message', 'Missing batch response entry'),
+                message_id=entry.get('MessageID')
+            ))
+
+        sent = sum(r.success for r in results)
+        print(f"✅ Postmark batch sent {sent}/{len(messages)} emails")
+        return results
@@ -48,7 +48,17 @@ class ProcessingStrategyManager:
         try:
             logger.info(f"Processing email {webhook_payload.MessageID} through privacy pipeline")
             
-            response_data = await self.orchestrator.process_webhook(webhook_payload)
+            response_data = await self.orchestrator.process_webhook(
+                webhook_payload,
+                organization_id=user_context.get("organization")
+            )
+            
+            # Deferred under back-pressure: 429 so the provider retries later
+            if response_data.get("status") == "deferred":
+                return ProcessingResult(
+                    status_code=429,
+                    response_data=response_data
+                )
             
             # Privacy pipeline returns 202 Accepted for async processing
             return ProcessingResult(
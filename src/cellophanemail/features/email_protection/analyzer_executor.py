@@ -0,0 +1,87 @@
+"""
+Bounded executor for running blocking analyzer calls off the event loop.
+
+Synchronous analyzers (Anthropic sync client, local Llama inference) would
+otherwise freeze the whole event loop for the duration of an LLM call.
+The pool is bounded so a burst of webhooks cannot spawn unlimited threads.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _configured_max_workers() -> int:
+    """Read pool size from ANALYZER_MAX_WORKERS, falling back to the default."""
+    try:
+        workers = int(os.getenv("ANALYZER_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+    except ValueError:
+        logger.warning("Invalid ANALYZER_MAX_WORKERS, using default")
+        workers = DEFAULT_MAX_WORKERS
+    return max(1, workers)
+
+
+def get_analyzer_executor() -> ThreadPoolExecutor:
+    """Get the process-wide analyzer executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = _configured_max_workers()
+                _executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="analyzer",
+                )
+                logger.info(f"Created analyzer executor with {max_workers} workers")
+    return _executor
+
+
+async def run_in_analyzer_executor(
+    func: Callable[..., T],
+    *args: Any,
+    executor: Optional[ThreadPoolExecutor] = None,
+    **kwargs: Any,
+) -> T:
+    """
+    Run a blocking analyzer call in a bounded worker thread.
+
+    Like asyncio.to_thread, the caller's context variables (e.g. the
+    analysis recipient) are visible to func.
+
+    Args:
+        func: Blocking callable to run
+        *args: Positional arguments for func
+        executor: Optional executor to use instead of the shared pool
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Result of func
+    """
+    loop = asyncio.get_running_loop()
+    pool = executor or get_analyzer_executor()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(pool, functools.partial(context.run, func, *args, **kwargs))
+
+
+def shutdown_analyzer_executor(wait: bool = True) -> None:
+    """Shut down the shared executor (called from the application lifespan)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+            logger.info("Analyzer executor shut down")
@@ -19,6 +19,14 @@ class AnalyzerFactory:
     - TESTING=true → MockAnalyzer (no API calls)
     - PRIVACY_MODE=true → LlamaAnalyzer (local model)  
     - Default → EmailToxicityAnalyzer (Anthropic API)
+    
+    LLM-backed analyzers are wrapped in PrefilteredAnalyzer (unless
+    ANALYSIS_PREFILTER_ENABLED=false) around CachingAnalyzer (unless
+    ANALYSIS_CACHE_ENABLED=false) around MicroBatchingAnalyzer for
+    analyzers with a batch prompt (unless ANALYSIS_MICROBATCH_ENABLED=false).
+    
+    Request handlers should not call this directly; use the shared instance
+    from analyzer_registry.get_analyzer_registry().
     """
     
     @staticmethod
@@ -35,7 +43,9 @@ class AnalyzerFactory:
         """
         # Use explicit type if provided
         if analyzer_type:
-            return AnalyzerFactory._create_by_type(analyzer_type, temperature)
+            return AnalyzerFactory._with_cache(
+                AnalyzerFactory._create_by_type(analyzer_type, temperature)
+            )
             
         # Auto-detect based on environment
         if os.getenv("TESTING", "").lower() in ("true", "1", "yes"):
@@ -44,11 +54,37 @@ class AnalyzerFactory:
             
         if os.getenv("PRIVACY_MODE", "").lower() in ("true", "1", "yes"):
             logger.info("Creating LlamaAnalyzer for privacy mode")
-            return AnalyzerFactory._create_llama_analyzer(temperature)
+            return AnalyzerFactory._with_cache(AnalyzerFactory._create_llama_analyzer(temperature))
             
         # Default to Anthropic
         logger.info("Creating EmailToxicityAnalyzer for production")
-        return AnalyzerFactory._create_anthropic_analyzer(temperature)
+        return AnalyzerFactory._with_cache(AnalyzerFactory._create_anthropic_analyzer(temperature))
+    
+    @staticmethod
+    def _with_cache(analyzer: IEmailAnalyzer) -> IEmailAnalyzer:
+        """Wrap LLM-backed analyzers in the pre-filter, shared analysis cache and micro-batcher."""
+        from .mock_analyzer import MockAnalyzer
+        
+        # Mocks are free and tests rely on every call reaching them
+        if isinstance(analyzer, MockAnalyzer):
+            return analyzer
+        
+        # Innermost: pack concurrent short messages into shared prompts
+        if hasattr(analyzer, "analyze_batch_async") and \
+                os.getenv("ANALYSIS_MICROBATCH_ENABLED", "true").lower() not in ("false", "0", "no"):
+            from .batching_analyzer import create_micro_batching_analyzer
+            analyzer = create_micro_batching_analyzer(analyzer)
+        
+        if os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() not in ("false", "0", "no"):
+            from .caching_analyzer import CachingAnalyzer
+            analyzer = CachingAnalyzer(analyzer)
+        
+        # Pre-filter sits outside the cache so cleared messages never touch it
+        if os.getenv("ANALYSIS_PREFILTER_ENABLED", "true").lower() not in ("false", "0", "no"):
+            from .prefilter import PrefilteredAnalyzer
+            analyzer = PrefilteredAnalyzer(analyzer)
+        
+        return analyzer
     
     @staticmethod
     def _create_by_type(analyzer_type: str, temperature: float) -> IEmailAnalyzer:
@@ -73,9 +109,29 @@ class AnalyzerFactory:
     @staticmethod 
     def _create_llama_analyzer(temperature: float) -> IEmailAnalyzer:
         """Create Llama analyzer for privacy mode."""
+        # Separate worker processes (LLAMA_WORKERS) scale across cores
+        if os.getenv("LLAMA_WORKERS"):
+            from .llama_email_analyzer import LlamaEmailAnalyzer
+            from .llama_worker_pool import get_llama_worker_pool
+            pool = get_llama_worker_pool()
+            pool.start()
+            return LlamaEmailAnalyzer(pool)
+        
         try:
             from .llama_analyzer import LlamaAnalyzer
-            return LlamaAnalyzer(temperature=temperature)
+            from .llama_email_analyzer import LlamaEmailAnalyzer
+            from .analyzer_registry import AnalyzerPool, configured_pool_size
+            
+            def load() -> IEmailAnalyzer:
+                model = LlamaAnalyzer(model_path=os.getenv("LLAMA_MODEL_PATH") or None, temperature=temperature)
+                return LlamaEmailAnalyzer(model)
+            
+            # One model instance per concurrent generation (LLAMA_POOL_SIZE)
+            pool_size = configured_pool_size()
+            if pool_size == 1:
+                return load()
+            logger.info(f"Loading {pool_size} Llama model instances")
+            return AnalyzerPool([load() for _ in range(pool_size)])
         except ImportError as e:
             logger.error(f"LlamaAnalyzer not available: {e}")
             logger.warning("Falling back to MockAnalyzer")
@@ -4,9 +4,33 @@ Allows dependency injection and easy testing.
 """
 
 from abc import ABC, abstractmethod
-from typing import Protocol
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Protocol
 from dataclasses import dataclass
 from .models import ThreatLevel, HorsemanDetection
+from .analyzer_executor import run_in_analyzer_executor
+
+
+# User the current analysis is done for. Decorators that share state across
+# messages (near-duplicate cache, micro-batching) scope it by this, so one
+# user's mail never shapes another user's result.
+_analysis_recipient: ContextVar[Optional[str]] = ContextVar("analysis_recipient", default=None)
+
+
+def current_analysis_recipient() -> Optional[str]:
+    """Recipient set by the enclosing analysis_recipient() block, if any."""
+    return _analysis_recipient.get()
+
+
+@contextmanager
+def analysis_recipient(recipient: Optional[str]) -> Iterator[None]:
+    """Mark analyzer calls made inside the block as done for ``recipient``."""
+    token = _analysis_recipient.set(recipient.lower().strip() if recipient else None)
+    try:
+        yield
+    finally:
+        _analysis_recipient.reset(token)
 
 
 class IEmailAnalyzer(ABC):
@@ -29,6 +53,24 @@ class IEmailAnalyzer(ABC):
         """
         pass
     
+    async def analyze_email_toxicity_async(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        """
+        Analyze email for toxicity without blocking the event loop.
+        
+        Default implementation runs analyze_email_toxicity in the bounded
+        analyzer executor. Analyzers with a native async client override this.
+        
+        Args:
+            email_content: Full email content including subject and body
+            sender_email: Email address of sender
+            
+        Returns:
+            EmailAnalysis with toxicity assessment
+        """
+        return await run_in_analyzer_executor(
+            self.analyze_email_toxicity, email_content, sender_email
+        )
+    
     @abstractmethod
     def analyze_fact_presentation(self, fact_text: str, full_email_content: str, sender_email: str) -> str:
         """
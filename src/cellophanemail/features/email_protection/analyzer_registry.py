@@ -0,0 +1,192 @@
+"""
+Process-wide analyzer registry shared by routes, services and workers.
+
+Building an analyzer is expensive: the Anthropic analyzer creates an HTTP
+client and LlamaAnalyzer loads a multi-GB GGUF model. The registry builds
+each analyzer once, warms it up from the application lifespan, and hands
+the same instance to every request through Litestar dependency injection.
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from .analyzer_factory import AnalyzerFactory
+from .analyzer_interface import IEmailAnalyzer
+from .analyzer_executor import run_in_analyzer_executor
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_CONTENT = "Thanks, see you at the meeting tomorrow."
+WARM_UP_SENDER = "warm-up@localhost"
+
+
+class AnalyzerPool(IEmailAnalyzer):
+    """
+    Fixed set of analyzer instances leased one call at a time.
+
+    A llama.cpp model cannot run two generations at once, so concurrent
+    callers each lease an idle instance. Async calls run on the pool's own
+    executor with one thread per instance, so a lease never waits inside a
+    thread of the shared analyzer executor; excess callers queue for a
+    thread instead of tying one up.
+    """
+
+    def __init__(self, analyzers: List):
+        if not analyzers:
+            raise ValueError("AnalyzerPool needs at least one analyzer")
+        self.analyzers = list(analyzers)
+        self._idle: "queue.Queue" = queue.Queue()
+        for analyzer in self.analyzers:
+            self._idle.put(analyzer)
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.analyzers),
+            thread_name_prefix="analyzer-pool",
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.analyzers)
+
+    @contextmanager
+    def lease(self):
+        """Borrow an idle instance for the duration of one call."""
+        analyzer = self._idle.get()
+        try:
+            yield analyzer
+        finally:
+            self._idle.put(analyzer)
+
+    def _call(self, method: str, *args, **kwargs):
+        with self.lease() as analyzer:
+            return getattr(analyzer, method)(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name in ("analyzers", "_idle", "_executor"):
+            raise AttributeError(name)
+        attribute = getattr(self.analyzers[0], name)
+        if not callable(attribute):
+            return attribute
+        return lambda *args, **kwargs: self._call(name, *args, **kwargs)
+
+    def analyze_email_toxicity(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        return self._call("analyze_email_toxicity", email_content, sender_email)
+
+    async def analyze_email_toxicity_async(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        return await run_in_analyzer_executor(
+            self._call, "analyze_email_toxicity", email_content, sender_email,
+            executor=self._executor,
+        )
+
+    def analyze_fact_presentation(self, fact_text: str, full_email_content: str, sender_email: str) -> str:
+        return self._call("analyze_fact_presentation", fact_text, full_email_content, sender_email)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pool's executor threads."""
+        self._executor.shutdown(wait=wait)
+
+
+class AnalyzerRegistry:
+    """Lazily built, shared analyzers keyed by temperature."""
+
+    def __init__(self, factory: Optional[Callable[[float], IEmailAnalyzer]] = None):
+        """
+        Args:
+            factory: Builds an analyzer for a temperature (defaults to AnalyzerFactory)
+        """
+        self._factory = factory or (lambda temperature: AnalyzerFactory.create_analyzer(temperature=temperature))
+        self._analyzers: Dict[float, IEmailAnalyzer] = {}
+        self._lock = threading.Lock()
+
+    def get(self, temperature: float = 0.0) -> IEmailAnalyzer:
+        """Get the shared analyzer for a temperature, building it on first use."""
+        analyzer = self._analyzers.get(temperature)
+        if analyzer is None:
+            with self._lock:
+                analyzer = self._analyzers.get(temperature)
+                if analyzer is None:
+                    analyzer = self._factory(temperature)
+                    self._analyzers[temperature] = analyzer
+                    logger.info(f"Registered shared {type(analyzer).__name__} (temperature={temperature})")
+        return analyzer
+
+    async def warm_up(self, temperature: float = 0.0) -> IEmailAnalyzer:
+        """
+        Build the default analyzer at startup instead of on the first request.
+
+        Model construction runs in a worker thread. Local pooled models also
+        run one short inference per instance through the same
+        analyze_email_toxicity path requests use; API-backed analyzers are
+        only constructed, so warm-up never spends API tokens.
+        """
+        analyzer = await asyncio.to_thread(self.get, temperature)
+
+        pool = _find_pool(analyzer)
+        if pool is not None:
+            for instance in pool.analyzers:
+                try:
+                    await run_in_analyzer_executor(
+                        instance.analyze_email_toxicity, WARM_UP_CONTENT, WARM_UP_SENDER
+                    )
+                except Exception as e:
+                    logger.warning(f"Analyzer warm-up inference failed: {e}")
+        return analyzer
+
+    def clear(self) -> int:
+        """Drop all shared analyzers (called from the application lifespan)."""
+        with self._lock:
+            analyzers = list(self._analyzers.values())
+            self._analyzers.clear()
+        for analyzer in analyzers:
+            pool = _find_pool(analyzer)
+            if pool is not None:
+                pool.shutdown(wait=False)
+        return len(analyzers)
+
+    def __len__(self) -> int:
+        return len(self._analyzers)
+
+
+def _find_pool(analyzer) -> Optional[AnalyzerPool]:
+    """Unwrap cache/pre-filter decorators down to an AnalyzerPool, if any."""
+    seen = 0
+    while analyzer is not None and seen < 10:
+        if isinstance(analyzer, AnalyzerPool):
+            return analyzer
+        analyzer = analyzer.__dict__.get("_analyzer")
+        seen += 1
+    return None
+
+
+def configured_pool_size() -> int:
+    """Number of local model instances to load (LLAMA_POOL_SIZE, default 1)."""
+    try:
+        size = int(os.getenv("LLAMA_POOL_SIZE", "1"))
+    except ValueError:
+        logger.warning("Invalid LLAMA_POOL_SIZE, using default")
+        size = 1
+    return max(1, size)
+
+
+_registry: Optional[AnalyzerRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_analyzer_registry() -> AnalyzerRegistry:
+    """Get the process-wide analyzer registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AnalyzerRegistry()
+    return _registry
+
+
+def provide_analyzer() -> IEmailAnalyzer:
+    """Litestar dependency provider for the shared default analyzer."""
+    return get_analyzer_registry().get()
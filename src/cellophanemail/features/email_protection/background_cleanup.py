@@ -2,7 +2,6 @@
 
 import logging
 import asyncio
-import time
 from datetime import datetime, timedelta
 from typing import List, Optional
 
@@ -14,7 +13,7 @@ logger = logging.getLogger(__name__)
 # Configuration constants
 DEFAULT_CLEANUP_INTERVAL_SECONDS = 60  # Run cleanup every minute
 DEFAULT_GRACE_PERIOD_MINUTES = 1      # Allow 1 minute grace period
-MAX_CLEANUP_BATCH_SIZE = 100          # Process at most 100 emails per cleanup
+MAX_CLEANUP_BATCH_SIZE = 100          # Remove at most 100 emails before yielding to the event loop
 
 
 class BackgroundCleanupService:
@@ -35,31 +34,24 @@ class BackgroundCleanupService:
     async def cleanup_expired_emails(self) -> int:
         """
         Remove emails that have exceeded their TTL + grace period.
-        Uses batch processing for efficiency with large email counts.
+        Cost is proportional to the number of expired emails, not stored ones.
         Returns the number of emails cleaned up.
         """
         try:
-            all_emails = await self.memory_manager.get_all_emails()
-            
-            if not all_emails:
-                return 0
-            
-            current_time = time.time()
             grace_period_seconds = self.grace_period_minutes * 60
-            expired_ids = []
-            
-            # Identify expired emails (batch collect)
-            for email in all_emails[:MAX_CLEANUP_BATCH_SIZE]:  # Limit batch size
-                total_ttl_seconds = email.ttl_seconds + grace_period_seconds
-                
-                if (current_time - email._created_at) > total_ttl_seconds:
-                    expired_ids.append(email.message_id)
-            
-            # Remove expired emails in batch
             expired_count = 0
-            for message_id in expired_ids:
-                if await self.memory_manager.remove_email(message_id):
-                    expired_count += 1
+            
+            # The memory manager's expiry index visits only expired emails;
+            # remove them in batches so a large expiry doesn't stall the loop
+            while True:
+                removed = await self.memory_manager.cleanup_expired(
+                    grace_seconds=grace_period_seconds,
+                    limit=MAX_CLEANUP_BATCH_SIZE
+                )
+                expired_count += removed
+                if removed < MAX_CLEANUP_BATCH_SIZE:
+                    break
+                await asyncio.sleep(0)
             
             if expired_count > 0:
                 logger.info(f"Background cleanup completed: removed {expired_count} expired emails from memory")
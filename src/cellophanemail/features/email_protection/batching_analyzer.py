@@ -0,0 +1,165 @@
+"""
+Micro-batching dispatcher that packs several short messages into one LLM call.
+
+SMS payloads are usually far shorter than the fixed analysis instructions,
+so analyzing them one per request mostly pays for the prompt. The
+dispatcher holds short messages for a few milliseconds, sends up to
+``max_batch_size`` of them in one prompt, and falls back to single-message
+calls for anything the batched response did not cover.
+
+Only messages from the same sender to the same recipient share a prompt,
+so one message can never influence another user's or sender's verdict.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .analyzer_interface import IEmailAnalyzer, current_analysis_recipient
+
+logger = logging.getLogger(__name__)
+
+_Pending = Tuple[str, str, str, asyncio.Future]
+# (recipient, sender) a batch is restricted to
+_GroupKey = Tuple[Optional[str], str]
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name}, using default {default}")
+        return default
+
+
+class MicroBatchingAnalyzer(IEmailAnalyzer):
+    """
+    IEmailAnalyzer decorator that coalesces short async analyses.
+
+    The wrapped analyzer must provide ``analyze_batch_async(messages)``
+    taking (message_id, content, sender) tuples and returning analyses
+    keyed by message_id. Long messages and sync calls go straight through.
+    Pending messages are grouped by recipient (see analysis_recipient) and
+    sender.
+    """
+
+    def __init__(
+        self,
+        analyzer: IEmailAnalyzer,
+        max_batch_size: int = 8,
+        window_ms: float = 5,
+        max_chars: int = 500,
+        metrics_collector=None,
+    ):
+        """
+        Args:
+            analyzer: Analyzer with analyze_batch_async
+            max_batch_size: Messages packed into one prompt
+            window_ms: How long the first message waits for others
+            max_chars: Longer messages are analyzed on their own
+            metrics_collector: Defaults to the process-wide collector
+        """
+        self._analyzer = analyzer
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_seconds = max(0.0, window_ms) / 1000
+        self.max_chars = max_chars
+        self._metrics = metrics_collector
+        if self._metrics is None:
+            from ..monitoring.metrics_collector import get_metrics_collector
+            self._metrics = get_metrics_collector()
+
+        self._ids = itertools.count(1)
+        self._pending: Dict[_GroupKey, List[_Pending]] = {}
+        self._timers: Dict[_GroupKey, asyncio.TimerHandle] = {}
+        self._tasks = set()
+
+    @property
+    def wrapped(self) -> IEmailAnalyzer:
+        """The undecorated analyzer."""
+        return self._analyzer
+
+    def __getattr__(self, name: str):
+        if name == "_analyzer":
+            raise AttributeError(name)
+        return getattr(self._analyzer, name)
+
+    def analyze_email_toxicity(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        return self._analyzer.analyze_email_toxicity(email_content, sender_email)
+
+    def analyze_fact_presentation(self, fact_text: str, full_email_content: str, sender_email: str) -> str:
+        return self._analyzer.analyze_fact_presentation(fact_text, full_email_content, sender_email)
+
+    async def analyze_email_toxicity_async(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        if self.max_batch_size == 1 or len(email_content or "") > self.max_chars:
+            return await self._analyzer.analyze_email_toxicity_async(email_content, sender_email)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (current_analysis_recipient(), (sender_email or "").lower().strip())
+        group = self._pending.setdefault(key, [])
+        group.append((f"m{next(self._ids)}", email_content, sender_email, future))
+
+        if len(group) >= self.max_batch_size:
+            self._dispatch(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window_seconds, self._dispatch, key)
+        return await future
+
+    def _dispatch(self, key: _GroupKey) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._pending.pop(key, [])
+        for start in range(0, len(group), self.max_batch_size):
+            task = asyncio.get_running_loop().create_task(self._run(group[start:start + self.max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_Pending]) -> None:
+        if len(batch) == 1:
+            await self._run_single(batch[0])
+            return
+
+        try:
+            analyses: Dict[str, 'EmailAnalysis'] = await self._analyzer.analyze_batch_async(
+                [(message_id, content, sender) for message_id, content, sender, _ in batch]
+            )
+        except Exception as e:
+            logger.warning(f"Batched analysis of {len(batch)} messages failed, analyzing singly: {e}")
+            analyses = {}
+
+        missing = [entry for entry in batch if entry[0] not in analyses]
+        self._metrics.record_llm_batch(batch_size=len(batch), fallbacks=len(missing))
+
+        for message_id, _, _, future in batch:
+            if message_id in analyses and not future.done():
+                future.set_result(analyses[message_id])
+        await asyncio.gather(*[self._run_single(entry) for entry in missing])
+
+    async def _run_single(self, entry: _Pending) -> None:
+        _, content, sender, future = entry
+        try:
+            result = await self._analyzer.analyze_email_toxicity_async(content, sender)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+
+def create_micro_batching_analyzer(analyzer: IEmailAnalyzer) -> MicroBatchingAnalyzer:
+    """
+    Wrap an analyzer using environment configuration.
+
+    ANALYSIS_MICROBATCH_MAX_SIZE, ANALYSIS_MICROBATCH_WINDOW_MS and
+    ANALYSIS_MICROBATCH_MAX_CHARS tune packing.
+    """
+    return MicroBatchingAnalyzer(
+        analyzer,
+        max_batch_size=_env_number("ANALYSIS_MICROBATCH_MAX_SIZE", 8),
+        window_ms=_env_number("ANALYSIS_MICROBATCH_WINDOW_MS", 5.0, float),
+        max_chars=_env_number("ANALYSIS_MICROBATCH_MAX_CHARS", 500),
+    )
@@ -0,0 +1,140 @@
+"""
+Caching decorator for email analyzers.
+
+Wraps any IEmailAnalyzer so repeated content from the same sender
+(newsletters, bulk SMS) is answered from AnalysisCacheService instead
+of another LLM call.
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+from .analyzer_interface import IEmailAnalyzer, current_analysis_recipient
+from .models import HorsemanDetection, ThreatLevel
+from ...services.analysis_cache import AnalysisCacheService, get_analysis_cache
+
+logger = logging.getLogger(__name__)
+
+# Maps threat levels onto the classifications AnalysisCacheService uses for TTLs
+_CLASSIFICATION_BY_THREAT = {
+    ThreatLevel.SAFE: "SAFE",
+    ThreatLevel.LOW: "WARNING",
+    ThreatLevel.MEDIUM: "WARNING",
+    ThreatLevel.HIGH: "HARMFUL",
+    ThreatLevel.CRITICAL: "HARMFUL",
+}
+
+
+class CachingAnalyzer(IEmailAnalyzer):
+    """
+    IEmailAnalyzer decorator that consults the analysis cache first.
+
+    Concurrent async requests for the same content share one in-flight
+    analysis, so a burst of identical messages costs a single LLM call.
+    """
+
+    def __init__(
+        self,
+        analyzer: IEmailAnalyzer,
+        cache: Optional[AnalysisCacheService] = None,
+        namespace: Optional[str] = None,
+    ):
+        """
+        Args:
+            analyzer: Analyzer to delegate cache misses to
+            cache: Cache service (defaults to the global instance)
+            namespace: Cache key namespace (defaults to the analyzer's class and model)
+        """
+        self._analyzer = analyzer
+        self._cache = cache or get_analysis_cache()
+        self._namespace = namespace or self._default_namespace(analyzer)
+        self._in_flight: Dict[str, "asyncio.Future"] = {}
+
+    @staticmethod
+    def _default_namespace(analyzer: IEmailAnalyzer) -> str:
+        model = getattr(analyzer, "model_name", None) or getattr(analyzer, "model", None) or ""
+        return f"{type(analyzer).__name__}:{model}"
+
+    @property
+    def wrapped(self) -> IEmailAnalyzer:
+        """The undecorated analyzer."""
+        return self._analyzer
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not defined here (e.g. MockAnalyzer.call_count)
+        if name == "_analyzer":
+            raise AttributeError(name)
+        return getattr(self._analyzer, name)
+
+    def analyze_email_toxicity(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        """Analyze email, returning a cached result when available."""
+        recipient = current_analysis_recipient()
+        cached = self._cache.get_cached_analysis(email_content, sender_email, self._namespace, recipient)
+        if cached is not None:
+            return self._from_cache(cached)
+
+        result = self._analyzer.analyze_email_toxicity(email_content, sender_email)
+        self._cache.cache_analysis(email_content, sender_email, self._to_cache(result), self._namespace, recipient)
+        return result
+
+    async def analyze_email_toxicity_async(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        """Async variant with de-duplication of concurrent identical requests."""
+        recipient = current_analysis_recipient()
+        cached = await self._cache.get_cached_analysis_async(
+            email_content, sender_email, self._namespace, recipient
+        )
+        if cached is not None:
+            return self._from_cache(cached)
+
+        key = self._cache._generate_cache_key(email_content, sender_email, self._namespace)
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._analyzer.analyze_email_toxicity_async(email_content, sender_email)
+            await self._cache.cache_analysis_async(
+                email_content, sender_email, self._to_cache(result), self._namespace, recipient
+            )
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise; retrieve here so an unobserved future does not warn
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    def analyze_fact_presentation(self, fact_text: str, full_email_content: str, sender_email: str) -> str:
+        """Fact presentation is context-dependent, so it is not cached."""
+        return self._analyzer.analyze_fact_presentation(fact_text, full_email_content, sender_email)
+
+    @staticmethod
+    def _to_cache(result: 'EmailAnalysis') -> Dict[str, Any]:
+        data = asdict(result)
+        data["threat_level"] = result.threat_level.value
+        data["horsemen_detected"] = [h.model_dump() for h in result.horsemen_detected]
+        data["classification"] = _CLASSIFICATION_BY_THREAT.get(result.threat_level, "HARMFUL")
+        return data
+
+    @staticmethod
+    def _from_cache(data: Dict[str, Any]) -> 'EmailAnalysis':
+        from .email_toxicity_analyzer import EmailAnalysis
+
+        return EmailAnalysis(
+            threat_level=ThreatLevel(data["threat_level"]),
+            safe=data["safe"],
+            horsemen_detected=[HorsemanDetection(**h) for h in data["horsemen_detected"]],
+            reasoning=data["reasoning"],
+            confidence=data["confidence"],
+            processing_time_ms=data["processing_time_ms"],
+            language_detected=data.get("language_detected", "en"),
+        )
@@ -0,0 +1,303 @@
+"""
+Analysis content extraction shared by all email protection processors.
+
+Builds the text the analyzer sees from an email's subject and bodies. HTML
+bodies go through a single-pass tokenizer (``html.parser``) that drops
+style/script blocks and a trailing quoted thread, decodes entities, keeps
+block structure as line breaks, and stops as soon as the token budget is
+full. Replies have their trailing quoted thread trimmed (see
+``reply_trimming``).
+"""
+
+import logging
+import os
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from .reply_trimming import trim_reply
+
+logger = logging.getLogger(__name__)
+
+# Rough size of one LLM token in English text
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_CONTENT_TOKENS = 4000
+DEFAULT_REPLY_CONTEXT_TOKENS = 0
+HTML_FEED_CHUNK = 8192
+
+# Contents never shown to a reader
+_HIDDEN_TAGS = frozenset({"script", "style", "head", "title", "noscript", "template", "svg"})
+_BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li",
+    "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul",
+})
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr",
+})
+# Quoted-reply containers (Gmail, Apple Mail/Thunderbird, Yahoo); only
+# dropped when nothing but whitespace follows them
+_QUOTE_CLASSES = frozenset({"gmail_quote", "gmail_quote_container", "yahoo_quoted", "moz-cite-prefix"})
+
+_INLINE_SPACE = re.compile(r"[ \t\r\f\v ]+")
+_SPACE_AROUND_NEWLINE = re.compile(r" *\n *")
+_EXTRA_NEWLINES = re.compile(r"\n{3,}")
+
+
+class _Done(Exception):
+    pass
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self, max_chars: Optional[int], drop_quotes: bool):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.drop_quotes = drop_quotes
+        self.parts: List[str] = []
+        self.length = 0
+        self._hidden: Optional[str] = None
+        self._quote_depth = 0
+        # Quote blocks (and whitespace after them) held back until it is
+        # known whether any content follows; only a trailing run is dropped
+        self._held: List[str] = []
+        self._held_length = 0
+
+    @property
+    def quoted_chars(self) -> int:
+        return len("".join(self._held).strip())
+
+    def _is_quote(self, tag: str, attrs) -> bool:
+        attrs = dict(attrs)
+        if tag == "blockquote" and (attrs.get("type") or "").lower() == "cite":
+            return True
+        classes = (attrs.get("class") or "").lower().split()
+        return any(name in _QUOTE_CLASSES for name in classes)
+
+    def _emit(self, text: str) -> None:
+        if self._quote_depth or (self._held and not text.strip()):
+            self._hold(text)
+            return
+        if self._held:
+            # Content after the quote: it was not the trailing thread, keep it
+            held, self._held, self._held_length = self._held, [], 0
+            for part in held:
+                self._append(part)
+        self._append(text)
+
+    def _hold(self, text: str) -> None:
+        # Text past the budget would be cut anyway, so the buffer stays bounded
+        if self.max_chars is not None:
+            text = text[:max(0, self.max_chars - self._held_length)]
+        self._held.append(text)
+        self._held_length += len(text)
+
+    def _append(self, text: str) -> None:
+        self.parts.append(text)
+        self.length += len(text)
+        if self.max_chars is not None and self.length >= self.max_chars:
+            raise _Done
+
+    def handle_starttag(self, tag, attrs):
+        if self._hidden:
+            return
+        if tag in _HIDDEN_TAGS:
+            self._hidden = tag
+            return
+        if self._quote_depth:
+            if tag not in _VOID_TAGS:
+                self._quote_depth += 1
+        elif self.drop_quotes and tag not in _VOID_TAGS and self._is_quote(tag, attrs):
+            self._quote_depth = 1
+        if tag in _BLOCK_TAGS:
+            self._emit("\n")
+        elif tag == "td" or tag == "th":
+            self._emit(" ")
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._hidden and tag in _BLOCK_TAGS:
+            self._emit("\n")
+
+    def handle_endtag(self, tag):
+        if self._hidden:
+            if tag == self._hidden:
+                self._hidden = None
+            return
+        if tag in _BLOCK_TAGS:
+            self._emit("\n")
+        if self._quote_depth and tag not in _VOID_TAGS:
+            self._quote_depth -= 1
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self._emit(data)
+
+
+def _normalize_whitespace(text: str) -> str:
+    text = _INLINE_SPACE.sub(" ", text)
+    text = _SPACE_AROUND_NEWLINE.sub("\n", text)
+    return _EXTRA_NEWLINES.sub("\n\n", text).strip()
+
+
+def _extract_html(html: str, max_chars: Optional[int], drop_quotes: bool) -> Tuple[str, int]:
+    if not html:
+        return "", 0
+    extractor = _TextExtractor(max_chars, drop_quotes)
+    try:
+        for start in range(0, len(html), HTML_FEED_CHUNK):
+            extractor.feed(html[start:start + HTML_FEED_CHUNK])
+        extractor.close()
+    except _Done:
+        pass
+    text = _normalize_whitespace("".join(extractor.parts))
+    return (text[:max_chars] if max_chars is not None else text), extractor.quoted_chars
+
+
+def html_to_text(html: str, max_chars: Optional[int] = None, drop_quotes: bool = True) -> str:
+    """
+    Convert an HTML body to readable text.
+
+    Args:
+        html: HTML source (malformed markup is fine)
+        max_chars: Stop once this much text has been produced (None = no limit)
+        drop_quotes: Skip quoted-reply blocks that end the body (quotes followed
+            by more content are kept)
+
+    Returns:
+        Plain text with entities decoded and paragraphs separated by blank lines
+    """
+    return _extract_html(html, max_chars, drop_quotes)[0]
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: Optional[int]) -> str:
+    """Cut text to about ``max_tokens`` tokens, at a word boundary when possible."""
+    if max_tokens is None:
+        return text
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", max_chars // 2, max_chars)
+    return text[:cut if cut > 0 else max_chars].rstrip()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name}, using default {default}")
+        return default
+
+
+def get_max_content_tokens() -> Optional[int]:
+    """Token budget for analysis content (ANALYSIS_MAX_CONTENT_TOKENS, 0 = unlimited)."""
+    value = _env_int("ANALYSIS_MAX_CONTENT_TOKENS", DEFAULT_MAX_CONTENT_TOKENS)
+    return value if value > 0 else None
+
+
+def _build(
+    subject: Optional[str],
+    text_body: Optional[str],
+    html_body: Optional[str],
+    max_tokens: Optional[int],
+    trim_replies: bool,
+    reply_context_tokens: int
+) -> Tuple[str, int]:
+    """Analysis content and the number of tokens removed by reply trimming."""
+    parts = []
+    if subject:
+        parts.append(f"Subject: {subject}")
+
+    trimmed_tokens = 0
+    if text_body:
+        body = text_body
+        if trim_replies:
+            body = trim_reply(text_body, context_chars=reply_context_tokens * CHARS_PER_TOKEN)
+            trimmed_tokens = max(0, estimate_tokens(text_body) - estimate_tokens(body))
+    elif html_body:
+        max_chars = max_tokens * CHARS_PER_TOKEN if max_tokens is not None else None
+        body, quoted_chars = _extract_html(html_body, max_chars, drop_quotes=trim_replies)
+        trimmed_tokens = -(-quoted_chars // CHARS_PER_TOKEN)
+    else:
+        body = ""
+    if body:
+        parts.append(body)
+
+    return truncate_to_tokens("\n\n".join(parts), max_tokens), trimmed_tokens
+
+
+def build_analysis_content(
+    subject: Optional[str],
+    text_body: Optional[str],
+    html_body: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    trim_replies: bool = False,
+    reply_context_tokens: int = 0
+) -> str:
+    """
+    Combine subject and body into the text sent for analysis.
+
+    The plain-text body is preferred; the HTML body is converted only when
+    there is no text part.
+
+    Args:
+        subject: Email subject
+        text_body: Plain-text body
+        html_body: HTML body
+        max_tokens: Budget for the whole result (None = no limit)
+        trim_replies: Keep only the new text, not the trailing quoted thread;
+            pass True only for mail threaded onto an earlier message
+        reply_context_tokens: Quoted-thread tokens to keep as context when trimming
+            (plain-text bodies; a trailing HTML quote block is always dropped when trimming)
+    """
+    return _build(subject, text_body, html_body, max_tokens, trim_replies, reply_context_tokens)[0]
+
+
+def build_delivery_content(
+    subject: Optional[str],
+    text_body: Optional[str],
+    html_body: Optional[str] = None
+) -> str:
+    """
+    Subject and body as forwarded to the recipient.
+
+    Uses the same body selection as analysis content (HTML is converted only
+    when there is no text part) but is never truncated and keeps the quoted
+    thread: the token budget and trimming apply to the prompt alone.
+    """
+    return build_analysis_content(subject, text_body, html_body)
+
+
+def prepare_analysis_content(
+    subject: Optional[str],
+    text_body: Optional[str],
+    html_body: Optional[str] = None,
+    is_reply: bool = False
+) -> str:
+    """
+    Analysis content using the deployment's settings; records tokens saved.
+
+    ANALYSIS_MAX_CONTENT_TOKENS bounds the result, ANALYSIS_TRIM_REPLIES
+    (default true) trims the trailing quoted thread of replies, and
+    ANALYSIS_REPLY_CONTEXT_TOKENS keeps that much of the quoted thread.
+
+    Args:
+        is_reply: The email carries In-Reply-To/References; mail that is not
+            threaded onto an earlier message is always analyzed whole
+    """
+    max_tokens = get_max_content_tokens()
+    content, trimmed_tokens = _build(
+        subject,
+        text_body,
+        html_body,
+        max_tokens,
+        trim_replies=is_reply and os.getenv("ANALYSIS_TRIM_REPLIES", "true").lower() == "true",
+        reply_context_tokens=max(0, _env_int("ANALYSIS_REPLY_CONTEXT_TOKENS", DEFAULT_REPLY_CONTEXT_TOKENS))
+    )
+
+    from ..monitoring.metrics_collector import get_metrics_collector
+    get_metrics_collector().record_content_trimmed(trimmed_tokens, estimate_tokens(content))
+    return content
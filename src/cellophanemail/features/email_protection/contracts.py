@@ -48,6 +48,18 @@ class MemoryStorageInterface(ABC):
         """
         pass
     
+    async def contains_email_async(self, message_id: str) -> bool:
+        """
+        Check whether an email with this message ID is already stored.
+        
+        Args:
+            message_id: Unique identifier of the email
+            
+        Returns:
+            True if stored, False otherwise
+        """
+        return await self.get_email_async(message_id) is not None
+    
     @abstractmethod
     async def get_all_emails(self) -> List["EphemeralEmail"]:
         """
@@ -36,6 +36,10 @@ class DeliveryConfiguration:
     max_retries: int = 3
     add_transparency_headers: bool = True
     preserve_threading: bool = True
+    # Coalesce sends through the sender's batch API (Postmark /email/batch)
+    batch_delivery: bool = False
+    batch_window_ms: int = 50
+    batch_max_size: int = 500
 
 
 class EmailCompositionStrategy:
@@ -120,10 +124,15 @@ class EmailCompositionStrategy:
         # Add [Filtered] prefix to subject
         subject = f"[Filtered] {original_email.subject}"
         
+        headers = {}
+        redaction_spans = getattr(processing_result, "redaction_spans", None)
+        if redaction_spans is not None:
+            headers["X-Redaction-Count"] = str(len(redaction_spans))
+        
         return EmailComposition(
             subject=subject,
             body=full_body,
-            headers={},
+            headers=headers,
             from_address=f"protection@{config.service_domain}",
             reply_to=original_email.from_address
         )
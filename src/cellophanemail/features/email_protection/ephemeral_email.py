@@ -1,8 +1,72 @@
 """EphemeralEmail data class for in-memory email processing."""
 
+import sys
 import time
+import zlib
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Callable, List, Optional
+
+from .content_extraction import build_delivery_content, prepare_analysis_content
+
+# Optional zstd import with graceful degradation to zlib
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+_NO_DEFAULT = object()
+
+
+class CompressedText:
+    """A body held compressed in memory; ``decode()`` returns the original text."""
+    
+    __slots__ = ("codec", "data", "original_size")
+    
+    def __init__(self, text: str, codec: str = "zlib"):
+        raw = text.encode("utf-8")
+        if codec == "zstd" and ZSTD_AVAILABLE:
+            self.data = zstandard.ZstdCompressor(level=3).compress(raw)
+        else:
+            codec = "zlib"
+            self.data = zlib.compress(raw, 6)
+        self.codec = codec
+        self.original_size = sys.getsizeof(text)
+    
+    def decode(self) -> str:
+        if self.codec == "zstd":
+            raw = zstandard.ZstdDecompressor().decompress(self.data)
+        else:
+            raw = zlib.decompress(self.data)
+        return raw.decode("utf-8")
+
+
+class _BodyField:
+    """
+    Dataclass field descriptor for a body that may be stored compressed.
+    
+    Reads always return plain text, so callers never see the compressed form.
+    """
+    
+    def __init__(self, default=_NO_DEFAULT):
+        self.default = default
+    
+    def __set_name__(self, owner, name):
+        self.storage_name = f"_{name}_stored"
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            if self.default is _NO_DEFAULT:
+                raise AttributeError("no default")  # tells dataclasses the field is required
+            return self.default
+        value = obj.__dict__.get(self.storage_name, self.default)
+        if isinstance(value, CompressedText):
+            return value.decode()
+        return value
+    
+    def __set__(self, obj, value):
+        obj.__dict__[self.storage_name] = value
 
 
 @dataclass
@@ -27,10 +91,10 @@ class EphemeralEmail:
     from_address: str
     to_addresses: List[str]
     subject: str
-    text_body: str
+    text_body: str = _BodyField()
     user_email: str
     ttl_seconds: int = 300  # Default 5 minutes
-    html_body: Optional[str] = None
+    html_body: Optional[str] = _BodyField(default=None)
     
     # Email threading headers for conversation continuity
     message_id_header: Optional[str] = None
@@ -40,6 +104,81 @@ class EphemeralEmail:
     # Private field for TTL calculation
     _created_at: float = field(default_factory=time.time, init=False)
     
+    # Set by MemoryManager so its expiry index and byte accounting follow changes
+    _memory_listener: Optional[Callable[["EphemeralEmail", str], None]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ("_created_at", "ttl_seconds", "text_body", "html_body"):
+            listener = self.__dict__.get("_memory_listener")
+            if listener is not None:
+                listener(self, name)
+    
+    @property
+    def is_compressed(self) -> bool:
+        return any(
+            isinstance(self.__dict__.get(name), CompressedText)
+            for name in ("_text_body_stored", "_html_body_stored")
+        )
+    
+    def compress_bodies(self, codec: str = "zlib", min_bytes: int = 0) -> None:
+        """
+        Hold text_body/html_body compressed until they are read.
+        
+        Reads still return plain text (decompressed on each access), so the
+        email can wait for analysis at a fraction of its size.
+        """
+        for name in ("text_body", "html_body"):
+            value = self.__dict__.get(f"_{name}_stored")
+            if isinstance(value, str) and value and sys.getsizeof(value) >= min_bytes:
+                compressed = CompressedText(value, codec)
+                if sys.getsizeof(compressed.data) < compressed.original_size:
+                    self.__dict__[f"_{name}_stored"] = compressed
+    
+    @property
+    def size_bytes(self) -> int:
+        """Approximate in-memory footprint: the object, its fields and body storage."""
+        total = sys.getsizeof(self) + sys.getsizeof(self.__dict__)
+        for value in self.__dict__.values():
+            if isinstance(value, CompressedText):
+                total += sys.getsizeof(value) + sys.getsizeof(value.data)
+            elif isinstance(value, list):
+                total += sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+            elif value is not None and not callable(value):
+                total += sys.getsizeof(value)
+        return total
+    
+    @property
+    def uncompressed_body_bytes(self) -> int:
+        """Size the bodies would occupy as plain strings."""
+        total = 0
+        for name in ("_text_body_stored", "_html_body_stored"):
+            value = self.__dict__.get(name)
+            if isinstance(value, CompressedText):
+                total += value.original_size
+            elif value is not None:
+                total += sys.getsizeof(value)
+        return total
+    
+    @property
+    def stored_body_bytes(self) -> int:
+        """Size the bodies occupy as stored (compressed or not)."""
+        total = 0
+        for name in ("_text_body_stored", "_html_body_stored"):
+            value = self.__dict__.get(name)
+            if isinstance(value, CompressedText):
+                total += sys.getsizeof(value.data)
+            elif value is not None:
+                total += sys.getsizeof(value)
+        return total
+    
+    @property
+    def expires_at(self) -> float:
+        """Epoch time after which the email is expired."""
+        return self._created_at + self.ttl_seconds
+    
     @property
     def is_expired(self) -> bool:
         """
@@ -55,14 +194,25 @@ class EphemeralEmail:
         """
         Get combined content for LLM analysis.
         
-        Combines subject and text body in a format suitable for LLM processing.
+        Combines subject and body (the text part, or the HTML part converted
+        to text), drops the quoted thread of replies, and truncates to the
+        analysis token budget.
+        
+        Returns:
+            Formatted string containing subject and body content
+        """
+        return prepare_analysis_content(
+            self.subject, self.text_body, self.html_body,
+            is_reply=bool(self.in_reply_to or self.references)
+        )
+    
+    def get_content_for_delivery(self) -> str:
+        """
+        Get combined content to forward to the recipient.
+        
+        Unlike get_content_for_analysis, the quoted thread is kept; redaction and summaries start from this text.
         
         Returns:
             Formatted string containing subject and body content
         """
-        content_parts = []
-        if self.subject:
-            content_parts.append(f"Subject: {self.subject}")
-        if self.text_body:
-            content_parts.append(self.text_body)
-        return "\n\n".join(content_parts)
\ No newline at end of file
+        return build_delivery_content(self.subject, self.text_body, self.html_body)
\ No newline at end of file
@@ -1,7 +1,6 @@
 """InMemoryProcessor for processing emails without database storage."""
 
 import logging
-import re
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -9,9 +8,11 @@ from analysis_engine import decide_action, ThreatLevel
 
 from .ephemeral_email import EphemeralEmail
 from .graduated_decision_maker import ProtectionAction
-from .analyzer_interface import IEmailAnalyzer
+from .analyzer_interface import IEmailAnalyzer, analysis_recipient
 from .analyzer_factory import AnalyzerFactory
 from .contracts import EmailProcessorInterface
+from .prefilter import CONTEMPT_WORDS, CRITICISM_WORDS, MILD_WORDS
+from .redaction import RedactionSpan, default_redaction_engine, indicators_from_horsemen
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,7 @@ class ProcessingResult:
     processed_content: str
     processing_time_ms: int
     reasoning: Optional[str] = None
+    redaction_spans: Optional[List[RedactionSpan]] = None
 
 
 class InMemoryProcessor(EmailProcessorInterface):
@@ -83,11 +85,14 @@ class InMemoryProcessor(EmailProcessorInterface):
 
         # Analyze content for toxicity (using LLM or heuristics)
         content = email.get_content_for_analysis()
+        # Delivered text keeps what analysis trims (the quoted thread of replies)
+        delivery_content = email.get_content_for_delivery()
 
         if self.use_llm and self.llm_analyzer:
             # Use LLM for analysis - no fallback to heuristics
             try:
-                analysis = self.llm_analyzer.analyze_email_toxicity(content, email.from_address)
+                with analysis_recipient(email.user_email):
+                    analysis = await self.llm_analyzer.analyze_email_toxicity_async(content, email.from_address)
                 threat_level = analysis.threat_level
                 horsemen_detected = analysis.horsemen_detected
             except Exception as e:
@@ -100,25 +105,31 @@ class InMemoryProcessor(EmailProcessorInterface):
         # Use analysis_engine's decide_action for consistent logic
         action = decide_action(horsemen_detected)
 
+        redaction_spans = None
+
         # Apply content processing based on action
         if action == ProtectionAction.FORWARD_CLEAN:
             requires_delivery = True
-            processed_content = content
+            processed_content = delivery_content
             reasoning = f"Clean content (threat_level: {threat_level.value})"
 
         elif action == ProtectionAction.FORWARD_WITH_CONTEXT:
             requires_delivery = True
-            processed_content = self._add_context_warning(content)
+            processed_content = self._add_context_warning(delivery_content)
             reasoning = f"Minor toxicity (threat_level: {threat_level.value}) - adding context warning"
 
         elif action == ProtectionAction.REDACT_HARMFUL:
             requires_delivery = True
-            processed_content = self._redact_toxic_content(content)
+            redaction = default_redaction_engine.redact(
+                delivery_content, indicators_from_horsemen(horsemen_detected)
+            )
+            processed_content = self._with_redaction_note(redaction.content, redaction.count)
+            redaction_spans = redaction.spans
             reasoning = f"Moderate toxicity (threat_level: {threat_level.value}) - redacting harmful content"
 
         elif action == ProtectionAction.SUMMARIZE_ONLY:
             requires_delivery = True
-            processed_content = self._create_safe_summary(content)
+            processed_content = self._create_safe_summary(delivery_content)
             reasoning = f"High toxicity (threat_level: {threat_level.value}) - providing factual summary only"
 
         else:  # BLOCK_ENTIRELY
@@ -135,7 +146,8 @@ class InMemoryProcessor(EmailProcessorInterface):
             delivery_targets=delivery_targets,
             processed_content=processed_content,
             processing_time_ms=150,  # Simulated processing time
-            reasoning=reasoning
+            reasoning=reasoning,
+            redaction_spans=redaction_spans
         )
 
     def _analyze_content_heuristics(self, content: str) -> tuple:
@@ -147,10 +159,10 @@ class InMemoryProcessor(EmailProcessorInterface):
         """
         from .models import HorsemanDetection
 
-        # Define toxic keywords by severity level
-        contempt_words = ['worthless', 'pathetic', 'disgusting', 'loser', 'idiot']
-        criticism_words = ['terrible', 'awful', 'stupid', 'incompetent']
-        mild_words = ['annoying', 'frustrating', 'disappointing']
+        # Toxic keywords by severity level (shared with the pre-filter)
+        contempt_words = CONTEMPT_WORDS
+        criticism_words = CRITICISM_WORDS
+        mild_words = MILD_WORDS
 
         content_lower = content.lower()
 
@@ -193,23 +205,15 @@ class InMemoryProcessor(EmailProcessorInterface):
         warning = "[CONTEXT: This email contains language that may be considered mildly inappropriate]"
         return f"{content}\n\n{warning}"
 
-    def _redact_toxic_content(self, content: str) -> str:
-        """Redact toxic words from content."""
-        toxic_words = ['hate', 'stupid', 'idiot', 'disgusting', 'pathetic', 'terrible', 'awful']
-
-        processed = content
-        redactions = 0
-
-        for word in toxic_words:
-            if word in processed.lower():
-                # Case-insensitive replacement
-                pattern = re.compile(re.escape(word), re.IGNORECASE)
-                processed = pattern.sub('[REDACTED]', processed)
-                redactions += 1
+    def _redact_toxic_content(self, content: str, horsemen: Optional[list] = None) -> str:
+        """Redact toxic words and LLM-reported indicator phrases from content."""
+        redaction = default_redaction_engine.redact(content, indicators_from_horsemen(horsemen))
+        return self._with_redaction_note(redaction.content, redaction.count)
 
+    def _with_redaction_note(self, processed: str, redactions: int) -> str:
+        """Append the redaction count note when anything was redacted."""
         if redactions > 0:
             processed += f"\n\n[NOTE: {redactions} inappropriate terms were redacted for your protection]"
-
         return processed
 
     def _create_safe_summary(self, content: str) -> str:
@@ -21,6 +21,7 @@ from .email_composition_strategy import (
 from .contracts import DeliveryManagerInterface
 from ...core.email_delivery.factory import EmailSenderFactory
 from ...core.email_delivery.base import BaseEmailSender
+from ...core.email_delivery.batch_queue import BatchDeliveryQueue
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +75,16 @@ class IntegratedDeliveryManager(DeliveryManagerInterface):
         # Initialize email composition strategy
         self.composer = EmailCompositionStrategy()
         
+        # Coalesce sends through the batch API when the sender has one
+        self.batch_queue: Optional[BatchDeliveryQueue] = None
+        if delivery_config.batch_delivery and hasattr(self.email_sender, 'send_batch'):
+            self.batch_queue = BatchDeliveryQueue(
+                self.email_sender,
+                max_batch_size=delivery_config.batch_max_size,
+                window_ms=delivery_config.batch_window_ms,
+                max_retries=self.max_retries
+            )
+        
         logger.info(f"IntegratedDeliveryManager initialized with {delivery_config.sender_type} sender")
         
     async def deliver_email(self, processing_result: ProcessingResult, email: EphemeralEmail) -> EnhancedDeliveryResult:
@@ -117,6 +128,9 @@ class IntegratedDeliveryManager(DeliveryManagerInterface):
                 email_sender_used=self.config.sender_type
             )
         
+        if self.batch_queue is not None:
+            return await self._deliver_batched(composition, processing_result, email, start_time)
+        
         # Attempt delivery with retry logic
         attempts = 0
         last_error = None
@@ -160,6 +174,36 @@ class IntegratedDeliveryManager(DeliveryManagerInterface):
             email_sender_used=self.config.sender_type
         )
     
+    async def _deliver_batched(
+        self,
+        composition: EmailComposition,
+        processing_result: ProcessingResult,
+        email: EphemeralEmail,
+        start_time: float
+    ) -> EnhancedDeliveryResult:
+        """Deliver through the batch queue; retries of failed entries happen inside the queue."""
+        outcome = await self.batch_queue.submit(
+            to_address=processing_result.delivery_targets[0],
+            subject=composition.subject,
+            content=composition.body,
+            headers=composition.headers
+        )
+        
+        if outcome.success:
+            logger.info(f"Email {email.message_id} delivered in batch on attempt {outcome.attempts}")
+        else:
+            logger.error(f"Batch delivery failed for email {email.message_id}: {outcome.error_message}")
+        
+        return EnhancedDeliveryResult(
+            success=outcome.success,
+            attempts=outcome.attempts,
+            protection_action=processing_result.action,
+            toxicity_score=processing_result.toxicity_score,
+            error_message=outcome.error_message,
+            delivery_time_ms=int((time.time() - start_time) * 1000) if outcome.success else None,
+            email_sender_used=self.config.sender_type
+        )
+    
     async def _attempt_delivery(self, composition: EmailComposition, to_address: str) -> bool:
         """
         Attempt to deliver an email once using the configured email sender.
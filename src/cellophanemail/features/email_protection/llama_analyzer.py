@@ -6,13 +6,46 @@ Uses llama-cpp-python to run models locally without external API calls.
 import json
 import gc
 import logging
-from typing import Dict, Optional, Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
 from pathlib import Path
 from llama_cpp import Llama
 from .contracts import LLMAnalyzerInterface
+from .analyzer_executor import run_in_analyzer_executor
 
 logger = logging.getLogger(__name__)
 
+# Everything before the email body is identical for every analysis, so its
+# KV state is computed once per model instance and restored per call.
+ANALYSIS_PREFIX = """<|begin_of_text|><|start_header_id|>system<|end_header_id|>
+You are an email safety analyzer. Analyze emails for toxicity and manipulation tactics.
+Respond with valid JSON only. No explanations.<|eot_id|>
+
+<|start_header_id|>user<|end_header_id|>
+Analyze the email below for toxicity and psychological manipulation.
+
+Respond with this exact JSON structure:
+{
+  "toxicity_score": 0.0,
+  "manipulation": false,
+  "gaslighting": false,
+  "stonewalling": false,
+  "defensive": false,
+  "action": "SAFE"
+}
+
+Where:
+- toxicity_score: 0.0 (safe) to 1.0 (highly toxic)
+- manipulation: true if manipulative language detected
+- gaslighting: true if reality-denying tactics present
+- stonewalling: true if avoiding/withdrawing behavior
+- defensive: true if overly defensive language
+- action: "SAFE" or "TOXIC"
+
+EMAIL:
+"""
+
 
 class LlamaAnalyzer(LLMAnalyzerInterface):
     """Local Llama model analyzer for privacy-preserving email analysis."""
@@ -24,7 +57,8 @@ class LlamaAnalyzer(LLMAnalyzerInterface):
         n_threads: int = 8,
         n_gpu_layers: int = 0,  # Set > 0 if you have GPU
         temperature: float = 0.1,
-        verbose: bool = False
+        verbose: bool = False,
+        collect_garbage: bool = True
     ):
         """
         Initialize Llama analyzer with local model.
@@ -36,6 +70,8 @@ class LlamaAnalyzer(LLMAnalyzerInterface):
             n_gpu_layers: Number of layers to offload to GPU (0 for CPU only)
             temperature: Lower = more deterministic (0.1 recommended for analysis)
             verbose: Whether to show model loading output
+            collect_garbage: Force gc after every message (worker processes
+                collect once per batch instead)
         """
         if model_path is None:
             # Look for model in common locations
@@ -69,6 +105,33 @@ class LlamaAnalyzer(LLMAnalyzerInterface):
         )
         
         self.temperature = temperature
+        self.collect_garbage = collect_garbage
+        
+        # KV state of the static analysis prefix, restored before each analysis
+        self._prefix_state = None
+        self._prefix_tokens: Optional[List[int]] = None
+        self._prime_prefix_cache()
+        
+        # A llama.cpp context cannot run two generations at once, so each
+        # model instance gets its own single-thread executor for async callers.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llama")
+        
+    async def analyze_toxicity_async(self, email_content: str) -> Dict[str, Any]:
+        """
+        Analyze email toxicity without blocking the event loop.
+        
+        Inference runs on this instance's dedicated worker thread; concurrent
+        callers queue behind it instead of contending for the model.
+        
+        Args:
+            email_content: The email text to analyze
+            
+        Returns:
+            Dictionary with toxicity analysis results
+        """
+        return await run_in_analyzer_executor(
+            self.analyze_toxicity, email_content, executor=self._executor
+        )
         
     def analyze_toxicity(self, email_content: str) -> Dict[str, Any]:
         """
@@ -84,6 +147,10 @@ class LlamaAnalyzer(LLMAnalyzerInterface):
             # Build prompt for Llama 3.1 format
             prompt = self._build_analysis_prompt(email_content)
             
+            # Reuse the precomputed instruction prefix instead of re-evaluating it
+            reused = self._restore_prefix()
+            self._record_prompt_tokens(prompt, reused)
+            
             # Generate response with strict JSON output
             response = self.llm(
                 prompt,
@@ -107,7 +174,8 @@ class LlamaAnalyzer(LLMAnalyzerInterface):
             del prompt
             del response
             del response_text
-            gc.collect()  # Force garbage collection
+            if getattr(self, "collect_garbage", True):
+                gc.collect()  # Force garbage collection
             
             return result
             
@@ -125,44 +193,72 @@ class LlamaAnalyzer(LLMAnalyzerInterface):
             }
     
     def _build_analysis_prompt(self, email_content: str) -> str:
-        """Build the analysis prompt for Llama 3.1."""
-        return f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
-You are an email safety analyzer. Analyze emails for toxicity and manipulation tactics.
-Respond with valid JSON only. No explanations.<|eot_id|>
-
-<|start_header_id|>user<|end_header_id|>
-Analyze this email for toxicity and psychological manipulation.
-
-EMAIL:
-{email_content}
-
-Respond with this exact JSON structure:
-{{
-  "toxicity_score": 0.0,
-  "manipulation": false,
-  "gaslighting": false,  
-  "stonewalling": false,
-  "defensive": false,
-  "action": "SAFE"
-}}
-
-Where:
-- toxicity_score: 0.0 (safe) to 1.0 (highly toxic)
-- manipulation: true if manipulative language detected
-- gaslighting: true if reality-denying tactics present
-- stonewalling: true if avoiding/withdrawing behavior
-- defensive: true if overly defensive language
-- action: "SAFE" or "TOXIC"<|eot_id|>
+        """Build the analysis prompt for Llama 3.1 (static prefix first, email last)."""
+        return f"""{ANALYSIS_PREFIX}{email_content}<|eot_id|>
 
 <|start_header_id|>assistant<|end_header_id|>
 {{"""
     
+    def _prime_prefix_cache(self) -> None:
+        """Evaluate the static prompt prefix once and keep its KV state for reuse."""
+        if os.getenv("LLAMA_PREFIX_CACHE_ENABLED", "true").lower() in ("false", "0", "no"):
+            return
+        try:
+            tokens = self.llm.tokenize(ANALYSIS_PREFIX.encode("utf-8"), special=True)
+            self.llm.reset()
+            self.llm.eval(tokens)
+            self._prefix_state = self.llm.save_state()
+            self._prefix_tokens = list(tokens)
+            logger.info(f"Cached {len(tokens)}-token analysis prefix state")
+        except Exception as e:
+            logger.warning(f"Prompt prefix caching unavailable: {e}")
+            self._prefix_state = None
+            self._prefix_tokens = None
+    
+    def _restore_prefix(self) -> int:
+        """
+        Make sure the model's KV cache starts with the analysis prefix.
+        
+        llama.cpp skips re-evaluating the longest prefix shared with the
+        tokens already in its context, so after another prompt (e.g. fact
+        analysis) the saved state is loaded back instead of recomputed.
+        
+        Returns:
+            Number of prefix tokens that will be reused
+        """
+        prefix_tokens = getattr(self, "_prefix_tokens", None)
+        if not prefix_tokens:
+            return 0
+        try:
+            current = list(self.llm.input_ids[:min(self.llm.n_tokens, len(prefix_tokens))])
+            if current != prefix_tokens:
+                self.llm.load_state(self._prefix_state)
+        except Exception as e:
+            logger.warning(f"Could not restore cached prompt prefix: {e}")
+            return 0
+        return len(prefix_tokens)
+    
+    def _record_prompt_tokens(self, prompt: str, reused: int) -> None:
+        try:
+            total = len(self.llm.tokenize(prompt.encode("utf-8"), special=True))
+        except Exception:
+            return
+        from ..monitoring.metrics_collector import get_metrics_collector
+        get_metrics_collector().record_prompt_tokens(uncached=max(0, total - reused), cache_read=reused)
+    
     def _parse_response(self, response_text: str) -> Dict[str, Any]:
         """Parse the model's JSON response."""
         try:
             # Clean up response text
             response_text = response_text.strip()
             
+            # The prompt ends with the opening brace (echo=False drops it) and
+            # the "}}" stop sequence can swallow the closing one
+            if not response_text.startswith('{'):
+                response_text = '{' + response_text
+            if not response_text.endswith('}'):
+                response_text = response_text.rstrip(',') + '}'
+            
             # Find JSON object in response
             start_idx = response_text.find('{')
             end_idx = response_text.rfind('}')
@@ -242,6 +338,8 @@ Respond with only: POSITIVE, NEUTRAL, or NEGATIVE<|eot_id|>
     
     def __del__(self):
         """Clean up model from memory when analyzer is destroyed."""
+        if hasattr(self, '_executor'):
+            self._executor.shutdown(wait=False)
         if hasattr(self, 'llm'):
             del self.llm
             gc.collect()
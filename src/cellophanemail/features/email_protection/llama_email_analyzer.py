@@ -0,0 +1,116 @@
+"""
+IEmailAnalyzer adapter for the local Llama backends.
+
+LlamaAnalyzer and LlamaWorkerPool implement the lower-level
+LLMAnalyzerInterface (``analyze_toxicity(content) -> dict``). The
+processors, CachingAnalyzer and PrefilteredAnalyzer expect IEmailAnalyzer,
+so this adapter runs the local analysis and maps its flags onto the Four
+Horsemen that drive decide_action.
+"""
+
+import logging
+import time
+from typing import Any, Dict
+
+from .analyzer_interface import IEmailAnalyzer
+from .models import HorsemanDetection, ThreatLevel
+
+logger = logging.getLogger(__name__)
+
+# Local model flags and the horseman each one stands for
+FLAG_HORSEMEN = {
+    "gaslighting": "contempt",
+    "manipulation": "criticism",
+    "defensive": "defensiveness",
+    "stonewalling": "stonewalling",
+}
+# Score at which an unflagged "TOXIC" result still counts as criticism
+TOXIC_SCORE_THRESHOLD = 0.5
+
+
+def _severity(score: float) -> str:
+    if score >= 0.7:
+        return "high"
+    return "medium" if score >= 0.4 else "low"
+
+
+def analysis_from_toxicity(result: Dict[str, Any], processing_time_ms: int = 0) -> 'EmailAnalysis':
+    """
+    Map a local ``analyze_toxicity`` result onto an EmailAnalysis.
+
+    Raises:
+        RuntimeError: The local model failed or returned unparseable output
+            (LlamaAnalyzer reports these as SAFE dicts, which must not be
+            delivered as clean)
+    """
+    from .email_toxicity_analyzer import EmailAnalysis
+
+    if result.get("error") or result.get("parse_error"):
+        raise RuntimeError(f"Local analysis failed: {result.get('error', 'unparseable model response')}")
+
+    try:
+        score = min(1.0, max(0.0, float(result.get("toxicity_score") or 0.0)))
+    except (TypeError, ValueError):
+        score = 0.0
+    # Flagged patterns are significant (> 0.5) even when the score is low
+    confidence = max(0.6, score)
+
+    horsemen = [
+        HorsemanDetection(horseman=horseman, confidence=confidence, indicators=[], severity=_severity(score))
+        for flag, horseman in FLAG_HORSEMEN.items()
+        if result.get(flag) in (True, "true")
+    ]
+    if not horsemen and (str(result.get("action", "")).upper() == "TOXIC" or score >= TOXIC_SCORE_THRESHOLD):
+        horsemen.append(HorsemanDetection(
+            horseman="criticism", confidence=confidence, indicators=[], severity=_severity(score)
+        ))
+
+    threat_level = ThreatLevel.from_horsemen(horsemen)
+    return EmailAnalysis(
+        threat_level=threat_level,
+        safe=threat_level == ThreatLevel.SAFE,
+        horsemen_detected=horsemen,
+        reasoning=f"Local model toxicity score {score:.2f}",
+        confidence=0.7,
+        processing_time_ms=processing_time_ms,
+    )
+
+
+class LlamaEmailAnalyzer(IEmailAnalyzer):
+    """IEmailAnalyzer over anything with ``analyze_toxicity`` (LlamaAnalyzer, LlamaWorkerPool)."""
+
+    def __init__(self, analyzer):
+        """
+        Args:
+            analyzer: Local backend; ``analyze_toxicity_async`` is used when present
+        """
+        self._analyzer = analyzer
+
+    @property
+    def wrapped(self):
+        """The local backend."""
+        return self._analyzer
+
+    def __getattr__(self, name: str):
+        # Pool controls (is_saturated, get_stats, shutdown) stay reachable
+        if name == "_analyzer":
+            raise AttributeError(name)
+        return getattr(self._analyzer, name)
+
+    def analyze_email_toxicity(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        started = time.perf_counter()
+        result = self._analyzer.analyze_toxicity(email_content)
+        return analysis_from_toxicity(result, int((time.perf_counter() - started) * 1000))
+
+    async def analyze_email_toxicity_async(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        if not hasattr(self._analyzer, "analyze_toxicity_async"):
+            return await super().analyze_email_toxicity_async(email_content, sender_email)
+        started = time.perf_counter()
+        result = await self._analyzer.analyze_toxicity_async(email_content)
+        return analysis_from_toxicity(result, int((time.perf_counter() - started) * 1000))
+
+    def analyze_fact_presentation(self, fact_text: str, full_email_content: str, sender_email: str) -> str:
+        analyze_fact_manner = getattr(self._analyzer, "analyze_fact_manner", None)
+        if analyze_fact_manner is None:
+            return "neutral"
+        return analyze_fact_manner(fact_text, full_email_content, sender_email)
@@ -0,0 +1,318 @@
+"""
+Process-based local inference workers for privacy mode.
+
+One LlamaAnalyzer in the web process runs one generation at a time and
+shares the GIL with request handling. This pool starts N worker processes,
+each loading its own model with a slice of the CPU budget, all consuming
+one shared request queue. A worker takes one request per wakeup, so idle
+workers pick up queued requests immediately, and collects garbage every
+``gc_interval`` requests rather than after each message. A bounded
+in-flight count gives callers back-pressure, and a pool whose workers all
+failed to load their model refuses requests instead of letting them time
+out.
+"""
+
+import asyncio
+import gc
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional
+
+from .contracts import LLMAnalyzerInterface
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceOverloadedError(RuntimeError):
+    """Raised when the worker pool already holds its maximum of in-flight requests."""
+
+
+class InferenceUnavailableError(RuntimeError):
+    """Raised when no worker process could load the model."""
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name}, using default {default}")
+        return default
+
+
+def _worker_main(request_queue, result_queue, model_path, n_threads, temperature, gc_interval) -> None:
+    """Worker process loop: load one model, then serve one request per wakeup."""
+    from .llama_analyzer import LlamaAnalyzer
+
+    try:
+        analyzer = LlamaAnalyzer(
+            model_path=model_path,
+            n_threads=n_threads,
+            temperature=temperature,
+            collect_garbage=False,
+        )
+    except Exception as e:
+        # Report the failure; a silently dead worker leaves callers waiting
+        result_queue.put(("failed", os.getpid(), str(e)))
+        return
+    result_queue.put(("ready", os.getpid(), None))
+
+    served = 0
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+
+        request_id, content = request
+        try:
+            result_queue.put((request_id, analyzer.analyze_toxicity(content), None))
+        except Exception as e:
+            result_queue.put((request_id, None, str(e)))
+
+        # Drop message content now; pay for a full collection only periodically
+        del request, content
+        served += 1
+        if served % gc_interval == 0:
+            gc.collect()
+
+
+class LlamaWorkerPool(LLMAnalyzerInterface):
+    """Shared request queue in front of N single-model worker processes."""
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        threads_per_worker: int = 4,
+        max_in_flight: Optional[int] = None,
+        gc_interval: int = 4,
+        model_path: Optional[str] = None,
+        temperature: float = 0.1,
+        request_timeout: float = 60.0,
+        start_method: str = "spawn",
+    ):
+        """
+        Args:
+            num_workers: Worker processes (default: CPU count / threads_per_worker)
+            threads_per_worker: llama.cpp threads per model
+            max_in_flight: Queued plus running requests before callers are refused
+            gc_interval: Requests a worker serves between garbage collections
+            model_path: GGUF model path (LlamaAnalyzer's default lookup if None)
+            temperature: Sampling temperature for every worker
+            request_timeout: Seconds a caller waits for its result
+            start_method: multiprocessing start method ("spawn" keeps model memory private)
+        """
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.num_workers = num_workers or max(1, (os.cpu_count() or 1) // self.threads_per_worker)
+        self.max_in_flight = max_in_flight or self.num_workers * 8
+        self.gc_interval = max(1, gc_interval)
+        self.model_path = model_path
+        self.temperature = temperature
+        self.request_timeout = request_timeout
+
+        self._context = multiprocessing.get_context(start_method)
+        self._request_queue = None
+        self._result_queue = None
+        self._processes = []
+        self._reader: Optional[threading.Thread] = None
+        self._futures: Dict[int, Future] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._ready = 0
+        self._failed = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._processes)
+
+    def start(self) -> None:
+        """Spawn the worker processes and the result reader thread."""
+        if self.started:
+            return
+        self._request_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+        for index in range(self.num_workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(
+                    self._request_queue, self._result_queue, self.model_path,
+                    self.threads_per_worker, self.temperature, self.gc_interval,
+                ),
+                name=f"llama-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+        self._reader = threading.Thread(target=self._read_results, name="llama-results", daemon=True)
+        self._reader.start()
+        logger.info(
+            f"Started {self.num_workers} Llama worker processes "
+            f"({self.threads_per_worker} threads each, max {self.max_in_flight} in flight)"
+        )
+
+    def _read_results(self) -> None:
+        while True:
+            item = self._result_queue.get()
+            if item is None:
+                break
+            request_id, result, error = item
+            if request_id == "ready":
+                self._ready += 1
+                continue
+            if request_id == "failed":
+                self._worker_failed(error)
+                continue
+
+            with self._lock:
+                future = self._futures.pop(request_id, None)
+                self._stats["failed" if error else "completed"] += 1
+            if future is None or future.done():
+                continue  # caller timed out
+            if error:
+                future.set_exception(RuntimeError(f"Local inference failed: {error}"))
+            else:
+                future.set_result(result)
+
+    def _worker_failed(self, error: str) -> None:
+        logger.error(f"Llama worker failed to load its model: {error}")
+        with self._lock:
+            self._failed += 1
+            if self.available:
+                return
+            pending, self._futures = list(self._futures.values()), {}
+        # Nobody will ever serve these; fail them now instead of at the timeout
+        for future in pending:
+            if not future.done():
+                future.set_exception(InferenceUnavailableError(f"No Llama worker could load the model: {error}"))
+
+    @property
+    def available(self) -> bool:
+        """False once every worker process has failed to load its model."""
+        return self._failed < self.num_workers
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._futures)
+
+    @property
+    def is_saturated(self) -> bool:
+        """True when new requests would be refused; callers should defer work."""
+        return self.in_flight >= self.max_in_flight
+
+    def submit(self, content: str) -> Future:
+        """Queue content for analysis, refusing it when the pool is saturated."""
+        if not self.started:
+            self.start()
+        with self._lock:
+            if not self.available:
+                raise InferenceUnavailableError("Local inference unavailable: no Llama worker could load the model")
+            if len(self._futures) >= self.max_in_flight:
+                self._stats["rejected"] += 1
+                raise InferenceOverloadedError(
+                    f"Local inference saturated ({self.max_in_flight} requests in flight)"
+                )
+            request_id = next(self._ids)
+            future: Future = Future()
+            future.request_id = request_id
+            self._futures[request_id] = future
+        self._request_queue.put((request_id, content))
+        return future
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._futures.pop(future.request_id, None)
+
+    def analyze_toxicity(self, content: str) -> Dict[str, Any]:
+        future = self.submit(content)
+        try:
+            return future.result(timeout=self.request_timeout)
+        except FutureTimeoutError:
+            self._forget(future)
+            raise
+
+    async def analyze_toxicity_async(self, content: str) -> Dict[str, Any]:
+        future = self.submit(content)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.request_timeout)
+        except asyncio.TimeoutError:
+            self._forget(future)
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(
+            workers=self.num_workers,
+            workers_ready=self._ready,
+            workers_failed=self._failed,
+            in_flight=self.in_flight,
+            max_in_flight=self.max_in_flight,
+        )
+        return stats
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop workers, fail outstanding requests and stop the reader thread."""
+        if not self.started:
+            return
+        for _ in self._processes:
+            self._request_queue.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+        self._result_queue.put(None)
+        if self._reader is not None:
+            self._reader.join(timeout)
+            self._reader = None
+
+        with self._lock:
+            pending, self._futures = list(self._futures.values()), {}
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Llama worker pool shut down"))
+        logger.info("Llama worker pool shut down")
+
+
+_pool: Optional[LlamaWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_llama_worker_pool() -> LlamaWorkerPool:
+    """
+    Get the process-wide worker pool, creating it on first use.
+
+    LLAMA_WORKERS, LLAMA_THREADS_PER_WORKER, LLAMA_MAX_IN_FLIGHT,
+    LLAMA_WORKER_GC_INTERVAL and LLAMA_MODEL_PATH configure it.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = LlamaWorkerPool(
+                    num_workers=_env_number("LLAMA_WORKERS", 0) or None,
+                    threads_per_worker=_env_number("LLAMA_THREADS_PER_WORKER", 4),
+                    max_in_flight=_env_number("LLAMA_MAX_IN_FLIGHT", 0) or None,
+                    gc_interval=_env_number("LLAMA_WORKER_GC_INTERVAL", 4),
+                    model_path=os.getenv("LLAMA_MODEL_PATH") or None,
+                )
+    return _pool
+
+
+def current_llama_worker_pool() -> Optional[LlamaWorkerPool]:
+    """The running pool, or None when privacy-mode workers are not in use."""
+    return _pool if _pool is not None and _pool.started else None
+
+
+def shutdown_llama_worker_pool() -> None:
+    """Stop the shared pool (called from the application lifespan)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -1,7 +1,10 @@
 """MemoryManager for in-memory email storage with capacity limits."""
 
-import asyncio
-from typing import Dict, Optional, List
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, Optional, List, Tuple
 from .ephemeral_email import EphemeralEmail
 from .contracts import MemoryStorageInterface
 
@@ -15,33 +18,147 @@ class MemoryManager(MemoryStorageInterface):
     high-concurrency email processing without persistence.
     
     Features:
-    - Configurable capacity limits to prevent memory exhaustion
-    - Automatic TTL-based cleanup of expired emails  
-    - Thread-safe operations using asyncio locks
+    - Configurable capacity limits (email count and byte budget) to prevent
+      memory exhaustion, with optional compression of waiting bodies
+    - Automatic TTL-based cleanup of expired emails, indexed by a min-heap
+      of expiry times so cleanup costs O(expired) rather than O(stored)
+    - Thread-safe operations: sync and async callers share one re-entrant
+      lock, which is never held across an await
     - Memory-efficient storage with minimal overhead
     """
     
-    def __init__(self, capacity: int = 100, max_concurrent: int = None):
+    def __init__(
+        self,
+        capacity: int = 100,
+        max_concurrent: int = None,
+        max_bytes: Optional[int] = None,
+        compression: Optional[str] = None,
+        compression_min_bytes: int = 1024
+    ):
         """
         Initialize MemoryManager with capacity limit.
         
         Args:
             capacity: Maximum number of emails to store concurrently (default: 100)
             max_concurrent: Deprecated alias for capacity (backward compatibility)
+            max_bytes: Byte budget across all stored emails (None = count limit only)
+            compression: "zlib" or "zstd" to hold bodies compressed (None = off)
+            compression_min_bytes: Bodies smaller than this are stored as-is
         """
         if max_concurrent is not None:
             self.max_concurrent = max_concurrent
         else:
             self.max_concurrent = capacity
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.compression_min_bytes = compression_min_bytes
         self._emails: Dict[str, EphemeralEmail] = {}
-        self._lock = None  # Will be created when needed for async operations
+        self._lock = threading.RLock()
+        
+        # Byte accounting per message: (total size, plain body size, stored body size)
+        self._sizes: Dict[str, Tuple[int, int, int]] = {}
+        self._bytes_used = 0
+        self._body_bytes_plain = 0
+        self._body_bytes_stored = 0
+        self._rejections = 0
+        
+        # Expiry index: (expires_at, seq, message_id). Entries are never updated
+        # in place; a TTL change pushes a new entry and the stale one is skipped.
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._expiry_seq = itertools.count()
+    
+    def _schedule_expiry(self, email: EphemeralEmail) -> None:
+        """Index (or re-index) an email's expiry time."""
+        heap = self._expiry_heap
+        if len(heap) > 2 * len(self._emails) + 64:
+            # Mostly stale entries from removed or rescheduled emails: rebuild
+            heap[:] = [
+                (stored.expires_at, next(self._expiry_seq), message_id)
+                for message_id, stored in self._emails.items()
+            ]
+            heapq.heapify(heap)
+            if self._emails.get(email.message_id) is email:
+                return
+        heapq.heappush(heap, (email.expires_at, next(self._expiry_seq), email.message_id))
+    
+    def _on_email_changed(self, email: EphemeralEmail, name: str) -> None:
+        """Keep the expiry index and byte accounting in step with field changes."""
+        with self._lock:
+            if self._emails.get(email.message_id) is not email:
+                return
+            if name in ("_created_at", "ttl_seconds"):
+                self._schedule_expiry(email)
+            else:
+                self._account(email)
+    
+    def _account(self, email: EphemeralEmail, size: Optional[int] = None) -> None:
+        """(Re)charge an email's footprint against the byte budget."""
+        self._unaccount(email.message_id)
+        entry = (
+            email.size_bytes if size is None else size,
+            email.uncompressed_body_bytes,
+            email.stored_body_bytes
+        )
+        self._sizes[email.message_id] = entry
+        self._bytes_used += entry[0]
+        self._body_bytes_plain += entry[1]
+        self._body_bytes_stored += entry[2]
+    
+    def _unaccount(self, message_id: str) -> None:
+        entry = self._sizes.pop(message_id, None)
+        if entry is not None:
+            self._bytes_used -= entry[0]
+            self._body_bytes_plain -= entry[1]
+            self._body_bytes_stored -= entry[2]
+    
+    def _try_insert(self, email: EphemeralEmail) -> bool:
+        """Admit an email if both the count and byte limits allow it."""
+        if len(self._emails) >= self.max_concurrent:
+            self._rejections += 1
+            return False
+        
+        if self.compression:
+            email.compress_bodies(self.compression, self.compression_min_bytes)
+        size = email.size_bytes
+        if self.max_bytes is not None:
+            replaced = self._sizes.get(email.message_id, (0, 0, 0))[0]
+            if self._bytes_used - replaced + size > self.max_bytes:
+                self._rejections += 1
+                return False
+        
+        self._discard(email.message_id)
+        self._emails[email.message_id] = email
+        email._memory_listener = self._on_email_changed
+        self._account(email, size)
+        self._schedule_expiry(email)
+        return True
+    
+    def _discard(self, message_id: str) -> bool:
+        email = self._emails.pop(message_id, None)
+        if email is None:
+            return False
+        email._memory_listener = None
+        self._unaccount(message_id)
+        return True
+    
+    def _pop_expired(self, cutoff: float, limit: Optional[int]) -> int:
+        """Remove emails whose expiry time is before cutoff, earliest first."""
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] < cutoff and (limit is None or removed < limit):
+            expires_at, _, message_id = heapq.heappop(heap)
+            email = self._emails.get(message_id)
+            if email is None or email.expires_at != expires_at:
+                continue  # already removed, or superseded by a newer index entry
+            self._discard(message_id)
+            removed += 1
+        return removed
     
     def store_email(self, email: EphemeralEmail) -> bool:
         """
         Store an email in memory (synchronous for simplicity).
         
-        Note: This method is synchronous for ease of use in webhook contexts.
-        For thread safety in high-concurrency scenarios, use async methods.
+        Safe to call from any thread; takes the same lock as the async methods.
         
         Args:
             email: EphemeralEmail instance to store
@@ -49,11 +166,8 @@ class MemoryManager(MemoryStorageInterface):
         Returns:
             True if stored successfully, False if at capacity
         """
-        if len(self._emails) >= self.max_concurrent:
-            return False
-        
-        self._emails[email.message_id] = email
-        return True
+        with self._lock:
+            return self._try_insert(email)
     
     def get_email(self, message_id: str) -> Optional[EphemeralEmail]:
         """
@@ -65,13 +179,8 @@ class MemoryManager(MemoryStorageInterface):
         Returns:
             EphemeralEmail if found, None otherwise
         """
-        return self._emails.get(message_id)
-    
-    def _get_lock(self) -> asyncio.Lock:
-        """Get or create the async lock."""
-        if self._lock is None:
-            self._lock = asyncio.Lock()
-        return self._lock
+        with self._lock:
+            return self._emails.get(message_id)
     
     async def store_email_async(self, email: EphemeralEmail) -> bool:
         """
@@ -83,12 +192,8 @@ class MemoryManager(MemoryStorageInterface):
         Returns:
             True if stored successfully, False if at capacity
         """
-        async with self._get_lock():
-            if len(self._emails) >= self.max_concurrent:
-                return False
-            
-            self._emails[email.message_id] = email
-            return True
+        with self._lock:
+            return self._try_insert(email)
     
     async def get_email_async(self, message_id: str) -> Optional[EphemeralEmail]:
         """
@@ -100,29 +205,37 @@ class MemoryManager(MemoryStorageInterface):
         Returns:
             EphemeralEmail if found, None otherwise
         """
-        async with self._get_lock():
+        with self._lock:
             return self._emails.get(message_id)
     
-    async def cleanup_expired(self) -> int:
+    async def contains_email_async(self, message_id: str) -> bool:
+        """
+        Check whether an email with this message ID is already held.
+        
+        Args:
+            message_id: Unique identifier of the email
+            
+        Returns:
+            True if the email is stored, False otherwise
+        """
+        with self._lock:
+            return message_id in self._emails
+    
+    async def cleanup_expired(self, grace_seconds: float = 0.0, limit: Optional[int] = None) -> int:
         """
         Thread-safe removal of expired emails from memory.
         
+        Only emails that are actually expired are visited, in expiry order.
+        
+        Args:
+            grace_seconds: Keep emails until this long after their TTL
+            limit: Maximum number of emails to remove in this call
+        
         Returns:
             Number of emails cleaned up
         """
-        async with self._get_lock():
-            expired_ids = []
-            
-            # Find expired emails
-            for message_id, email in self._emails.items():
-                if email.is_expired:
-                    expired_ids.append(message_id)
-            
-            # Remove expired emails
-            for message_id in expired_ids:
-                del self._emails[message_id]
-            
-            return len(expired_ids)
+        with self._lock:
+            return self._pop_expired(time.time() - grace_seconds, limit)
     
     async def get_all_emails(self) -> List[EphemeralEmail]:
         """
@@ -131,7 +244,7 @@ class MemoryManager(MemoryStorageInterface):
         Returns:
             List of all EphemeralEmail objects
         """
-        async with self._get_lock():
+        with self._lock:
             return list(self._emails.values())
     
     async def remove_email(self, message_id: str) -> bool:
@@ -144,11 +257,8 @@ class MemoryManager(MemoryStorageInterface):
         Returns:
             True if email was found and removed, False otherwise
         """
-        async with self._get_lock():
-            if message_id in self._emails:
-                del self._emails[message_id]
-                return True
-            return False
+        with self._lock:
+            return self._discard(message_id)
     
     # Additional async methods for test compatibility (with different names to avoid conflicts)
     async def store_email_safe(self, email: EphemeralEmail) -> bool:
@@ -159,15 +269,25 @@ class MemoryManager(MemoryStorageInterface):
         """Thread-safe async alias for getting email."""
         return await self.get_email_async(message_id)
     
-    def get_stats(self) -> Dict[str, int]:
+    def get_stats(self) -> Dict[str, Any]:
         """
         Get current memory usage statistics.
         
         Returns:
-            Dictionary with current email count and capacity info
+            Dictionary with email count, byte usage, compression and capacity info
         """
-        return {
-            'current_emails': len(self._emails),
-            'max_concurrent': self.max_concurrent,
-            'available_slots': self.max_concurrent - len(self._emails)
-        }
\ No newline at end of file
+        with self._lock:
+            stats = {
+                'current_emails': len(self._emails),
+                'max_concurrent': self.max_concurrent,
+                'available_slots': self.max_concurrent - len(self._emails),
+                'bytes_used': self._bytes_used,
+                'max_bytes': self.max_bytes,
+                'rejected_emails': self._rejections,
+                'compression_ratio': (
+                    self._body_bytes_stored / self._body_bytes_plain if self._body_bytes_plain else 1.0
+                )
+            }
+            if self.max_bytes is not None:
+                stats['available_bytes'] = max(0, self.max_bytes - self._bytes_used)
+        return stats
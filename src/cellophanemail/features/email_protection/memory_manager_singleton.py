@@ -1,25 +1,60 @@
 """Singleton MemoryManager for shared use across the application."""
 
+import logging
+import os
+
+from typing import Union
+
 from .memory_manager import MemoryManager
+from .redis_memory_store import RedisMemoryStore, create_redis_memory_store
+from .sharded_memory_manager import ShardedMemoryManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
 
 # Global singleton instance
 _memory_manager_instance = None
 
 
-def get_memory_manager() -> MemoryManager:
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name}, using default {default}")
+        return default
+
+
+def get_memory_manager() -> Union[MemoryManager, ShardedMemoryManager, RedisMemoryStore]:
     """
     Get the shared MemoryManager singleton instance.
     
     This ensures all components use the same memory manager for
-    consistent email storage and cleanup.
+    consistent email storage and cleanup. MEMORY_MAX_EMAILS,
+    MEMORY_MAX_BYTES, MEMORY_BODY_COMPRESSION ("zlib", "zstd" or unset)
+    and MEMORY_SHARDS (above 1 selects the sharded store) configure it.
+    MEMORY_BACKEND=redis shares one encrypted store across all worker
+    processes instead (falling back to per-process memory if unavailable).
     
     Returns:
         MemoryManager: Shared memory manager instance
     """
     global _memory_manager_instance
     
+    if _memory_manager_instance is None and os.getenv("MEMORY_BACKEND", "memory").lower() == "redis":
+        _memory_manager_instance = create_redis_memory_store(capacity=_env_number("MEMORY_MAX_EMAILS", 100))
+    
     if _memory_manager_instance is None:
-        _memory_manager_instance = MemoryManager(capacity=100)
+        options = dict(
+            capacity=_env_number("MEMORY_MAX_EMAILS", 100),
+            max_bytes=_env_number("MEMORY_MAX_BYTES", DEFAULT_MAX_BYTES) or None,
+            compression=os.getenv("MEMORY_BODY_COMPRESSION") or None
+        )
+        shards = _env_number("MEMORY_SHARDS", 1)
+        if shards > 1:
+            _memory_manager_instance = ShardedMemoryManager(shards=shards, **options)
+        else:
+            _memory_manager_instance = MemoryManager(**options)
     
     return _memory_manager_instance
 
@@ -106,6 +106,12 @@ class MockAnalyzer(IEmailAnalyzer):
             language_detected="en"
         )
 
+    async def analyze_email_toxicity_async(self, email_content: str, sender_email: str) -> EmailAnalysis:
+        """
+        Mock async analysis - responses are instant, so no executor hop is needed.
+        """
+        return self.analyze_email_toxicity(email_content, sender_email)
+
     def analyze_fact_presentation(self, fact_text: str, full_email_content: str, sender_email: str) -> str:
         """
         Mock fact presentation analysis.
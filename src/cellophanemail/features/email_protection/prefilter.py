@@ -0,0 +1,275 @@
+"""
+Heuristic pre-filter that clears obviously clean messages before the LLM.
+
+The pre-filter is an allow-list: a message is classified SAFE locally only
+when it is short, never addresses the reader, and every clause matches one
+of a fixed set of acknowledgement or logistics phrasings ("On my way, 5
+mins", "Thanks, sounds good", "Meeting moved to 1pm"). Everything else,
+including threats made of ordinary words and non-English text, escalates
+to the wrapped LLM analyzer, so the pre-filter can only save calls, never
+add detections.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .analyzer_interface import IEmailAnalyzer
+from .models import ThreatLevel
+
+logger = logging.getLogger(__name__)
+
+# Lexicons shared with InMemoryProcessor's heuristic and redaction paths
+CONTEMPT_WORDS = ['worthless', 'pathetic', 'disgusting', 'loser', 'idiot']
+CRITICISM_WORDS = ['terrible', 'awful', 'stupid', 'incompetent']
+MILD_WORDS = ['annoying', 'frustrating', 'disappointing']
+REDACTION_WORDS = ['hate', 'stupid', 'idiot', 'disgusting', 'pathetic', 'terrible', 'awful']
+
+# Cues that are not toxic on their own but need the LLM to judge context
+ESCALATION_CUES = [
+    # criticism / defensiveness framing
+    'you always', 'you never', 'your fault', 'not my fault', 'why do you',
+    'why would you', 'how dare', 'blame',
+    # stonewalling / dismissal
+    'whatever', 'leave me alone', "don't care", 'dont care', 'shut up',
+    'done with you', 'not talking',
+    # contempt / profanity
+    'ugh', 'seriously?', 'moron', 'dumb', 'useless', 'lazy', 'liar',
+    'damn', 'hell', 'shit', 'fuck', 'crap', 'bitch', 'ass', 'screw you',
+    # threats
+    'kill', 'hurt you', 'regret', 'or else', 'watch out',
+]
+
+# Building blocks for the clearance templates below
+_COUNT = r"\d{1,3}"
+_TIME = r"(?:\d{1,2}(?::\d{2})? ?(?:am|pm)|\d{1,2}:\d{2}|noon|midnight)"
+_DAY = r"(?:today|tonight|tomorrow|monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+_WHEN = rf"(?:{_TIME}|{_DAY}(?: (?:at )?{_TIME})?)"
+_DURATION = rf"{_COUNT} ?(?:min|mins|minutes|hr|hrs|hour|hours)"
+_PLACE = rf"(?: in (?:room {_COUNT}|the lobby|the office))?"
+_EVENT = r"(?:the )?(?:meeting|call|lunch|dinner|breakfast|coffee|appointment|practice|class|pickup)"
+_ACKNOWLEDGEMENT = (
+    r"(?:ok|okay|k|kk|sure|yes|yep|yeah|yup|noted|thanks|thx|ty|cheers|cool|great|perfect|"
+    r"got it|sounds good|works for me|received|confirmed|agreed|will do|no problem|np|all good|"
+    r"hi|hello|hey|bye|good morning|morning)"
+)
+_FIRST_PERSON = r"(?:i'm |im |i am )?"
+_FIRST_PERSON_FUTURE = r"(?:i'll|ill|i will|we'll|we will)"
+
+# Fixed acknowledgement and logistics phrasings. A message is cleared locally
+# only when every clause matches one of these in full; they contain no
+# second person and no imperatives, so threats built from ordinary words
+# ("I will get you", "Go home") never match.
+CLEARANCE_TEMPLATES = [
+    rf"{_ACKNOWLEDGEMENT}(?: {_ACKNOWLEDGEMENT})*",
+    rf"{_FIRST_PERSON}(?:on my way|omw|heading (?:home|back|over|out))",
+    rf"{_FIRST_PERSON}running (?:about )?(?:{_DURATION} )?late",
+    rf"{_FIRST_PERSON_FUTURE} be (?:there|home|back) (?:in {_DURATION}|soon|by {_WHEN}|at {_WHEN})",
+    rf"(?:eta )?{_DURATION}(?: away)?",
+    rf"eta {_WHEN}",
+    r"(?:just )?(?:landed|arrived|boarding|here|home|back)",
+    rf"{_EVENT} (?:is )?(?:moved|rescheduled|pushed) to {_WHEN}{_PLACE}",
+    rf"{_EVENT} (?:is )?(?:at|on) {_WHEN}{_PLACE}",
+    rf"{_EVENT} (?:is )?(?:cancelled|canceled|confirmed)",
+    r"(?:the )?(?:invoice|receipt|file|document|slides|agenda|notes) (?:is |are )?attached",
+    r"(?:the )?(?:order|package) (?:has been |was )?(?:shipped|delivered)",
+]
+# Subject lines may also be a bare topic ("Subject: Re: Lunch")
+_SUBJECT_TOPIC = (
+    rf"(?:meeting|call|lunch|dinner|invoice|receipt|order|schedule|agenda|notes|reminder|update)"
+    rf"(?: {_WHEN})?"
+)
+_TEMPLATE_RE = re.compile("|".join(f"(?:{t})" for t in CLEARANCE_TEMPLATES))
+_SUBJECT_RE = re.compile(rf"subject: (?:(?:re|fwd?): ?)*(?P<topic>.+)")
+_SUBJECT_TOPIC_RE = re.compile(_SUBJECT_TOPIC)
+
+_WORD_RE = re.compile(r"\w+")
+_CLAUSE_SPLIT_RE = re.compile(r"[.,;!\n]+")
+_SECOND_PERSON_RE = re.compile(r"\b(?:you|your|you're|youre|yours|yourself|u|ur|ya|y'all)\b", re.IGNORECASE)
+_SHOUTING_RE = re.compile(r"\b[A-Z]{3,}\b")
+_PUNCTUATION_RUN_RE = re.compile(r"[!?]{2,}")
+
+
+def _compile_lexicon(terms: List[str]) -> "re.Pattern":
+    """One alternation for all terms, longest first, matched on word boundaries."""
+    alternation = "|".join(
+        re.escape(term) for term in sorted(set(terms), key=len, reverse=True)
+    )
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+
+_LEXICON_RE = _compile_lexicon(
+    CONTEMPT_WORDS + CRITICISM_WORDS + MILD_WORDS + REDACTION_WORDS + ESCALATION_CUES
+)
+
+
+@dataclass
+class PrefilterResult:
+    """Outcome of the local pre-classification."""
+    escalate: bool
+    threat_level: ThreatLevel
+    confidence: float
+    reason: str
+    matched_terms: List[str] = field(default_factory=list)
+
+
+class HeuristicPrefilter:
+    """Fast local classifier that decides whether a message needs the LLM."""
+
+    def __init__(self, max_tokens: int = 30):
+        """
+        Args:
+            max_tokens: Longer messages always go to the LLM
+        """
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._stats = {'evaluated': 0, 'short_circuited': 0, 'escalated': 0}
+
+    def classify(self, content: str) -> PrefilterResult:
+        """Classify content as confidently SAFE or escalate it."""
+        result = self._classify(content or "")
+        with self._lock:
+            self._stats['evaluated'] += 1
+            self._stats['escalated' if result.escalate else 'short_circuited'] += 1
+        return result
+
+    def _classify(self, content: str) -> PrefilterResult:
+        token_count = len(_WORD_RE.findall(content))
+        if token_count == 0:
+            return self._escalate("empty or non-text content")
+        if token_count > self.max_tokens:
+            return self._escalate(f"{token_count} tokens exceeds pre-filter limit")
+
+        matches = [m.group(0).lower() for m in _LEXICON_RE.finditer(content)]
+        if matches:
+            return self._escalate("toxicity cues present", matches)
+        if _SECOND_PERSON_RE.search(content):
+            return self._escalate("second-person framing")
+        if _SHOUTING_RE.search(content):
+            return self._escalate("shouting")
+        if _PUNCTUATION_RUN_RE.search(content):
+            return self._escalate("emphatic punctuation")
+        if not all(self._matches_template(clause) for clause in self._clauses(content)):
+            # Anything outside the fixed phrasings is for the LLM to judge
+            return self._escalate("no acknowledgement/logistics template match")
+
+        # Shorter clean messages leave less room for subtle hostility
+        confidence = round(0.95 - 0.15 * token_count / self.max_tokens, 2)
+        return PrefilterResult(
+            escalate=False,
+            threat_level=ThreatLevel.SAFE,
+            confidence=confidence,
+            reason=f"short ({token_count} tokens) benign logistics/acknowledgement",
+        )
+
+    @staticmethod
+    def _clauses(content: str) -> List[str]:
+        normalized = content.lower().replace("\u2019", "'")
+        clauses = (" ".join(part.split()) for part in _CLAUSE_SPLIT_RE.split(normalized))
+        return [clause for clause in clauses if clause]
+
+    @staticmethod
+    def _matches_template(clause: str) -> bool:
+        subject = _SUBJECT_RE.fullmatch(clause)
+        if subject:
+            topic = subject.group("topic")
+            return bool(_SUBJECT_TOPIC_RE.fullmatch(topic) or _TEMPLATE_RE.fullmatch(topic))
+        return bool(_TEMPLATE_RE.fullmatch(clause))
+
+    @staticmethod
+    def _escalate(reason: str, matches: Optional[List[str]] = None) -> PrefilterResult:
+        return PrefilterResult(
+            escalate=True,
+            threat_level=ThreatLevel.SAFE,
+            confidence=0.0,
+            reason=reason,
+            matched_terms=list(dict.fromkeys(matches or [])),
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counts of evaluated, short-circuited (LLM calls avoided) and escalated messages."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['llm_calls_avoided'] = stats['short_circuited']
+        return stats
+
+
+class PrefilteredAnalyzer(IEmailAnalyzer):
+    """IEmailAnalyzer decorator that only calls the wrapped analyzer for uncertain messages."""
+
+    def __init__(self, analyzer: IEmailAnalyzer, prefilter: Optional[HeuristicPrefilter] = None, metrics_collector=None):
+        self._analyzer = analyzer
+        self._prefilter = prefilter or get_prefilter()
+        self._metrics = metrics_collector
+        if self._metrics is None:
+            from ..monitoring.metrics_collector import get_metrics_collector
+            self._metrics = get_metrics_collector()
+
+    @property
+    def wrapped(self) -> IEmailAnalyzer:
+        """The undecorated analyzer."""
+        return self._analyzer
+
+    @property
+    def prefilter(self) -> HeuristicPrefilter:
+        return self._prefilter
+
+    def __getattr__(self, name: str):
+        if name == "_analyzer":
+            raise AttributeError(name)
+        return getattr(self._analyzer, name)
+
+    def _local_result(self, content: str) -> Optional['EmailAnalysis']:
+        started = time.perf_counter()
+        decision = self._prefilter.classify(content)
+        self._metrics.record_prefilter_decision(escalated=decision.escalate)
+        if decision.escalate:
+            return None
+
+        from .email_toxicity_analyzer import EmailAnalysis
+        return EmailAnalysis(
+            threat_level=decision.threat_level,
+            safe=True,
+            horsemen_detected=[],
+            reasoning=f"Pre-filter: {decision.reason}",
+            confidence=decision.confidence,
+            processing_time_ms=int((time.perf_counter() - started) * 1000),
+        )
+
+    def analyze_email_toxicity(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        local = self._local_result(email_content)
+        if local is not None:
+            return local
+        return self._analyzer.analyze_email_toxicity(email_content, sender_email)
+
+    async def analyze_email_toxicity_async(self, email_content: str, sender_email: str) -> 'EmailAnalysis':
+        local = self._local_result(email_content)
+        if local is not None:
+            return local
+        return await self._analyzer.analyze_email_toxicity_async(email_content, sender_email)
+
+    def analyze_fact_presentation(self, fact_text: str, full_email_content: str, sender_email: str) -> str:
+        return self._analyzer.analyze_fact_presentation(fact_text, full_email_content, sender_email)
+
+
+_prefilter: Optional[HeuristicPrefilter] = None
+_prefilter_lock = threading.Lock()
+
+
+def get_prefilter() -> HeuristicPrefilter:
+    """Get the process-wide pre-filter (configured by ANALYSIS_PREFILTER_MAX_TOKENS)."""
+    global _prefilter
+    if _prefilter is None:
+        with _prefilter_lock:
+            if _prefilter is None:
+                try:
+                    max_tokens = int(os.getenv("ANALYSIS_PREFILTER_MAX_TOKENS", "30"))
+                except ValueError:
+                    logger.warning("Invalid ANALYSIS_PREFILTER_MAX_TOKENS, using default")
+                    max_tokens = 30
+                _prefilter = HeuristicPrefilter(max_tokens=max_tokens)
+    return _prefilter
@@ -0,0 +1,115 @@
+"""
+Single-pass redaction of toxic terms and LLM-reported indicator phrases.
+
+All terms are compiled into one word-boundary-aware alternation (longest
+first), so a body is scanned once regardless of lexicon size. The static
+lexicon pattern is compiled once per engine. Indicator phrases reported by
+the LLM are verbatim email snippets, so their patterns are compiled per call
+and never kept in a module-level cache.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .prefilter import REDACTION_WORDS
+
+REDACTION_MARKER = "[REDACTED]"
+
+# Indicators shorter than this are too likely to hit innocent words
+MIN_INDICATOR_LENGTH = 3
+MAX_INDICATOR_LENGTH = 200
+
+
+@dataclass(frozen=True)
+class RedactionSpan:
+    """A redacted range of the original content."""
+    start: int
+    end: int
+    text: str
+    source: str  # "lexicon" or "indicator"
+
+
+@dataclass
+class RedactionResult:
+    """Redacted content plus the spans that were replaced."""
+    content: str
+    spans: List[RedactionSpan] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.spans)
+
+
+def _alternation(terms: Iterable[str]) -> str:
+    unique = {term.strip() for term in terms if term and term.strip()}
+    return "|".join(re.escape(term) for term in sorted(unique, key=len, reverse=True))
+
+
+def _compile(lexicon: Tuple[str, ...], indicators: Tuple[str, ...]) -> "re.Pattern":
+    groups = []
+    if indicators:
+        groups.append(f"(?P<indicator>{_alternation(indicators)})")
+    if lexicon:
+        groups.append(f"(?P<lexicon>{_alternation(lexicon)})")
+    # Indicators come first so a longer reported phrase wins over a lexicon word inside it
+    return re.compile(rf"(?<!\w)(?:{'|'.join(groups)})(?!\w)", re.IGNORECASE)
+
+
+def _clean_indicators(indicators: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    cleaned = set()
+    for phrase in indicators or ():
+        phrase = (phrase or "").strip().strip("\"'“”‘’")
+        if MIN_INDICATOR_LENGTH <= len(phrase) <= MAX_INDICATOR_LENGTH:
+            cleaned.add(phrase)
+    return tuple(sorted(cleaned))
+
+
+class RedactionEngine:
+    """Precompiled redactor for a fixed lexicon plus per-message indicators."""
+
+    def __init__(self, terms: Sequence[str] = REDACTION_WORDS, marker: str = REDACTION_MARKER):
+        self.terms = tuple(sorted({t.lower() for t in terms}))
+        self.marker = marker
+        self._pattern = _compile(self.terms, ())
+
+    def redact(self, content: str, indicators: Optional[Iterable[str]] = None) -> RedactionResult:
+        """
+        Redact lexicon terms and indicator phrases in a single scan.
+
+        Args:
+            content: Text to redact
+            indicators: Extra phrases to redact (e.g. HorsemanDetection.indicators)
+
+        Returns:
+            RedactionResult with spans relative to the original content
+        """
+        if not content:
+            return RedactionResult(content=content or "")
+
+        extra = _clean_indicators(indicators)
+        pattern = _compile(self.terms, extra) if extra else self._pattern
+        spans: List[RedactionSpan] = []
+
+        def replace(match: "re.Match") -> str:
+            spans.append(RedactionSpan(
+                start=match.start(),
+                end=match.end(),
+                text=match.group(0),
+                source=match.lastgroup or "lexicon",
+            ))
+            return self.marker
+
+        return RedactionResult(content=pattern.sub(replace, content), spans=spans)
+
+
+# Built once at import for the default lexicon
+default_redaction_engine = RedactionEngine()
+
+
+def indicators_from_horsemen(horsemen: Optional[Iterable]) -> List[str]:
+    """Collect indicator phrases from HorsemanDetection objects."""
+    phrases: List[str] = []
+    for detection in horsemen or ():
+        phrases.extend(getattr(detection, "indicators", None) or [])
+    return phrases
@@ -0,0 +1,232 @@
+"""
+Redis-backed ephemeral email store shared by all worker processes.
+
+The per-process MemoryManager gives each uvicorn worker its own capacity,
+cleanup and view of in-flight mail. This store keeps ephemeral emails in
+Redis instead (still never in the database): each email is one key with
+a Redis-native TTL, and a sorted set indexed by expiry time backs capacity
+checks and cleanup. Records are Fernet-encrypted before they leave the
+process, so Redis memory, replicas and dumps never hold plaintext mail.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from .contracts import MemoryStorageInterface
+from .ephemeral_email import EphemeralEmail
+
+# Optional Redis import with graceful degradation
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cellophanemail:ephemeral:"
+INDEX_KEY = "cellophanemail:ephemeral-index"
+
+_FIELDS = (
+    "message_id", "from_address", "to_addresses", "subject", "text_body",
+    "user_email", "ttl_seconds", "html_body", "message_id_header",
+    "in_reply_to", "references",
+)
+
+
+def fernet_from_secret(secret: str) -> Fernet:
+    """Build a Fernet cipher from a Fernet key or, failing that, any secret string."""
+    try:
+        return Fernet(secret)
+    except (ValueError, TypeError):
+        digest = hashlib.sha256(secret.encode("utf-8")).digest()
+        return Fernet(base64.urlsafe_b64encode(digest))
+
+
+class RedisMemoryStore(MemoryStorageInterface):
+    """
+    Cross-process ephemeral email store with the MemoryManager API.
+
+    Emails returned by get methods are decrypted copies; changing them does
+    not update the stored record. The capacity check and insert are separate
+    commands, so concurrent workers can overshoot capacity by a few emails.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        encryption_key: str = "",
+        capacity: int = 100,
+        client=None
+    ):
+        """
+        Args:
+            redis_url: Redis server (ignored when client is given)
+            encryption_key: Secret shared by all workers; records are unreadable without it
+            capacity: Maximum number of emails across all workers
+            client: Pre-built redis client (tests, shared pools)
+
+        Raises:
+            ValueError: If no encryption key is given
+            RuntimeError: If Redis is not installed or unreachable
+        """
+        if not encryption_key:
+            raise ValueError("An encryption key is required for the shared ephemeral store")
+        self._cipher = fernet_from_secret(encryption_key)
+        self.max_concurrent = capacity
+        self._rejections = 0
+
+        self.redis_client = client
+        if self.redis_client is None:
+            if not REDIS_AVAILABLE:
+                raise RuntimeError("Redis not installed")
+            self.redis_client = redis.from_url(
+                redis_url,
+                socket_connect_timeout=2,
+                socket_timeout=0.5,
+                health_check_interval=30
+            )
+            self.redis_client.ping()
+
+    def _encrypt(self, email: EphemeralEmail) -> bytes:
+        record = {name: getattr(email, name) for name in _FIELDS}
+        record["created_at"] = email._created_at
+        return self._cipher.encrypt(json.dumps(record).encode("utf-8"))
+
+    def _decrypt(self, token: Optional[bytes]) -> Optional[EphemeralEmail]:
+        if token is None:
+            return None
+        try:
+            record = json.loads(self._cipher.decrypt(token))
+        except InvalidToken:
+            logger.error("Ephemeral email record could not be decrypted (key mismatch?)")
+            return None
+        created_at = record.pop("created_at")
+        email = EphemeralEmail(**record)
+        email._created_at = created_at
+        return email
+
+    def _prune_index(self, cutoff: float, limit: Optional[int] = None) -> List[str]:
+        """Drop index entries that expired before cutoff; returns their message IDs."""
+        if limit is None:
+            expired = self.redis_client.zrangebyscore(INDEX_KEY, "-inf", f"({cutoff}")
+        else:
+            expired = self.redis_client.zrangebyscore(INDEX_KEY, "-inf", f"({cutoff}", start=0, num=limit)
+        message_ids = [m.decode() if isinstance(m, bytes) else m for m in expired]
+        if message_ids:
+            self.redis_client.zrem(INDEX_KEY, *message_ids)
+            self.redis_client.delete(*[KEY_PREFIX + m for m in message_ids])
+        return message_ids
+
+    def store_email(self, email: EphemeralEmail) -> bool:
+        """
+        Store an encrypted email with a Redis TTL equal to its remaining lifetime.
+
+        An existing record for the same message ID is kept as is (SET NX), so
+        a provider retry never replaces an email another worker is processing.
+
+        Returns:
+            True if stored (or already stored), False if at capacity
+        """
+        self._prune_index(time.time())
+        if (
+            self.redis_client.zcard(INDEX_KEY) >= self.max_concurrent
+            and self.redis_client.zscore(INDEX_KEY, email.message_id) is None
+        ):
+            self._rejections += 1
+            return False
+
+        ttl = max(1, int(email.expires_at - time.time() + 0.999))
+        pipe = self.redis_client.pipeline()
+        pipe.set(KEY_PREFIX + email.message_id, self._encrypt(email), ex=ttl, nx=True)
+        pipe.zadd(INDEX_KEY, {email.message_id: email.expires_at}, nx=True)
+        pipe.execute()
+        return True
+
+    def get_email(self, message_id: str) -> Optional[EphemeralEmail]:
+        return self._decrypt(self.redis_client.get(KEY_PREFIX + message_id))
+
+    def contains_email(self, message_id: str) -> bool:
+        return bool(self.redis_client.exists(KEY_PREFIX + message_id))
+
+    def remove_email_sync(self, message_id: str) -> bool:
+        self.redis_client.zrem(INDEX_KEY, message_id)
+        return bool(self.redis_client.delete(KEY_PREFIX + message_id))
+
+    # Async methods keep network round trips off the event loop
+    async def store_email_async(self, email: EphemeralEmail) -> bool:
+        return await asyncio.to_thread(self.store_email, email)
+
+    async def get_email_async(self, message_id: str) -> Optional[EphemeralEmail]:
+        return await asyncio.to_thread(self.get_email, message_id)
+
+    async def contains_email_async(self, message_id: str) -> bool:
+        return await asyncio.to_thread(self.contains_email, message_id)
+
+    async def remove_email(self, message_id: str) -> bool:
+        return await asyncio.to_thread(self.remove_email_sync, message_id)
+
+    async def store_email_safe(self, email: EphemeralEmail) -> bool:
+        return await self.store_email_async(email)
+
+    async def get_email_safe(self, message_id: str) -> Optional[EphemeralEmail]:
+        return await self.get_email_async(message_id)
+
+    async def cleanup_expired(self, grace_seconds: float = 0.0, limit: Optional[int] = None) -> int:
+        """
+        Drop expired entries from the shared index.
+
+        Redis already deleted the records themselves when their TTL ran out;
+        this keeps the capacity count accurate.
+        """
+        removed = await asyncio.to_thread(self._prune_index, time.time() - grace_seconds, limit)
+        return len(removed)
+
+    async def get_all_emails(self) -> List[EphemeralEmail]:
+        def load() -> List[EphemeralEmail]:
+            message_ids = self.redis_client.zrange(INDEX_KEY, 0, -1)
+            if not message_ids:
+                return []
+            keys = [KEY_PREFIX + (m.decode() if isinstance(m, bytes) else m) for m in message_ids]
+            emails = [self._decrypt(token) for token in self.redis_client.mget(keys)]
+            return [email for email in emails if email is not None]
+        return await asyncio.to_thread(load)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Shared usage across all workers (rejections are this process's)."""
+        current = int(self.redis_client.zcard(INDEX_KEY))
+        return {
+            'current_emails': current,
+            'max_concurrent': self.max_concurrent,
+            'available_slots': self.max_concurrent - current,
+            'rejected_emails': self._rejections,
+            'backend': 'redis'
+        }
+
+
+def create_redis_memory_store(capacity: int) -> Optional[RedisMemoryStore]:
+    """
+    Build the shared store from environment configuration, or None if unusable.
+
+    REDIS_URL selects the server; EPHEMERAL_ENCRYPTION_KEY (or ENCRYPTION_KEY)
+    must be set to the same secret in every worker.
+    """
+    key = os.getenv("EPHEMERAL_ENCRYPTION_KEY") or os.getenv("ENCRYPTION_KEY", "")
+    try:
+        return RedisMemoryStore(
+            redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            encryption_key=key,
+            capacity=capacity
+        )
+    except Exception as e:
+        logger.warning(f"Shared ephemeral store unavailable ({e}), falling back to per-process memory")
+        return None
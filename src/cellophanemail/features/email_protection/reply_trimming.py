@@ -0,0 +1,84 @@
+"""
+Quoted-reply segmentation for analysis content.
+
+Replies usually carry the earlier thread below the new text. Only the new
+part was written by the current sender, so the quoted thread can be left
+out of the analysis prompt; an optional, bounded slice of it can be kept
+as context.
+
+Everything here is sender-controlled, so only a block that is verifiably
+quoted is separated: a trailing run of ``>``-prefixed lines, optionally
+introduced by an "On ... wrote:" attribution. Unprefixed text is always
+new text, whatever marker precedes it (signature delimiters, fake
+attribution lines, Outlook header blocks), and callers only trim mail that
+is threaded onto an earlier message (In-Reply-To/References).
+"""
+
+import re
+from dataclasses import dataclass
+
+# "On <date>, <name> <addr> wrote:", possibly wrapped onto a second line,
+# directly above the trailing quote block
+_ATTRIBUTION = re.compile(r"(?:^|\n)[ \t]*On\b[^\n]{0,200}(?:\n[^\n]{0,200})?\bwrote:[ \t]*\Z", re.IGNORECASE)
+_QUOTED_LINE = re.compile(r"^[ \t]*>")
+_FORWARDED = re.compile(r"^\s*-{2,}\s*Forwarded message\s*-{2,}", re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass
+class ReplySegments:
+    """A message body split into what the sender wrote and the thread they carried along."""
+
+    new_text: str
+    quoted_text: str = ""
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.quoted_text)
+
+
+def segment_reply(text: str) -> ReplySegments:
+    """
+    Split a plain-text body into new text and a trailing quoted thread.
+
+    Interleaved (inline-answered) quotes and forwarded messages are left
+    whole: the recipient reads them together with the new text.
+    """
+    if not text or _FORWARDED.search(text):
+        return ReplySegments(text or "")
+
+    lines = text.rstrip().split("\n")
+    start = len(lines)
+    while start > 0 and (_QUOTED_LINE.match(lines[start - 1]) or not lines[start - 1].strip()):
+        start -= 1
+    if not any(_QUOTED_LINE.match(line) for line in lines[start:]):
+        return ReplySegments(text)
+
+    head = "\n".join(lines[:start]).rstrip()
+    quoted = "\n".join(lines[start:]).strip()
+    attribution = _ATTRIBUTION.search(head)
+    if attribution:
+        quoted = f"{head[attribution.start():].strip()}\n{quoted}"
+        head = head[:attribution.start()]
+    return ReplySegments(head.strip(), quoted)
+
+
+def trim_reply(text: str, context_chars: int = 0) -> str:
+    """
+    Return the part of a body worth analyzing.
+
+    Args:
+        text: Plain-text body
+        context_chars: Characters of the quoted thread to keep after the new text
+
+    Returns:
+        The new text (plus bounded quoted context). The whole body if nothing
+        new remains, so quote-only messages are still analyzed.
+    """
+    segments = segment_reply(text)
+    if not segments.trimmed:
+        return text
+    if not segments.new_text:
+        return text.strip()
+    if context_chars > 0:
+        return f"{segments.new_text}\n\n[Quoted context]\n{segments.quoted_text[:context_chars]}"
+    return segments.new_text
@@ -0,0 +1,121 @@
+"""Sharded in-memory email storage for high-concurrency intake."""
+
+from typing import Any, Dict, List, Optional
+
+from .contracts import MemoryStorageInterface
+from .ephemeral_email import EphemeralEmail
+from .memory_manager import MemoryManager
+
+
+class ShardedMemoryManager(MemoryStorageInterface):
+    """
+    MemoryManager split into N independently locked shards.
+
+    Emails are routed by hash of message_id, so concurrent intake for
+    different messages rarely contends on the same lock. The count and
+    byte limits are divided evenly across shards; with hashed routing each
+    shard fills at about the same rate. Exposes the same sync and async
+    API as MemoryManager.
+    """
+
+    def __init__(
+        self,
+        shards: int = 8,
+        capacity: int = 100,
+        max_bytes: Optional[int] = None,
+        compression: Optional[str] = None,
+        compression_min_bytes: int = 1024
+    ):
+        """
+        Args:
+            shards: Number of independently locked stores
+            capacity: Maximum number of emails across all shards
+            max_bytes: Byte budget across all shards (None = count limit only)
+            compression: "zlib" or "zstd" to hold bodies compressed (None = off)
+            compression_min_bytes: Bodies smaller than this are stored as-is
+        """
+        count = max(1, shards)
+        self.max_concurrent = capacity
+        self.max_bytes = max_bytes
+        self._shards = [
+            MemoryManager(
+                capacity=-(-capacity // count),
+                max_bytes=-(-max_bytes // count) if max_bytes is not None else None,
+                compression=compression,
+                compression_min_bytes=compression_min_bytes
+            )
+            for _ in range(count)
+        ]
+
+    @property
+    def shard_count(self) -> int:
+        return len(self._shards)
+
+    def _shard(self, message_id: str) -> MemoryManager:
+        return self._shards[hash(message_id) % len(self._shards)]
+
+    def store_email(self, email: EphemeralEmail) -> bool:
+        """Store an email in its shard; False if that shard is at capacity."""
+        return self._shard(email.message_id).store_email(email)
+
+    def get_email(self, message_id: str) -> Optional[EphemeralEmail]:
+        return self._shard(message_id).get_email(message_id)
+
+    async def store_email_async(self, email: EphemeralEmail) -> bool:
+        return await self._shard(email.message_id).store_email_async(email)
+
+    async def get_email_async(self, message_id: str) -> Optional[EphemeralEmail]:
+        return await self._shard(message_id).get_email_async(message_id)
+
+    async def remove_email(self, message_id: str) -> bool:
+        return await self._shard(message_id).remove_email(message_id)
+
+    async def contains_email_async(self, message_id: str) -> bool:
+        return await self._shard(message_id).contains_email_async(message_id)
+
+    async def store_email_safe(self, email: EphemeralEmail) -> bool:
+        return await self.store_email_async(email)
+
+    async def get_email_safe(self, message_id: str) -> Optional[EphemeralEmail]:
+        return await self.get_email_async(message_id)
+
+    async def cleanup_expired(self, grace_seconds: float = 0.0, limit: Optional[int] = None) -> int:
+        """Remove expired emails shard by shard, at most ``limit`` in total."""
+        removed = 0
+        for shard in self._shards:
+            remaining = None if limit is None else limit - removed
+            if remaining == 0:
+                break
+            removed += await shard.cleanup_expired(grace_seconds=grace_seconds, limit=remaining)
+        return removed
+
+    async def get_all_emails(self) -> List[EphemeralEmail]:
+        emails: List[EphemeralEmail] = []
+        for shard in self._shards:
+            emails.extend(await shard.get_all_emails())
+        return emails
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aggregate statistics across shards (same keys as MemoryManager, plus shard count)."""
+        current = bytes_used = rejected = plain = stored = 0
+        for shard in self._shards:
+            with shard._lock:
+                current += len(shard._emails)
+                bytes_used += shard._bytes_used
+                rejected += shard._rejections
+                plain += shard._body_bytes_plain
+                stored += shard._body_bytes_stored
+
+        stats = {
+            'current_emails': current,
+            'max_concurrent': self.max_concurrent,
+            'available_slots': self.max_concurrent - current,
+            'bytes_used': bytes_used,
+            'max_bytes': self.max_bytes,
+            'rejected_emails': rejected,
+            'compression_ratio': stored / plain if plain else 1.0,
+            'shards': len(self._shards)
+        }
+        if self.max_bytes is not None:
+            stats['available_bytes'] = max(0, self.max_bytes - bytes_used)
+        return stats
@@ -0,0 +1,89 @@
+"""
+Incremental parser for a streamed JSON analysis object.
+
+The analysis JSON starts with ``safe`` and ``horsemen_detected``; the
+``reasoning`` text that follows is not needed for the protection decision.
+Feeding streamed text to this parser exposes each top-level field as soon
+as its value is complete, so the caller can stop generation early.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Optional
+
+REQUIRED_FIELDS = ("safe", "horsemen_detected")
+
+
+class StreamingAnalysisParser:
+    """
+    Track a streamed JSON object and parse its completed top-level fields.
+
+    Text before the opening brace (e.g. a ```json fence) is ignored. A field
+    counts as complete once the comma or closing brace after its value
+    arrives outside of any string, array or nested object.
+    """
+
+    def __init__(self, required_fields: Iterable[str] = REQUIRED_FIELDS):
+        self.required_fields = frozenset(required_fields)
+        self.fields: Dict[str, Any] = {}
+        self.closed = False
+        self._chunks = []
+        self._length = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._chunks)
+
+    @property
+    def ready(self) -> bool:
+        """True once every required field has been parsed."""
+        return self.required_fields.issubset(self.fields)
+
+    def feed(self, chunk: str) -> bool:
+        """Consume streamed text; returns True once the required fields are complete."""
+        offset = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+
+        for index, char in enumerate(chunk, offset):
+            if self.closed:
+                break
+            if self._start is None:
+                if char == "{":
+                    self._start = index
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parse_until(index)
+                    self.closed = True
+            elif char == "," and self._depth == 1:
+                self._parse_until(index)
+        return self.ready
+
+    def _parse_until(self, end: int) -> None:
+        """Parse the object prefix ending just before ``end`` as a closed object."""
+        try:
+            data = json.loads(self.text[self._start:end] + "}")
+        except ValueError:
+            return  # malformed so far; the full-response parser handles repair
+        if isinstance(data, dict):
+            self.fields = data
@@ -18,8 +18,9 @@ from typing import Optional
 from datetime import datetime
 
 from ...providers.contracts import EmailMessage
-from .analyzer_interface import IEmailAnalyzer
+from .analyzer_interface import IEmailAnalyzer, analysis_recipient
 from .analyzer_factory import AnalyzerFactory  
+from .content_extraction import build_delivery_content, prepare_analysis_content
 from .graduated_decision_maker import GraduatedDecisionMaker, ProtectionAction
 from .models import ProtectionResult, ThreatLevel
 from .storage import ProtectionLogStorage
@@ -38,6 +39,14 @@ EMPIRICAL_THRESHOLDS = {
 }
 
 
+def _is_reply(email: EmailMessage) -> bool:
+    """Whether the email is threaded onto an earlier message (In-Reply-To/References)."""
+    if getattr(email, 'in_reply_to', None) or getattr(email, 'references', None):
+        return True
+    headers = getattr(email, 'headers', None) or {}
+    return any(value and name.lower() in ('in-reply-to', 'references') for name, value in headers.items())
+
+
 class StreamlinedEmailProtectionProcessor:
     """
     High-performance email protection processor with simplified architecture.
@@ -108,7 +117,8 @@ class StreamlinedEmailProtectionProcessor:
         
         # Single comprehensive LLM analysis (replaces 6-call pipeline)
         try:
-            consolidated_analysis = self.analyzer.analyze_email_toxicity(content, email.from_address)
+            with analysis_recipient(user_email):
+                consolidated_analysis = await self.analyzer.analyze_email_toxicity_async(content, email.from_address)
         except Exception as e:
             logger.error(f"LLM analysis failed for {email.message_id}: {e}")
             # Conservative fallback - assume medium toxicity to be safe
@@ -131,7 +141,10 @@ class StreamlinedEmailProtectionProcessor:
             )
         
         # Make graduated protection decision
-        protection_decision = self.decision_maker.make_decision(legacy_analysis, content)
+        # Redaction and summaries work on the full text, not the trimmed prompt
+        protection_decision = self.decision_maker.make_decision(
+            legacy_analysis, self._prepare_delivery_content(email)
+        )
         
         # Map to binary decision for compatibility
         should_forward = protection_decision.action != ProtectionAction.BLOCK_ENTIRELY
@@ -163,25 +176,18 @@ class StreamlinedEmailProtectionProcessor:
     
     def _prepare_email_content(self, email: EmailMessage) -> str:
         """Prepare email content for analysis."""
-        parts = []
-        
-        # Include subject
-        if email.subject:
-            parts.append(f"Subject: {email.subject}")
-        
-        # Include text body (support both naming conventions)
+        # Support both naming conventions
         text_body = getattr(email, 'text_body', None) or getattr(email, 'text_content', None)
         html_body = getattr(email, 'html_body', None) or getattr(email, 'html_content', None)
         
-        if text_body:
-            parts.append(text_body)
-        elif html_body:
-            # Simple HTML stripping (in production, use proper HTML parsing)
-            import re
-            text = re.sub('<[^<]+?>', '', html_body)
-            parts.append(text)
+        return prepare_analysis_content(email.subject, text_body, html_body, is_reply=_is_reply(email))
+    
+    def _prepare_delivery_content(self, email: EmailMessage) -> str:
+        """Prepare the full email content that is forwarded to the user."""
+        text_body = getattr(email, 'text_body', None) or getattr(email, 'text_content', None)
+        html_body = getattr(email, 'html_body', None) or getattr(email, 'html_content', None)
         
-        return "\\n".join(parts)
+        return build_delivery_content(email.subject, text_body, html_body)
     
     async def _check_organization_limits(self, organization_id: str) -> bool:
         """Check if organization is within email processing limits."""
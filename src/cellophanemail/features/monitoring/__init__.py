@@ -7,6 +7,7 @@ metrics collection, health monitoring, and privacy-compliant logging.
 
 from .metrics_collector import (
     MetricsCollector,
+    get_metrics_collector,
     EmailProcessingMetrics,
     PerformanceMetrics,
     SecurityMetrics
@@ -25,6 +26,7 @@ from .observability_manager import (
 
 __all__ = [
     'MetricsCollector',
+    'get_metrics_collector',
     'EmailProcessingMetrics', 
     'PerformanceMetrics',
     'SecurityMetrics',
@@ -63,6 +63,30 @@ class PerformanceMetrics:
     api_success_rate: float = 0.0
     api_call_history: List[Dict[str, Any]] = field(default_factory=list)
     cache_stats: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: {'hits': 0, 'misses': 0}))
+    prefilter_short_circuited: int = 0  # LLM calls avoided by the heuristic pre-filter
+    prefilter_escalated: int = 0
+    llm_batches: int = 0  # Multi-message prompts sent by the micro-batcher
+    llm_batched_messages: int = 0
+    llm_batch_fallbacks: int = 0  # Messages re-analyzed singly after a batch miss
+    prompt_tokens_uncached: int = 0  # Input tokens processed without the prompt cache
+    prompt_tokens_cache_read: int = 0  # Input tokens served from a cached prefix
+    prompt_tokens_cache_write: int = 0  # Input tokens written to the prompt cache
+    processing_queue_depth: int = 0  # Emails waiting for a privacy-pipeline worker
+    processing_queue_rejections: int = 0  # Webhooks deferred because the queue was full
+    analysis_emails: int = 0  # Emails whose content was prepared for analysis
+    analysis_tokens_sent: int = 0  # Estimated content tokens sent for analysis
+    analysis_tokens_trimmed: int = 0  # Estimated tokens of quoted replies/signatures left out
+    
+    @property
+    def tokens_trimmed_per_email(self) -> float:
+        """Average analysis tokens saved per email by reply/signature trimming."""
+        return self.analysis_tokens_trimmed / self.analysis_emails if self.analysis_emails else 0.0
+    
+    @property
+    def cached_token_ratio(self) -> float:
+        """Share of LLM input tokens served from a cached prompt prefix."""
+        total = self.prompt_tokens_uncached + self.prompt_tokens_cache_read + self.prompt_tokens_cache_write
+        return self.prompt_tokens_cache_read / total if total else 0.0
     
     def calculate_cache_hit_rate(self):
         """Calculate overall cache hit rate."""
@@ -276,6 +300,51 @@ class MetricsCollector:
             self.performance_metrics.cache_stats[cache_type]['misses'] += 1
             self.performance_metrics.calculate_cache_hit_rate()
     
+    def record_prefilter_decision(self, escalated: bool) -> None:
+        """Record whether the heuristic pre-filter escalated a message to the LLM."""
+        with self._lock:
+            if escalated:
+                self.performance_metrics.prefilter_escalated += 1
+            else:
+                self.performance_metrics.prefilter_short_circuited += 1
+    
+    def record_llm_batch(self, batch_size: int, fallbacks: int = 0) -> None:
+        """Record a multi-message LLM prompt and how many messages fell back to single calls."""
+        with self._lock:
+            self.performance_metrics.llm_batches += 1
+            self.performance_metrics.llm_batched_messages += batch_size
+            self.performance_metrics.llm_batch_fallbacks += fallbacks
+    
+    def record_prompt_tokens(self, uncached: int, cache_read: int = 0, cache_write: int = 0) -> None:
+        """Record LLM input tokens split by prompt-cache outcome."""
+        with self._lock:
+            self.performance_metrics.prompt_tokens_uncached += uncached
+            self.performance_metrics.prompt_tokens_cache_read += cache_read
+            self.performance_metrics.prompt_tokens_cache_write += cache_write
+    
+    def record_queue_depth(self, depth: int) -> None:
+        """Record the current privacy-pipeline work queue depth."""
+        with self._lock:
+            self.performance_metrics.processing_queue_depth = depth
+            self._time_series['processing_queue_depth'].append(
+                TimeSeriesPoint(time.time(), depth)
+            )
+    
+    def record_queue_rejection(self) -> None:
+        """Record a webhook deferred because the work queue was saturated."""
+        with self._lock:
+            self.performance_metrics.processing_queue_rejections += 1
+    
+    def record_content_trimmed(self, tokens_trimmed: int, tokens_sent: int) -> None:
+        """Record tokens saved by reply/signature trimming for one email."""
+        with self._lock:
+            self.performance_metrics.analysis_emails += 1
+            self.performance_metrics.analysis_tokens_sent += tokens_sent
+            self.performance_metrics.analysis_tokens_trimmed += tokens_trimmed
+            self._time_series['analysis_tokens_trimmed'].append(
+                TimeSeriesPoint(time.time(), tokens_trimmed)
+            )
+    
     def record_toxic_email_detected(self, message_id: str, toxicity_score: float, tactics: List[str]) -> None:
         """Record toxic email detection."""
         with self._lock:
@@ -346,7 +415,20 @@ class MetricsCollector:
                 avg_api_response_time_ms=self.performance_metrics.avg_api_response_time_ms,
                 api_success_rate=self.performance_metrics.api_success_rate,
                 api_call_history=self.performance_metrics.api_call_history.copy(),
-                cache_stats=dict(self.performance_metrics.cache_stats)
+                cache_stats=dict(self.performance_metrics.cache_stats),
+                prefilter_short_circuited=self.performance_metrics.prefilter_short_circuited,
+                prefilter_escalated=self.performance_metrics.prefilter_escalated,
+                llm_batches=self.performance_metrics.llm_batches,
+                llm_batched_messages=self.performance_metrics.llm_batched_messages,
+                llm_batch_fallbacks=self.performance_metrics.llm_batch_fallbacks,
+                prompt_tokens_uncached=self.performance_metrics.prompt_tokens_uncached,
+                prompt_tokens_cache_read=self.performance_metrics.prompt_tokens_cache_read,
+                prompt_tokens_cache_write=self.performance_metrics.prompt_tokens_cache_write,
+                processing_queue_depth=self.performance_metrics.processing_queue_depth,
+                processing_queue_rejections=self.performance_metrics.processing_queue_rejections,
+                analysis_emails=self.performance_metrics.analysis_emails,
+                analysis_tokens_sent=self.performance_metrics.analysis_tokens_sent,
+                analysis_tokens_trimmed=self.performance_metrics.analysis_tokens_trimmed
             )
             return metrics
     
@@ -466,9 +548,69 @@ class MetricsCollector:
                 "# HELP cellophanemail_api_calls_total Total API calls made",
                 "# TYPE cellophanemail_api_calls_total counter",
                 f"cellophanemail_api_calls_total {len(self.performance_metrics.api_call_history)}",
+                "",
+                "# HELP cellophanemail_llm_calls_avoided_total Messages cleared by the heuristic pre-filter",
+                "# TYPE cellophanemail_llm_calls_avoided_total counter",
+                f"cellophanemail_llm_calls_avoided_total {self.performance_metrics.prefilter_short_circuited}",
+                "",
+                "# HELP cellophanemail_prefilter_escalations_total Messages the pre-filter sent to the LLM",
+                "# TYPE cellophanemail_prefilter_escalations_total counter",
+                f"cellophanemail_prefilter_escalations_total {self.performance_metrics.prefilter_escalated}",
+                "",
+                "# HELP cellophanemail_llm_batches_total Multi-message analysis prompts sent",
+                "# TYPE cellophanemail_llm_batches_total counter",
+                f"cellophanemail_llm_batches_total {self.performance_metrics.llm_batches}",
+                "",
+                "# HELP cellophanemail_llm_batched_messages_total Messages analyzed through batched prompts",
+                "# TYPE cellophanemail_llm_batched_messages_total counter",
+                f"cellophanemail_llm_batched_messages_total {self.performance_metrics.llm_batched_messages}",
+                "",
+                "# HELP cellophanemail_llm_batch_fallbacks_total Batched messages re-analyzed with single calls",
+                "# TYPE cellophanemail_llm_batch_fallbacks_total counter",
+                f"cellophanemail_llm_batch_fallbacks_total {self.performance_metrics.llm_batch_fallbacks}",
+                "",
+                "# HELP cellophanemail_llm_prompt_tokens_total LLM input tokens by prompt-cache outcome",
+                "# TYPE cellophanemail_llm_prompt_tokens_total counter",
+                f'cellophanemail_llm_prompt_tokens_total{{cache="miss"}} {self.performance_metrics.prompt_tokens_uncached}',
+                f'cellophanemail_llm_prompt_tokens_total{{cache="read"}} {self.performance_metrics.prompt_tokens_cache_read}',
+                f'cellophanemail_llm_prompt_tokens_total{{cache="write"}} {self.performance_metrics.prompt_tokens_cache_write}',
+                "",
+                "# HELP cellophanemail_llm_cached_token_ratio Share of LLM input tokens served from the prompt cache",
+                "# TYPE cellophanemail_llm_cached_token_ratio gauge",
+                f"cellophanemail_llm_cached_token_ratio {self.performance_metrics.cached_token_ratio:.4f}",
+                "",
+                "# HELP cellophanemail_processing_queue_depth Emails waiting for a privacy-pipeline worker",
+                "# TYPE cellophanemail_processing_queue_depth gauge",
+                f"cellophanemail_processing_queue_depth {self.performance_metrics.processing_queue_depth}",
+                "",
+                "# HELP cellophanemail_processing_queue_rejections_total Webhooks deferred with 429 by admission control",
+                "# TYPE cellophanemail_processing_queue_rejections_total counter",
+                f"cellophanemail_processing_queue_rejections_total {self.performance_metrics.processing_queue_rejections}",
+                "",
+                "# HELP cellophanemail_analysis_content_tokens_total Estimated email content tokens by outcome",
+                "# TYPE cellophanemail_analysis_content_tokens_total counter",
+                f'cellophanemail_analysis_content_tokens_total{{outcome="sent"}} {self.performance_metrics.analysis_tokens_sent}',
+                f'cellophanemail_analysis_content_tokens_total{{outcome="trimmed"}} {self.performance_metrics.analysis_tokens_trimmed}',
+                "",
+                "# HELP cellophanemail_analysis_emails_total Emails whose content was prepared for analysis",
+                "# TYPE cellophanemail_analysis_emails_total counter",
+                f"cellophanemail_analysis_emails_total {self.performance_metrics.analysis_emails}",
                 ""
             ])
             
+            # Per-cache hit/miss counters
+            if self.performance_metrics.cache_stats:
+                prometheus_lines.extend([
+                    "# HELP cellophanemail_cache_requests_total Cache lookups by cache and result",
+                    "# TYPE cellophanemail_cache_requests_total counter",
+                ])
+                for cache_type, stats in sorted(self.performance_metrics.cache_stats.items()):
+                    prometheus_lines.extend([
+                        f'cellophanemail_cache_requests_total{{cache="{cache_type}",result="hit"}} {stats["hits"]}',
+                        f'cellophanemail_cache_requests_total{{cache="{cache_type}",result="miss"}} {stats["misses"]}',
+                    ])
+                prometheus_lines.append("")
+            
             # Security metrics
             prometheus_lines.extend([
                 "# HELP cellophanemail_auth_failures_total Total authentication failures",
@@ -481,4 +623,19 @@ class MetricsCollector:
                 ""
             ])
             
-            return '\n'.join(prometheus_lines)
\ No newline at end of file
+            return '\n'.join(prometheus_lines)
+
+
+# Process-wide collector for components that are not wired through ObservabilityManager
+_default_collector: Optional[MetricsCollector] = None
+_default_collector_lock = threading.Lock()
+
+
+def get_metrics_collector() -> MetricsCollector:
+    """Get the process-wide metrics collector."""
+    global _default_collector
+    if _default_collector is None:
+        with _default_collector_lock:
+            if _default_collector is None:
+                _default_collector = MetricsCollector()
+    return _default_collector
@@ -1,7 +1,7 @@
 """Interface for webhook orchestrators supporting different processing strategies."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Protocol
+from typing import Dict, Any, Optional, Protocol
 
 from ...core.webhook_models import PostmarkWebhookPayload
 
@@ -9,12 +9,17 @@ from ...core.webhook_models import PostmarkWebhookPayload
 class WebhookOrchestrator(Protocol):
     """Protocol for webhook orchestrators that process inbound emails."""
     
-    async def process_webhook(self, webhook_payload: PostmarkWebhookPayload) -> Dict[str, Any]:
+    async def process_webhook(
+        self,
+        webhook_payload: PostmarkWebhookPayload,
+        organization_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Process webhook payload and return response data.
         
         Args:
             webhook_payload: Inbound email webhook data
+            organization_id: Owning organization, when known
             
         Returns:
             Dict containing status, message_id, and processing info
@@ -26,7 +31,11 @@ class BaseWebhookOrchestrator(ABC):
     """Abstract base class for webhook orchestrators with common functionality."""
     
     @abstractmethod
-    async def process_webhook(self, webhook_payload: PostmarkWebhookPayload) -> Dict[str, Any]:
+    async def process_webhook(
+        self,
+        webhook_payload: PostmarkWebhookPayload,
+        organization_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Process webhook through specific strategy (database, privacy, etc.)."""
         pass
     
@@ -7,6 +7,7 @@ configuration, and monitoring capabilities for production readiness.
 
 import logging
 import asyncio
+import weakref
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -17,10 +18,16 @@ from ..email_protection.ephemeral_email import EphemeralEmail
 from ..email_protection.in_memory_processor import InMemoryProcessor
 from ..email_protection.integrated_delivery_manager import IntegratedDeliveryManager
 from ..email_protection.email_composition_strategy import DeliveryConfiguration
+from ..email_protection.llama_worker_pool import current_llama_worker_pool
+from ..monitoring.metrics_collector import get_metrics_collector
+from .work_queue import FairWorkQueue
 from ...config.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Every live orchestrator, so the application lifespan can stop their consumers
+_orchestrators: "weakref.WeakSet[PrivacyWebhookOrchestrator]" = weakref.WeakSet()
+
 
 def _create_delivery_config_from_settings() -> DeliveryConfiguration:
     """Create delivery configuration from app settings."""
@@ -34,6 +41,7 @@ def _create_delivery_config_from_settings() -> DeliveryConfiguration:
             "EMAIL_USERNAME": settings.email_username
         }
         sender_type = "postmark"
+        batch_delivery = settings.postmark_batch_delivery
     else:
         # Fall back to SMTP
         config_dict = {
@@ -44,6 +52,7 @@ def _create_delivery_config_from_settings() -> DeliveryConfiguration:
             "EMAIL_PASSWORD": settings.email_password
         }
         sender_type = "smtp"
+        batch_delivery = False
     
     return DeliveryConfiguration(
         sender_type=sender_type,
@@ -51,7 +60,10 @@ def _create_delivery_config_from_settings() -> DeliveryConfiguration:
         service_domain=settings.smtp_domain,
         max_retries=3,
         add_transparency_headers=True,
-        preserve_threading=True
+        preserve_threading=True,
+        batch_delivery=batch_delivery,
+        batch_window_ms=settings.postmark_batch_window_ms,
+        batch_max_size=settings.postmark_batch_max_size
     )
 
 
@@ -59,7 +71,9 @@ def _create_delivery_config_from_settings() -> DeliveryConfiguration:
 class PrivacyProcessingConfig:
     """Configuration for privacy processing pipeline."""
     ttl_seconds: int = 300  # 5 minutes default
-    max_concurrent_tasks: int = 50
+    max_concurrent_tasks: int = 50  # Consumer tasks draining the work queue
+    max_queued_emails: int = 500  # Webhooks beyond this are deferred with 429
+    max_queued_per_organization: int = 0  # Per-tenant queue share (0 = no cap)
     processing_timeout_seconds: float = 30.0
     enable_detailed_logging: bool = False  # For debugging only, never log content
     
@@ -101,22 +115,83 @@ class PrivacyWebhookOrchestrator(BaseWebhookOrchestrator):
                 )
                 self.delivery_manager = IntegratedDeliveryManager(fallback_config)
         
-        self._background_tasks = set()  # Track background tasks
+        self._queue = FairWorkQueue(
+            max_size=self.config.max_queued_emails,
+            max_per_key=self.config.max_queued_per_organization
+        )
+        self._background_tasks = set()  # Consumer tasks draining the queue
+        self._workers_loop = None
+        self._active_count = 0
         self._processing_stats = {
             "processed_count": 0,
             "success_count": 0,
             "error_count": 0,
-            "memory_rejections": 0
+            "memory_rejections": 0,
+            "deferred_count": 0,
+            "duplicate_count": 0
         }
+        _orchestrators.add(self)
+    
+    def _ensure_workers(self) -> None:
+        """Start the consumer tasks on the running loop (lazily, on first webhook)."""
+        loop = asyncio.get_running_loop()
+        if self._workers_loop is not loop:
+            # A new event loop cannot await the old loop's queue or tasks
+            self._queue = FairWorkQueue(self._queue.max_size, self._queue.max_per_key)
+            self._background_tasks = set()
+            self._workers_loop = loop
+        
+        for _ in range(self.config.max_concurrent_tasks - len(self._background_tasks)):
+            task = loop.create_task(self._worker())
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
     
-    async def process_webhook(self, webhook_payload: PostmarkWebhookPayload) -> Dict[str, Any]:
+    async def _worker(self) -> None:
+        """Consumer loop: process queued emails one at a time."""
+        while True:
+            email = await self._queue.get()
+            self._active_count += 1
+            get_metrics_collector().record_queue_depth(self._queue.qsize())
+            try:
+                await self._process_email_async(email)
+            finally:
+                self._active_count -= 1
+    
+    async def process_webhook(
+        self,
+        webhook_payload: PostmarkWebhookPayload,
+        organization_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Process webhook through privacy pipeline with in-memory storage.
         
-        Returns 202 Accepted response for asynchronous processing.
+        Args:
+            webhook_payload: Inbound email webhook data
+            organization_id: Tenant used for fair queueing (shield address if None)
+        
+        Returns 202 Accepted response for asynchronous processing, or a
+        "deferred" response (mapped to 429) when the work queue is saturated.
         """
         logger.info(f"Processing webhook {webhook_payload.MessageID} through privacy pipeline")
         
+        # Back-pressure: don't accept work local inference cannot start soon
+        inference_pool = current_llama_worker_pool()
+        if inference_pool is not None and inference_pool.is_saturated:
+            logger.warning(f"Deferring {webhook_payload.MessageID} - local inference saturated")
+            return self._create_response(
+                status="deferred",
+                message_id=webhook_payload.MessageID,
+                processing_type="privacy_pipeline_deferred",
+                reason="inference_backpressure",
+                retry_after_seconds=30
+            )
+        
+        # Admission control: defer rather than queue more than we can work off
+        self._ensure_workers()
+        queue_key = organization_id or webhook_payload.To
+        if not self._queue.can_accept(queue_key):
+            return self._defer_queue_full(webhook_payload.MessageID)
+        
         # Convert webhook to EphemeralEmail for memory storage
         ephemeral_email = EphemeralEmail(
             message_id=webhook_payload.MessageID,
@@ -129,10 +204,22 @@ class PrivacyWebhookOrchestrator(BaseWebhookOrchestrator):
             ttl_seconds=300  # 5-minute TTL as per architecture
         )
         
-        # Store in memory (not database)
-        stored = self.memory_manager.store_email(ephemeral_email)
+        # A provider retry of an email still in memory is already queued
+        if await self.memory_manager.contains_email_async(webhook_payload.MessageID):
+            self._processing_stats["duplicate_count"] += 1
+            logger.info(f"Email {webhook_payload.MessageID} already accepted - not queueing again")
+            return self._create_response(
+                status="accepted",
+                message_id=webhook_payload.MessageID,
+                processing_type="async_privacy_pipeline",
+                reason="duplicate_message_id"
+            )
+        
+        # Store in memory (not database); async so Redis round trips stay off the loop
+        stored = await self.memory_manager.store_email_async(ephemeral_email)
         
         if not stored:
+            self._processing_stats["memory_rejections"] += 1
             logger.warning(f"Failed to store email {webhook_payload.MessageID} - memory at capacity")
             return self._create_response(
                 status="rejected",
@@ -141,10 +228,14 @@ class PrivacyWebhookOrchestrator(BaseWebhookOrchestrator):
                 reason="memory_capacity_exceeded"
             )
         
-        # Start async processing in the background
-        task = asyncio.create_task(self._process_email_async(ephemeral_email))
-        self._background_tasks.add(task)
-        task.add_done_callback(self._background_tasks.discard)
+        # Hand off to the consumer tasks. The storage awaits above yield, so
+        # other webhooks may have taken the capacity checked earlier
+        try:
+            self._queue.put_nowait(queue_key, ephemeral_email)
+        except asyncio.QueueFull:
+            await self.memory_manager.remove_email(ephemeral_email.message_id)
+            return self._defer_queue_full(webhook_payload.MessageID)
+        get_metrics_collector().record_queue_depth(self._queue.qsize())
         
         # Return 202 Accepted for async processing
         logger.info(f"Email {webhook_payload.MessageID} queued for async privacy processing")
@@ -155,6 +246,19 @@ class PrivacyWebhookOrchestrator(BaseWebhookOrchestrator):
             processing_type="async_privacy_pipeline"
         )
     
+    def _defer_queue_full(self, message_id: str) -> Dict[str, Any]:
+        """Deferred (429) response for a webhook the work queue cannot take."""
+        self._processing_stats["deferred_count"] += 1
+        get_metrics_collector().record_queue_rejection()
+        logger.warning(f"Deferring {message_id} - processing queue saturated")
+        return self._create_response(
+            status="deferred",
+            message_id=message_id,
+            processing_type="privacy_pipeline_deferred",
+            reason="processing_queue_full",
+            retry_after_seconds=30
+        )
+    
     async def _process_email_async(self, email: EphemeralEmail) -> None:
         """
         Process email through complete privacy pipeline with timeout and error handling.
@@ -213,19 +317,37 @@ class PrivacyWebhookOrchestrator(BaseWebhookOrchestrator):
         memory_stats = self.memory_manager.get_stats()
         return {
             **self._processing_stats,
-            "active_background_tasks": len(self._background_tasks),
+            "active_background_tasks": self._active_count,
+            "queue_depth": self._queue.qsize(),
+            "queue_depth_by_organization": self._queue.depth_by_key(),
             "memory_usage": memory_stats,
             "config": {
                 "ttl_seconds": self.config.ttl_seconds,
                 "max_concurrent_tasks": self.config.max_concurrent_tasks,
+                "max_queued_emails": self.config.max_queued_emails,
+                "max_queued_per_organization": self.config.max_queued_per_organization,
                 "processing_timeout_seconds": self.config.processing_timeout_seconds
             }
         }
     
-    async def shutdown_gracefully(self) -> None:
-        """Gracefully shutdown all background tasks."""
+    async def shutdown_gracefully(self, drain_timeout: float = 0.0) -> None:
+        """
+        Gracefully shutdown all background tasks.
+        
+        Args:
+            drain_timeout: Seconds to let the consumers work off queued and
+                in-progress emails before they are cancelled
+        
+        Queued emails that were not started stay in memory and expire via TTL.
+        """
+        loop = asyncio.get_running_loop()
+        if drain_timeout > 0 and self._workers_loop is loop:
+            deadline = loop.time() + drain_timeout
+            while (self._queue.qsize() or self._active_count) and loop.time() < deadline:
+                await asyncio.sleep(0.05)
+        
         if self._background_tasks:
-            logger.info(f"Shutting down {len(self._background_tasks)} background tasks")
+            logger.info(f"Shutting down {len(self._background_tasks)} background tasks ({self._queue.qsize()} emails queued)")
             
             # Cancel all background tasks
             for task in self._background_tasks.copy():
@@ -236,4 +358,15 @@ class PrivacyWebhookOrchestrator(BaseWebhookOrchestrator):
             if self._background_tasks:
                 await asyncio.gather(*self._background_tasks, return_exceptions=True)
             
-            logger.info("All background tasks shutdown complete")
\ No newline at end of file
+            logger.info("All background tasks shutdown complete")
+
+
+async def shutdown_orchestrators() -> None:
+    """Drain and stop every orchestrator's consumers (called from the application lifespan)."""
+    for orchestrator in list(_orchestrators):
+        try:
+            await orchestrator.shutdown_gracefully(
+                drain_timeout=orchestrator.config.processing_timeout_seconds
+            )
+        except Exception as e:
+            logger.error(f"Stopping privacy orchestrator failed: {e}")
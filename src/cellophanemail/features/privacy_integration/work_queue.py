@@ -0,0 +1,73 @@
+"""
+Bounded, per-organization fair work queue for the privacy pipeline.
+
+Each organization gets its own FIFO lane and consumers take from the lanes
+round-robin, so one tenant's burst cannot starve everyone else's mail.
+Admission is decided synchronously with ``can_accept`` / ``put_nowait`` so
+the webhook can answer 429 instead of queueing work it cannot start soon.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable
+
+
+class FairWorkQueue:
+    """
+    Round-robin queue over per-key FIFO lanes with total and per-key limits.
+
+    Not thread-safe: producers and consumers must share one event loop.
+    """
+
+    def __init__(self, max_size: int = 500, max_per_key: int = 0):
+        """
+        Args:
+            max_size: Items queued across all keys before puts are refused
+            max_per_key: Items one key may have queued (0 = only the total limit)
+        """
+        self.max_size = max(1, max_size)
+        self.max_per_key = max(0, max_per_key)
+        self._lanes: "OrderedDict[Hashable, Deque[Any]]" = OrderedDict()
+        self._size = 0
+        self._available = asyncio.Semaphore(0)
+
+    def qsize(self) -> int:
+        return self._size
+
+    def full(self) -> bool:
+        return self._size >= self.max_size
+
+    def can_accept(self, key: Hashable) -> bool:
+        """Whether put_nowait(key, ...) would succeed right now."""
+        if self.full():
+            return False
+        if self.max_per_key and len(self._lanes.get(key, ())) >= self.max_per_key:
+            return False
+        return True
+
+    def put_nowait(self, key: Hashable, item: Any) -> None:
+        """Queue item in key's lane; raises asyncio.QueueFull when refused."""
+        if not self.can_accept(key):
+            raise asyncio.QueueFull(f"Work queue full for {key!r}")
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = deque()
+        lane.append(item)
+        self._size += 1
+        self._available.release()
+
+    async def get(self) -> Any:
+        """Wait for an item, taking from the least recently served lane."""
+        await self._available.acquire()
+        key, lane = next(iter(self._lanes.items()))
+        item = lane.popleft()
+        self._size -= 1
+        # Rotate: the lane goes to the back, or disappears once drained
+        del self._lanes[key]
+        if lane:
+            self._lanes[key] = lane
+        return item
+
+    def depth_by_key(self) -> Dict[Hashable, int]:
+        """Queued items per key, for monitoring."""
+        return {key: len(lane) for key, lane in self._lanes.items()}
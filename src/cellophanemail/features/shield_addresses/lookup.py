@@ -0,0 +1,251 @@
+"""
+Database-backed shield address lookup with a shared TTL cache.
+
+Every inbound email resolves its shield address to a user before anything
+else happens. The lookup reads ``shield_addresses`` joined to ``users`` in
+a single indexed query and caches the result (including "no such address")
+in a bounded, process-wide LRU, so repeat senders to the same shield cost
+no database round trip at all.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .models import ShieldAddressInfo
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_NEGATIVE_TTL_SECONDS = 30.0
+# After a database error, skip the database for this long instead of
+# paying a connection timeout on every inbound email
+DB_RETRY_SECONDS = 30.0
+
+
+def _env_number(name: str, default, cast=int):
+    """Read a positive numeric setting from the environment."""
+    try:
+        value = cast(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name}, using default {default}")
+        return default
+    return value if value > 0 else default
+
+
+def normalize_shield_address(shield_address: str) -> str:
+    return shield_address.lower().strip()
+
+
+class ShieldAddressLookup:
+    """
+    Resolves shield addresses through a bounded LRU cache in front of the database.
+
+    Hits are cached for ``ttl_seconds`` and misses for the shorter
+    ``negative_ttl_seconds``. Concurrent misses for the same address share
+    one query. Database errors are never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Optional[ShieldAddressInfo]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._db_retry_at = 0.0
+        # Bumped by every invalidation so a query that raced one isn't cached
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def _get_cached(self, address: str) -> Tuple[bool, Optional[ShieldAddressInfo]]:
+        with self._lock:
+            entry = self._entries.get(address)
+            if entry is None:
+                return False, None
+            expires_at, info = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[address]
+                return False, None
+            self._entries.move_to_end(address)
+            return True, info
+
+    def _set_cached(self, address: str, info: Optional[ShieldAddressInfo]) -> None:
+        ttl = self.ttl_seconds if info is not None else self.negative_ttl_seconds
+        with self._lock:
+            self._entries[address] = (time.monotonic() + ttl, info)
+            self._entries.move_to_end(address)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def _query(self, address: str) -> Optional[ShieldAddressInfo]:
+        """One indexed query: shield_addresses LEFT JOIN users on the user FK."""
+        from ...models.shield_address import ShieldAddress
+
+        row = await ShieldAddress.select(
+            ShieldAddress.shield_address,
+            ShieldAddress.is_active,
+            ShieldAddress.created_at,
+            ShieldAddress.user.id.as_alias("user_id"),
+            ShieldAddress.user.email.as_alias("user_email"),
+            ShieldAddress.user.is_active.as_alias("user_is_active"),
+            ShieldAddress.user.organization.as_alias("organization_id"),
+        ).where(
+            ShieldAddress.shield_address == address
+        ).first()
+
+        if not row or not row["is_active"] or not row["user_is_active"]:
+            return None
+        return ShieldAddressInfo(
+            shield_address=row["shield_address"],
+            user_id=str(row["user_id"]),
+            user_email=row["user_email"],
+            organization_id=str(row["organization_id"]) if row["organization_id"] else None,
+            is_active=True,
+            created_at=row["created_at"]
+        )
+
+    async def _load(self, address: str) -> Optional[ShieldAddressInfo]:
+        if time.monotonic() < self._db_retry_at:
+            return None
+        self.queries += 1
+        generation = self._generation
+        try:
+            info = await self._query(address)
+        except Exception as e:
+            self.errors += 1
+            self._db_retry_at = time.monotonic() + DB_RETRY_SECONDS
+            logger.warning(f"Shield address lookup unavailable: {e}")
+            return None
+        if generation == self._generation:
+            self._set_cached(address, info)
+        return info
+
+    async def lookup(self, shield_address: str) -> Optional[ShieldAddressInfo]:
+        """
+        Return the active shield address and its user, or None.
+
+        Args:
+            shield_address: Shield address in any case / with surrounding whitespace
+        """
+        address = normalize_shield_address(shield_address)
+        found, info = self._get_cached(address)
+        if found:
+            self.hits += 1
+            return info
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        pending = self._in_flight.get(address)
+        if pending is not None and pending.get_loop() is loop:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The query owner was cancelled; load it ourselves
+
+        future = loop.create_future()
+        self._in_flight[address] = future
+        try:
+            info = await self._load(address)
+            future.set_result(info)
+            return info
+        finally:
+            if self._in_flight.get(address) is future:
+                del self._in_flight[address]
+            if not future.done():
+                future.cancel()
+
+    def invalidate(self, shield_address: str) -> bool:
+        """Drop one address (hit or negative entry) from the cache."""
+        with self._lock:
+            self._generation += 1
+            return self._entries.pop(normalize_shield_address(shield_address), None) is not None
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every cached address belonging to a user."""
+        user_id = str(user_id)
+        with self._lock:
+            self._generation += 1
+            stale = [
+                address for address, (_, info) in self._entries.items()
+                if info is not None and info.user_id == user_id
+            ]
+            for address in stale:
+                del self._entries[address]
+        return len(stale)
+
+    def clear(self) -> int:
+        with self._lock:
+            self._generation += 1
+            count = len(self._entries)
+            self._entries.clear()
+        self._db_retry_at = 0.0
+        return count
+
+    @property
+    def available(self) -> bool:
+        """False while backing off after a database error (misses are then unconfirmed)."""
+        return time.monotonic() >= self._db_retry_at
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'queries': self.queries,
+            'errors': self.errors,
+            'evictions': self.evictions
+        }
+
+
+_shield_lookup: Optional[ShieldAddressLookup] = None
+_shield_lookup_lock = threading.Lock()
+
+
+def get_shield_lookup() -> ShieldAddressLookup:
+    """
+    Get the process-wide shield address lookup shared by all inbound handlers.
+
+    Sized by SHIELD_LOOKUP_CACHE_SIZE, SHIELD_LOOKUP_TTL_SECONDS and
+    SHIELD_LOOKUP_NEGATIVE_TTL_SECONDS.
+    """
+    global _shield_lookup
+    if _shield_lookup is None:
+        with _shield_lookup_lock:
+            if _shield_lookup is None:
+                _shield_lookup = ShieldAddressLookup(
+                    max_entries=_env_number("SHIELD_LOOKUP_CACHE_SIZE", DEFAULT_MAX_ENTRIES),
+                    ttl_seconds=_env_number("SHIELD_LOOKUP_TTL_SECONDS", DEFAULT_TTL_SECONDS, float),
+                    negative_ttl_seconds=_env_number(
+                        "SHIELD_LOOKUP_NEGATIVE_TTL_SECONDS", DEFAULT_NEGATIVE_TTL_SECONDS, float
+                    )
+                )
+    return _shield_lookup
+
+
+def reset_shield_lookup() -> None:
+    """Drop the shared lookup (for testing)."""
+    global _shield_lookup
+    with _shield_lookup_lock:
+        _shield_lookup = None
@@ -4,6 +4,8 @@ import logging
 from typing import Optional, List
 from datetime import datetime
 
+from .lookup import get_shield_lookup, normalize_shield_address
+from .recipient_filter import get_recipient_filter
 from .models import ShieldAddressInfo
 
 logger = logging.getLogger(__name__)
@@ -12,7 +14,10 @@ logger = logging.getLogger(__name__)
 class ShieldAddressManager:
     """
     Manages shield addresses and user lookups.
-    Self-contained feature that doesn't depend on external services.
+
+    Addresses created on this instance (and the demo addresses) are checked
+    first; everything else resolves through the process-wide cached
+    database lookup, so constructing a manager per request stays cheap.
     """
     
     def __init__(self):
@@ -64,7 +69,7 @@ class ShieldAddressManager:
         for addr_info in demo_addresses:
             self._shield_addresses[addr_info.shield_address] = addr_info
             
-        logger.info(f"Initialized {len(demo_addresses)} demo shield addresses")
+        logger.debug(f"Initialized {len(demo_addresses)} demo shield addresses")
     
     async def lookup_user_by_shield_address(self, shield_address: str) -> Optional[ShieldAddressInfo]:
         """
@@ -76,9 +81,9 @@ class ShieldAddressManager:
         Returns:
             ShieldAddressInfo if found and active, None otherwise
         """
-        shield_address = shield_address.lower().strip()
+        shield_address = normalize_shield_address(shield_address)
         
-        logger.info(f"Looking up shield address: {shield_address}")
+        logger.debug(f"Looking up shield address: {shield_address}")
         
         if shield_address in self._shield_addresses:
             addr_info = self._shield_addresses[shield_address]
@@ -91,9 +96,11 @@ class ShieldAddressManager:
             else:
                 logger.warning(f"Shield address {shield_address} exists but is inactive")
                 return None
-        else:
+        
+        addr_info = await get_shield_lookup().lookup(shield_address)
+        if addr_info is None:
             logger.warning(f"Shield address {shield_address} not found")
-            return None
+        return addr_info
     
     async def create_shield_address(
         self, 
@@ -127,6 +134,7 @@ class ShieldAddressManager:
         )
         
         self._shield_addresses[shield_address] = addr_info
+        get_recipient_filter().add(shield_address)
         
         logger.info(f"Created shield address {shield_address} for user {user_id}")
         return addr_info
@@ -141,7 +149,8 @@ class ShieldAddressManager:
         Returns:
             True if deactivated, False if not found
         """
-        shield_address = shield_address.lower().strip()
+        shield_address = normalize_shield_address(shield_address)
+        get_shield_lookup().invalidate(shield_address)
         
         if shield_address in self._shield_addresses:
             self._shield_addresses[shield_address].is_active = False
@@ -167,4 +176,11 @@ class ShieldAddressManager:
         ]
         
         logger.info(f"Found {len(user_addresses)} shield addresses for user {user_id}")
-        return user_addresses
\ No newline at end of file
+        return user_addresses
+    
+    def known_addresses(self) -> List[str]:
+        """Active shield addresses held by this manager rather than the database."""
+        return [
+            address for address, addr_info in self._shield_addresses.items()
+            if addr_info.is_active
+        ]
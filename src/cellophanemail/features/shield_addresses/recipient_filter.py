@@ -0,0 +1,272 @@
+"""
+Bloom filter of active shield addresses for rejecting unknown recipients early.
+
+SMTP clients name their recipients (RCPT TO) before sending the message
+body (DATA). Checking each recipient against an in-memory Bloom filter of
+active shield addresses lets the server refuse mail for addresses that do
+not exist before any of it is transferred, parsed or stored. A Bloom filter
+never misses a member of the set it was built from, but shields created in
+another process since the last rebuild are not in it yet, so a "no" is
+confirmed against the cached database lookup before mail is refused. A
+rare false "yes" just falls through to the normal lookup after DATA.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from .lookup import ShieldAddressLookup, get_shield_lookup, normalize_shield_address
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPECTED_ADDRESSES = 100_000
+DEFAULT_ERROR_RATE = 0.001
+DEFAULT_REFRESH_SECONDS = 60.0
+DEFAULT_SHIELD_DOMAIN = "cellophanemail.com"
+
+
+def _env_number(name: str, default, cast=int):
+    """Read a positive numeric setting from the environment."""
+    try:
+        value = cast(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name}, using default {default}")
+        return default
+    return value if value > 0 else default
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (k probes by double hashing)."""
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.bit_count = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+        self._items = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._items += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self._items
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+async def load_active_shield_addresses() -> List[str]:
+    """Every active shield address whose user is active (one query)."""
+    from ...models.shield_address import ShieldAddress
+
+    rows = await ShieldAddress.select(ShieldAddress.shield_address).where(
+        ShieldAddress.is_active == True,
+        ShieldAddress.user.is_active == True
+    )
+    return [row["shield_address"] for row in rows]
+
+
+class ShieldRecipientFilter:
+    """
+    Periodically rebuilt Bloom filter answering "could this shield address exist?".
+
+    Fails open: until the first successful build, every recipient may exist.
+    Addresses outside the shield domain are not filtered. Addresses created
+    in this process are added immediately; ones created elsewhere are found
+    by ``rejection_reply``'s database lookup until the next rebuild
+    (``refresh_seconds``).
+    """
+
+    def __init__(
+        self,
+        domain: str = DEFAULT_SHIELD_DOMAIN,
+        expected_addresses: int = DEFAULT_EXPECTED_ADDRESSES,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+        loader: Optional[Callable[[], Awaitable[Iterable[str]]]] = None,
+        lookup: Optional[ShieldAddressLookup] = None
+    ):
+        self.suffix = "@" + domain.lower()
+        self.expected_addresses = expected_addresses
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self._loader = loader or load_active_shield_addresses
+        self._lookup = lookup
+        self._filter: Optional[BloomFilter] = None
+        self._pinned: Set[str] = set()
+        # Addresses added since the current rebuild started loading
+        self._recent: Set[str] = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.built_at: Optional[float] = None
+        self.checks = 0
+        self.rejections = 0
+        self.confirmed_misses = 0
+        self.build_failures = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def pin(self, addresses: Iterable[str]) -> None:
+        """Always include these addresses (e.g. non-database demo addresses)."""
+        addresses = [normalize_shield_address(a) for a in addresses]
+        with self._lock:
+            self._pinned.update(addresses)
+            if self._filter is not None:
+                for address in addresses:
+                    self._filter.add(address)
+
+    def add(self, address: str) -> None:
+        """Make a newly created address known without waiting for a rebuild."""
+        address = normalize_shield_address(address)
+        with self._lock:
+            self._recent.add(address)
+            if self._filter is not None:
+                self._filter.add(address)
+
+    def might_exist(self, address: str) -> bool:
+        """False only if the address is in the shield domain and definitely unknown."""
+        address = normalize_shield_address(address)
+        if not address.endswith(self.suffix):
+            return True
+        current = self._filter
+        if current is None:
+            return True
+        self.checks += 1
+        return address in current
+
+    async def rejection_reply(self, address: str) -> Optional[str]:
+        """
+        SMTP reply refusing a RCPT TO address, or None to accept it.
+
+        A Bloom miss is checked against the cached shield lookup first; an
+        address found there (created elsewhere since the last rebuild) is
+        added and accepted. The refusal is temporary (450) while the
+        database is unreachable and permanent (550) only once it confirms
+        the address does not exist.
+        """
+        if self.might_exist(address):
+            return None
+        lookup = self._lookup or get_shield_lookup()
+        if await lookup.lookup(address) is not None:
+            self.confirmed_misses += 1
+            self.add(address)
+            return None
+        self.rejections += 1
+        if not lookup.available:
+            return '450 4.1.1 Mailbox temporarily unavailable'
+        return '550 5.1.1 Mailbox not found'
+
+    async def rebuild(self) -> bool:
+        """
+        Rebuild from the database; keeps the previous filter if loading fails.
+
+        Returns:
+            True if the filter was rebuilt
+        """
+        with self._lock:
+            self._recent = set()
+        try:
+            addresses = [normalize_shield_address(a) for a in await self._loader()]
+        except Exception as e:
+            self.build_failures += 1
+            logger.warning(f"Shield recipient filter rebuild failed: {e}")
+            return False
+
+        # Headroom so growth between rebuilds keeps the error rate near target
+        bloom = BloomFilter(
+            max(self.expected_addresses, 2 * (len(addresses) + len(self._pinned))),
+            self.error_rate
+        )
+        for address in addresses:
+            bloom.add(address)
+        with self._lock:
+            for address in self._pinned | self._recent:
+                bloom.add(address)
+            self._filter = bloom
+        self.built_at = time.time()
+        logger.info(f"Shield recipient filter rebuilt with {len(bloom)} addresses ({bloom.size_bytes} bytes)")
+        return True
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.rebuild()
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self) -> None:
+        """Start periodic rebuilds on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        current = self._filter
+        return {
+            'ready': current is not None,
+            'addresses': len(current) if current is not None else 0,
+            'size_bytes': current.size_bytes if current is not None else 0,
+            'built_at': self.built_at,
+            'checks': self.checks,
+            'rejections': self.rejections,
+            'confirmed_misses': self.confirmed_misses,
+            'build_failures': self.build_failures
+        }
+
+
+_recipient_filter: Optional[ShieldRecipientFilter] = None
+_recipient_filter_lock = threading.Lock()
+
+
+def get_recipient_filter() -> ShieldRecipientFilter:
+    """
+    Get the process-wide shield recipient filter.
+
+    Configured by SHIELD_DOMAIN, SHIELD_FILTER_EXPECTED_ADDRESSES,
+    SHIELD_FILTER_ERROR_RATE and SHIELD_FILTER_REFRESH_SECONDS.
+    """
+    global _recipient_filter
+    if _recipient_filter is None:
+        with _recipient_filter_lock:
+            if _recipient_filter is None:
+                _recipient_filter = ShieldRecipientFilter(
+                    domain=os.getenv("SHIELD_DOMAIN", DEFAULT_SHIELD_DOMAIN),
+                    expected_addresses=_env_number("SHIELD_FILTER_EXPECTED_ADDRESSES", DEFAULT_EXPECTED_ADDRESSES),
+                    error_rate=min(0.5, _env_number("SHIELD_FILTER_ERROR_RATE", DEFAULT_ERROR_RATE, float)),
+                    refresh_seconds=_env_number("SHIELD_FILTER_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS, float)
+                )
+    return _recipient_filter
+
+
+def reset_recipient_filter() -> None:
+    """Drop the shared filter (for testing)."""
+    global _recipient_filter
+    with _recipient_filter_lock:
+        _recipient_filter = None
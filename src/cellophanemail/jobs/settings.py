@@ -61,6 +61,11 @@ async def startup(ctx: dict) -> None:
 
     # The database engine should be configured in piccolo_conf.py
     # This just ensures the connection pool is warmed up
+
+    # Load the shared analyzer once per worker process, not once per job
+    from cellophanemail.features.email_protection.analyzer_registry import get_analyzer_registry
+    await get_analyzer_registry().warm_up()
+
     logger.info("arq worker startup complete")
 
 
@@ -50,8 +50,9 @@ async def analyze_batch_task(
         # Create batch analyzer service
         analyzer_service = BatchAnalyzerService(user_id=UUID(user_id))
 
-        # Process messages in smaller chunks for progress updates
-        chunk_size = 10
+        # Process messages in chunks for progress updates; each chunk uses
+        # one idempotency query, one bulk insert and one aggregate update
+        chunk_size = 50
         processed = 0
         failed = 0
         failed_ids: List[str] = []
@@ -60,27 +61,28 @@ async def analyze_batch_task(
         for i in range(0, len(messages), chunk_size):
             chunk = messages[i:i + chunk_size]
 
-            for message in chunk:
-                try:
-                    result = await analyzer_service.analyze_single(
-                        message=message,
-                        privacy_settings=privacy_settings,
-                    )
-                    results.append({
-                        "client_message_id": message.get("client_message_id"),
-                        "has_horsemen": result.has_horsemen,
-                        "success": True,
-                    })
-                    processed += 1
-                except Exception as e:
-                    logger.error(f"Failed to analyze message {message.get('client_message_id')}: {e}")
+            outcomes = await analyzer_service.analyze_many(
+                messages=chunk,
+                privacy_settings=privacy_settings,
+            )
+
+            for message, outcome in zip(chunk, outcomes):
+                if isinstance(outcome, BaseException):
+                    logger.error(f"Failed to analyze message {message.get('client_message_id')}: {outcome}")
                     failed += 1
                     failed_ids.append(message.get("client_message_id", "unknown"))
                     results.append({
                         "client_message_id": message.get("client_message_id"),
                         "success": False,
-                        "error": str(e),
+                        "error": str(outcome),
+                    })
+                else:
+                    results.append({
+                        "client_message_id": message.get("client_message_id"),
+                        "has_horsemen": outcome.has_horsemen,
+                        "success": True,
                     })
+                    processed += 1
 
             # Update progress
             await (
@@ -0,0 +1,109 @@
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from piccolo.table import Table
+
+
+ID = "2026-10-16T18:40:12:104233"
+VERSION = "1.30.0"
+DESCRIPTION = "Enforce unique (user, sender_identifier, channel) on sender_summaries"
+
+
+class RawTable(Table):
+    pass
+
+
+# Fold rows that were duplicated by the old read-modify-write path into the
+# oldest row for each key, so the unique index can be created.
+MERGE_DUPLICATES = """
+WITH ranked AS (
+    SELECT id,
+           ROW_NUMBER() OVER (
+               PARTITION BY "user", sender_identifier, channel
+               ORDER BY created_at, id
+           ) AS rn,
+           "user", sender_identifier, channel
+    FROM sender_summaries
+),
+totals AS (
+    SELECT "user", sender_identifier, channel,
+           SUM(COALESCE(total_messages, 0)) AS total_messages,
+           SUM(COALESCE(messages_with_horsemen, 0)) AS messages_with_horsemen,
+           SUM(COALESCE(clean_messages, 0)) AS clean_messages,
+           SUM(COALESCE(criticism_count, 0)) AS criticism_count,
+           SUM(COALESCE(contempt_count, 0)) AS contempt_count,
+           SUM(COALESCE(defensiveness_count, 0)) AS defensiveness_count,
+           SUM(COALESCE(stonewalling_count, 0)) AS stonewalling_count,
+           MIN(first_message_at) AS first_message_at,
+           MAX(last_message_at) AS last_message_at,
+           MAX(last_horseman_at) AS last_horseman_at
+    FROM sender_summaries
+    GROUP BY "user", sender_identifier, channel
+    HAVING COUNT(*) > 1
+)
+UPDATE sender_summaries AS s
+SET total_messages = t.total_messages,
+    messages_with_horsemen = t.messages_with_horsemen,
+    clean_messages = t.clean_messages,
+    criticism_count = t.criticism_count,
+    contempt_count = t.contempt_count,
+    defensiveness_count = t.defensiveness_count,
+    stonewalling_count = t.stonewalling_count,
+    horsemen_counts = json_build_object(
+        'criticism', t.criticism_count,
+        'contempt', t.contempt_count,
+        'defensiveness', t.defensiveness_count,
+        'stonewalling', t.stonewalling_count
+    ),
+    first_message_at = t.first_message_at,
+    last_message_at = t.last_message_at,
+    last_horseman_at = t.last_horseman_at,
+    updated_at = NOW()
+FROM ranked AS r, totals AS t
+WHERE r.id = s.id
+  AND r.rn = 1
+  AND t."user" = r."user"
+  AND t.sender_identifier = r.sender_identifier
+  AND t.channel = r.channel
+"""
+
+DELETE_DUPLICATES = """
+DELETE FROM sender_summaries
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY "user", sender_identifier, channel
+                   ORDER BY created_at, id
+               ) AS rn
+        FROM sender_summaries
+    ) AS ranked
+    WHERE ranked.rn > 1
+)
+"""
+
+CREATE_UNIQUE_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS sender_summaries_user_sender_channel_key
+ON sender_summaries ("user", sender_identifier, channel)
+"""
+
+DROP_UNIQUE_INDEX = """
+DROP INDEX IF EXISTS sender_summaries_user_sender_channel_key
+"""
+
+
+async def forwards():
+    manager = MigrationManager(
+        migration_id=ID, app_name="cellophanemail", description=DESCRIPTION
+    )
+
+    async def run():
+        await RawTable.raw(MERGE_DUPLICATES).run()
+        await RawTable.raw(DELETE_DUPLICATES).run()
+        await RawTable.raw(CREATE_UNIQUE_INDEX).run()
+
+    async def run_backwards():
+        await RawTable.raw(DROP_UNIQUE_INDEX).run()
+
+    manager.add_raw(run)
+    manager.add_raw_backwards(run_backwards)
+
+    return manager
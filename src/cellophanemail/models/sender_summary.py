@@ -63,5 +63,10 @@ class SenderSummary(Table, tablename="sender_summaries"):
 
     @classmethod
     def get_unique_constraint(cls):
-        """User + sender_identifier + channel should be unique."""
+        """
+        User + sender_identifier + channel should be unique.
+
+        Enforced by the sender_summaries_user_sender_channel_key index, which
+        the ON CONFLICT upsert in AggregationService relies on.
+        """
         return ["user", "sender_identifier", "channel"]
@@ -10,6 +10,7 @@ from aiosmtpd.smtp import SMTP as SMTPServer, Envelope, Session
 from ...core.email_message import EmailMessage
 from ...features.email_protection import EmailProtectionProcessor
 from ...features.shield_addresses import ShieldAddressManager
+from ...features.shield_addresses.recipient_filter import get_recipient_filter
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +22,14 @@ class SMTPHandler:
         """Initialize SMTP handler with new architecture components."""
         self.protection = EmailProtectionProcessor()
         self.shield_manager = ShieldAddressManager()
+        self.recipient_filter = get_recipient_filter()
         
     async def handle_RCPT(self, server: SMTPServer, session: Session, envelope: Envelope, address: str, rcpt_options: list):
         """Handle RCPT TO command."""
+        rejection = await self.recipient_filter.rejection_reply(address)
+        if rejection:
+            logger.info(f"Rejected unknown shield recipient at RCPT: {address}")
+            return rejection
         envelope.rcpt_tos.append(address)
         return '250 OK'
     
@@ -84,6 +90,8 @@ class SMTPServerRunner:
         
         # Create handler with new architecture
         handler = SMTPHandler()
+        handler.recipient_filter.pin(handler.shield_manager.known_addresses())
+        handler.recipient_filter.start()
         self.controller = Controller(
             handler,
             hostname=self.host,
@@ -99,6 +107,7 @@ class SMTPServerRunner:
         if self.controller:
             logger.info("Stopping SMTP server...")
             self.controller.stop()
+            await get_recipient_filter().stop()
             logger.info("SMTP server stopped")
             
     async def run_forever(self):
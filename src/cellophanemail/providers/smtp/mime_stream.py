@@ -0,0 +1,176 @@
+"""
+Streaming MIME parsing that keeps only the parts the analyzer reads.
+
+``email.message_from_bytes`` decodes the whole message to one string and
+keeps every part's payload in the resulting tree, attachments included.
+This parser feeds the raw bytes to ``BytesFeedParser`` in chunks and drops
+payloads as each part completes: the first text/plain and text/html parts
+are kept (capped at a byte budget), attachments keep only their metadata.
+"""
+
+import binascii
+import email.message
+import logging
+import quopri
+from dataclasses import dataclass, field
+from email.feedparser import BytesFeedParser
+from email.policy import compat32
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Worst-case transfer-encoding expansion (quoted-printable "=XX" per byte)
+_MAX_ENCODING_EXPANSION = 3
+
+
+@dataclass
+class MimeParseResult:
+    """Headers, kept bodies and byte accounting for one parsed message."""
+
+    message: email.message.Message
+    text_body: Optional[str] = None
+    html_body: Optional[str] = None
+    attachments: List[Dict[str, Any]] = field(default_factory=list)
+    parsed_bytes: int = 0
+    skipped_bytes: int = 0
+    truncated: bool = False
+
+
+class _ParseState:
+    def __init__(self, max_body_bytes: int):
+        self.max_body_bytes = max_body_bytes
+        self.root: Optional[email.message.Message] = None
+        self.text_body: Optional[str] = None
+        self.html_body: Optional[str] = None
+        self.attachments: List[Dict[str, Any]] = []
+        self.skipped_bytes = 0
+        self.truncated = False
+
+    def remaining(self) -> int:
+        used = sum(len(body.encode("utf-8")) for body in (self.text_body, self.html_body) if body)
+        return max(0, self.max_body_bytes - used)
+
+
+def _decoded_size(payload: str, encoding: str) -> int:
+    """Size of a part's decoded payload, without decoding it."""
+    if encoding == "base64":
+        data = "".join(payload.split())
+        return max(0, len(data) * 3 // 4 - data[-2:].count("="))
+    return len(payload)
+
+
+def _decode(payload: str, encoding: str) -> bytes:
+    raw = payload.encode("ascii", "surrogateescape")
+    if encoding == "base64":
+        try:
+            # Trailing incomplete quantum (from truncation) is dropped
+            data = b"".join(raw.split())
+            return binascii.a2b_base64(data[:len(data) - len(data) % 4])
+        except binascii.Error:
+            return b""
+    if encoding == "quoted-printable":
+        return quopri.decodestring(raw)
+    return raw
+
+
+class _StreamedPart(email.message.Message):
+    """Message part that decides what to keep when its payload is complete."""
+
+    _state: _ParseState
+
+    def set_payload(self, payload, charset=None):
+        if self.is_multipart() or not isinstance(payload, str) or self.get_content_maintype() in ("multipart", "message"):
+            super().set_payload(payload, charset)
+            return
+
+        state = self._state
+        content_type = self.get_content_type()
+        encoding = str(self.get("Content-Transfer-Encoding", "")).strip().lower()
+        is_attachment = self.get_content_disposition() == "attachment"
+
+        slot = None
+        if not is_attachment:
+            if content_type == "text/plain" and state.text_body is None:
+                slot = "text_body"
+            elif content_type == "text/html" and state.html_body is None:
+                slot = "html_body"
+            elif self is state.root:
+                slot = "text_body"  # single-part message of another type: treat as text
+
+        if slot is None:
+            size = _decoded_size(payload, encoding)
+            state.skipped_bytes += len(payload)
+            filename = self.get_filename()
+            if is_attachment and filename:
+                state.attachments.append({
+                    'name': filename,
+                    'content_type': content_type,
+                    'size': size
+                })
+            super().set_payload("", charset)
+            return
+
+        budget = state.remaining()
+        limit = budget * _MAX_ENCODING_EXPANSION
+        cut = len(payload) > limit
+        if cut:
+            state.skipped_bytes += len(payload) - limit
+            payload = payload[:limit]
+        body = _decode(payload, encoding)
+        if cut or len(body) > budget:
+            body = body[:budget]
+            state.truncated = True
+        charset_name = self.get_content_charset() or "utf-8"
+        try:
+            text = body.decode(charset_name, errors="ignore")
+        except LookupError:
+            text = body.decode("utf-8", errors="ignore")
+        setattr(state, slot, text)
+        super().set_payload("", charset)
+
+
+def parse_message_streaming(
+    message_data: bytes,
+    max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+    chunk_size: int = CHUNK_SIZE
+) -> MimeParseResult:
+    """
+    Parse a raw RFC 5322 message, keeping bodies up to ``max_body_bytes`` in total.
+
+    Args:
+        message_data: Raw message bytes (e.g. SMTP DATA)
+        max_body_bytes: Budget for decoded text + HTML bodies combined
+        chunk_size: Bytes fed to the parser per step
+
+    Returns:
+        MimeParseResult whose ``message`` carries all headers but no payloads
+    """
+    state = _ParseState(max_body_bytes)
+
+    def factory(policy=compat32):
+        part = _StreamedPart(policy)
+        part._state = state
+        if state.root is None:
+            state.root = part
+        return part
+
+    parser = BytesFeedParser(_factory=factory, policy=compat32)
+    view = memoryview(message_data)
+    for start in range(0, len(view), chunk_size):
+        parser.feed(bytes(view[start:start + chunk_size]))
+    message = parser.close()
+
+    if state.truncated:
+        logger.debug(f"Message body truncated to {max_body_bytes} bytes for analysis")
+
+    return MimeParseResult(
+        message=message,
+        text_body=state.text_body,
+        html_body=state.html_body,
+        attachments=state.attachments,
+        parsed_bytes=len(message_data),
+        skipped_bytes=state.skipped_bytes,
+        truncated=state.truncated
+    )
@@ -11,6 +11,7 @@ from email.utils import parsedate_to_datetime
 import os
 
 from ..contracts import EmailProvider, EmailMessage, ProviderConfig
+from .mime_stream import DEFAULT_MAX_BODY_BYTES, parse_message_streaming
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,16 @@ class SMTPProvider(EmailProvider):
         self.server_port: int = 25
         self.server_enabled: bool = False
         
+        # Inbound parsing: streaming mode keeps only text/HTML bodies up to a byte budget
+        self.streaming_parse: bool = os.getenv('SMTP_STREAMING_PARSE', 'true').lower() == 'true'
+        self.max_body_bytes: int = int(os.getenv('SMTP_MAX_BODY_BYTES', DEFAULT_MAX_BODY_BYTES))
+        self.parse_stats: Dict[str, int] = {
+            'messages': 0,
+            'parsed_bytes': 0,
+            'skipped_bytes': 0,
+            'truncated_messages': 0
+        }
+        
     async def initialize(self, config: ProviderConfig) -> None:
         """Initialize SMTP provider with configuration."""
         if not config.config:
@@ -49,6 +60,8 @@ class SMTPProvider(EmailProvider):
         self.server_host = config.config.get('server_host', '0.0.0.0')
         self.server_port = config.config.get('server_port', 25)
         self.server_enabled = config.config.get('server_enabled', False)
+        self.streaming_parse = config.config.get('streaming_parse', self.streaming_parse)
+        self.max_body_bytes = config.config.get('max_body_bytes', self.max_body_bytes)
         
         if not self.smtp_host and self.server_enabled:
             logger.warning("SMTP host not configured - sending will not work")
@@ -119,15 +132,22 @@ class SMTPProvider(EmailProvider):
     def _parse_smtp_envelope(self, envelope: Any, message_data: bytes) -> EmailMessage:
         """Parse SMTP envelope and message data."""
         # Parse the email message
-        msg = email.message_from_bytes(message_data)
+        if self.streaming_parse:
+            parsed = parse_message_streaming(message_data, self.max_body_bytes)
+            msg = parsed.message
+            text_body, html_body = parsed.text_body, parsed.html_body
+            attachments = parsed.attachments
+            self._record_parse(parsed.parsed_bytes, parsed.skipped_bytes, parsed.truncated)
+        else:
+            msg = email.message_from_bytes(message_data)
+            text_body, html_body = self._extract_message_content(msg)
+            attachments = self._extract_attachments(msg)
+            self._record_parse(len(message_data), 0, False)
         
         # Extract recipient from envelope (more reliable than headers)
         to_addresses = getattr(envelope, 'rcpt_tos', [])
         from_address = getattr(envelope, 'mail_from', '') or str(msg.get('From', ''))
         
-        # Extract content
-        text_body, html_body = self._extract_message_content(msg)
-        
         # Extract headers
         headers = {key: value for key, value in msg.items()}
         
@@ -146,11 +166,20 @@ class SMTPProvider(EmailProvider):
             text_body=text_body,
             html_body=html_body,
             headers=headers,
-            attachments=self._extract_attachments(msg),
+            attachments=attachments,
             received_at=received_at,
             shield_address=shield_address
         )
     
+    def _record_parse(self, parsed_bytes: int, skipped_bytes: int, truncated: bool) -> None:
+        """Accumulate inbound parse accounting (see ``parse_stats``)."""
+        self.parse_stats['messages'] += 1
+        self.parse_stats['parsed_bytes'] += parsed_bytes
+        self.parse_stats['skipped_bytes'] += skipped_bytes
+        if truncated:
+            self.parse_stats['truncated_messages'] += 1
+        logger.debug(f"Parsed {parsed_bytes} bytes, skipped {skipped_bytes} bytes of attachment/overflow payload")
+    
     def _parse_raw_email(self, raw_message: bytes) -> EmailMessage:
         """Parse raw email message bytes."""
         msg = email.message_from_bytes(raw_message)
@@ -11,6 +11,7 @@ from aiosmtpd.smtp import SMTP as SMTPServer, Envelope, Session
 from .provider import SMTPProvider
 from ...features.email_protection import EmailProtectionProcessor
 from ...features.shield_addresses import ShieldAddressManager
+from ...features.shield_addresses.recipient_filter import get_recipient_filter
 
 logger = logging.getLogger(__name__)
 
@@ -90,6 +91,11 @@ class SMTPServerHandler:
     async def start_server(self) -> None:
         """Start the SMTP server."""
         try:
+            # Keep the RCPT-time recipient filter current while the server runs
+            recipient_filter = get_recipient_filter()
+            recipient_filter.pin(self.message_handler.shield_manager.known_addresses())
+            recipient_filter.start()
+            
             # Create SMTP handler
             handler = SMTPHandler(self.message_handler)
             
@@ -117,6 +123,7 @@ class SMTPServerHandler:
             try:
                 self.controller.stop()
                 self.running = False
+                await get_recipient_filter().stop()
                 logger.info("SMTP server stopped")
             except Exception as e:
                 logger.error(f"Error stopping SMTP server: {e}")
@@ -140,11 +147,17 @@ class SMTPHandler:
     
     def __init__(self, message_handler: SMTPMessageHandler):
         self.message_handler = message_handler
+        self.recipient_filter = get_recipient_filter()
     
     async def handle_RCPT(self, server: SMTPServer, session: Session, envelope: Envelope, address: str, rcpt_options: list) -> str:
         """Handle RCPT TO command - validate recipients."""
         try:
-            # Accept all @cellophanemail.com addresses
+            # Refuse shield addresses that cannot exist before any DATA is sent
+            rejection = await self.recipient_filter.rejection_reply(address)
+            if rejection:
+                logger.info(f"Rejected unknown shield recipient at RCPT: {address}")
+                return rejection
+            
             if address.lower().endswith('@cellophanemail.com'):
                 envelope.rcpt_tos.append(address)
                 return '250 OK'
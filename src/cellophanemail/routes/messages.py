@@ -9,7 +9,7 @@ from litestar.status_codes import HTTP_200_OK
 from pydantic import BaseModel, Field
 
 from cellophanemail.middleware.jwt_auth import jwt_auth_required
-from cellophanemail.features.email_protection.analyzer_factory import AnalyzerFactory
+from cellophanemail.features.email_protection.analyzer_interface import IEmailAnalyzer
 
 
 class MessageChannel(str, Enum):
@@ -214,7 +214,7 @@ class MessagesController(Controller):
 
     @post("/analyze", status_code=HTTP_200_OK)
     async def analyze_message(
-        self, data: MessageAnalyzeRequest
+        self, data: MessageAnalyzeRequest, analyzer: IEmailAnalyzer
     ) -> MessageAnalyzeResponse:
         """
         Analyze message content for Four Horsemen toxicity patterns.
@@ -229,11 +229,8 @@ class MessagesController(Controller):
         elif data.sender:
             sender_context = data.sender
 
-        # Create analyzer using factory (respects environment config)
-        analyzer = AnalyzerFactory.create_analyzer()
-
-        # Use existing analyzer - text-agnostic by design
-        analysis = analyzer.analyze_email_toxicity(
+        # Shared analyzer injected from the registry - text-agnostic by design
+        analysis = await analyzer.analyze_email_toxicity_async(
             email_content=data.content,
             sender_email=sender_context,
         )
@@ -21,6 +21,7 @@ from cellophanemail.models import (
     JobStatus,
 )
 from cellophanemail.services.batch_analyzer import BatchAnalyzerService
+from cellophanemail.features.email_protection.analyzer_interface import IEmailAnalyzer
 from cellophanemail.services.aggregation_service import AggregationService
 
 logger = logging.getLogger(__name__)
@@ -267,6 +268,7 @@ class SMSAnalysisController(Controller):
         self,
         request: Request,
         data: BatchAnalyzeRequest,
+        analyzer: IEmailAnalyzer,
     ) -> BatchAnalyzeResponse:
         """
         Analyze a batch of messages synchronously (STATELESS MODE).
@@ -294,7 +296,7 @@ class SMSAnalysisController(Controller):
         privacy = (data.privacy.model_dump() if data.privacy else {"store_body": False, "body_ttl_hours": 24})
 
         # Process batch
-        service = BatchAnalyzerService(user_id=user_id)
+        service = BatchAnalyzerService(user_id=user_id, analyzer=analyzer)
         results = await service.process_batch(messages=messages, privacy_settings=privacy)
 
         # Format response and compute aggregates
@@ -1,9 +1,11 @@
 """Aggregation service for sender-level Four Horsemen statistics."""
 
+import json
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-from uuid import UUID
+from typing import Dict, Any, Optional, List, Tuple
+from uuid import UUID, uuid4
 
 from cellophanemail.models import (
     MessageAnalysis,
@@ -13,6 +15,110 @@ from cellophanemail.models import (
 
 logger = logging.getLogger(__name__)
 
+HORSEMEN = ("criticism", "contempt", "defensiveness", "stonewalling")
+
+# 17 parameters per row keeps each statement well under asyncpg's 32767 limit
+UPSERT_CHUNK_SIZE = 500
+
+UPSERT_ROW = "({}, {}, {}, {}, {}, {}, {}, {}, {}, {}, {}, {}::json, {}, {}, {}, {}, {})"
+
+UPSERT_SQL = """
+INSERT INTO sender_summaries (
+    id, "user", sender_identifier, channel,
+    total_messages, messages_with_horsemen, clean_messages,
+    criticism_count, contempt_count, defensiveness_count, stonewalling_count,
+    horsemen_counts, first_message_at, last_message_at, last_horseman_at,
+    created_at, updated_at
+)
+VALUES {values}
+ON CONFLICT ("user", sender_identifier, channel) DO UPDATE SET
+    total_messages = COALESCE(sender_summaries.total_messages, 0) + EXCLUDED.total_messages,
+    messages_with_horsemen =
+        COALESCE(sender_summaries.messages_with_horsemen, 0) + EXCLUDED.messages_with_horsemen,
+    clean_messages = COALESCE(sender_summaries.clean_messages, 0) + EXCLUDED.clean_messages,
+    criticism_count = COALESCE(sender_summaries.criticism_count, 0) + EXCLUDED.criticism_count,
+    contempt_count = COALESCE(sender_summaries.contempt_count, 0) + EXCLUDED.contempt_count,
+    defensiveness_count =
+        COALESCE(sender_summaries.defensiveness_count, 0) + EXCLUDED.defensiveness_count,
+    stonewalling_count =
+        COALESCE(sender_summaries.stonewalling_count, 0) + EXCLUDED.stonewalling_count,
+    horsemen_counts = json_build_object(
+        'criticism', COALESCE(sender_summaries.criticism_count, 0) + EXCLUDED.criticism_count,
+        'contempt', COALESCE(sender_summaries.contempt_count, 0) + EXCLUDED.contempt_count,
+        'defensiveness',
+            COALESCE(sender_summaries.defensiveness_count, 0) + EXCLUDED.defensiveness_count,
+        'stonewalling',
+            COALESCE(sender_summaries.stonewalling_count, 0) + EXCLUDED.stonewalling_count
+    ),
+    last_message_at = EXCLUDED.last_message_at,
+    last_horseman_at = COALESCE(EXCLUDED.last_horseman_at, sender_summaries.last_horseman_at),
+    updated_at = EXCLUDED.updated_at
+RETURNING *
+"""
+
+
+@dataclass
+class SenderDelta:
+    """Counter increments for one (sender, channel) summary."""
+
+    sender_identifier: str
+    channel: str
+    total_messages: int = 0
+    messages_with_horsemen: int = 0
+    clean_messages: int = 0
+    horsemen_counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(HORSEMEN, 0))
+
+    def add(self, analysis: MessageAnalysis) -> None:
+        """Count one analyzed message."""
+        self.total_messages += 1
+        if analysis.has_horsemen:
+            self.messages_with_horsemen += 1
+            flags = {
+                "criticism": analysis.has_criticism,
+                "contempt": analysis.has_contempt,
+                "defensiveness": analysis.has_defensiveness,
+                "stonewalling": analysis.has_stonewalling,
+            }
+            for horseman, detected in flags.items():
+                if detected:
+                    self.horsemen_counts[horseman] += 1
+        else:
+            self.clean_messages += 1
+
+    def merge(self, other: "SenderDelta") -> None:
+        """Fold another delta for the same key into this one."""
+        self.total_messages += other.total_messages
+        self.messages_with_horsemen += other.messages_with_horsemen
+        self.clean_messages += other.clean_messages
+        for horseman, count in other.horsemen_counts.items():
+            self.horsemen_counts[horseman] += count
+
+    def apply_to(self, summary: SenderSummary, now: datetime) -> None:
+        """Add these increments to a SenderSummary instance."""
+        summary.total_messages = (summary.total_messages or 0) + self.total_messages
+        summary.last_message_at = now
+        summary.updated_at = now
+
+        if self.messages_with_horsemen:
+            summary.messages_with_horsemen = (
+                (summary.messages_with_horsemen or 0) + self.messages_with_horsemen
+            )
+            summary.last_horseman_at = now
+
+            # JSON columns load as strings unless the query asked for load_json
+            horsemen_counts = summary.horsemen_counts or dict.fromkeys(HORSEMEN, 0)
+            if isinstance(horsemen_counts, str):
+                horsemen_counts = json.loads(horsemen_counts)
+            horsemen_counts = dict(horsemen_counts)
+            for horseman, count in self.horsemen_counts.items():
+                column = f"{horseman}_count"
+                setattr(summary, column, (getattr(summary, column) or 0) + count)
+                horsemen_counts[horseman] = (horsemen_counts.get(horseman, 0) or 0) + count
+            summary.horsemen_counts = horsemen_counts
+
+        if self.clean_messages:
+            summary.clean_messages = (summary.clean_messages or 0) + self.clean_messages
+
 
 class AggregationService:
     """Service for managing sender-level aggregates."""
@@ -41,86 +147,180 @@ class AggregationService:
         Returns:
             Updated SenderSummary record
         """
-        sender_id = analysis.sender_identifier
-        channel_value = self._parse_channel(channel)
-
-        # Get or create sender summary
-        summary = await (
-            SenderSummary.select()
-            .where(SenderSummary.user == self.user_id)
-            .where(SenderSummary.sender_identifier == sender_id)
-            .where(SenderSummary.channel == channel_value)
-            .first()
-            .run()
+        delta = SenderDelta(
+            sender_identifier=analysis.sender_identifier,
+            channel=self._parse_channel(channel),
         )
+        delta.add(analysis)
 
-        now = datetime.now()
-
-        if not summary:
-            # Create new summary
-            summary = SenderSummary(
-                user=self.user_id,
-                sender_identifier=sender_id,
-                channel=channel_value,
-                total_messages=0,
-                messages_with_horsemen=0,
-                clean_messages=0,
-                criticism_count=0,
-                contempt_count=0,
-                defensiveness_count=0,
-                stonewalling_count=0,
-                horsemen_counts={
-                    "criticism": 0,
-                    "contempt": 0,
-                    "defensiveness": 0,
-                    "stonewalling": 0,
-                },
-                first_message_at=now,
-                last_message_at=now,
-                created_at=now,
-                updated_at=now,
-            )
+        summaries = await self.apply_deltas([delta])
+        return summaries[0]
 
-        # Increment message count
-        summary.total_messages = (summary.total_messages or 0) + 1
-        summary.last_message_at = now
-        summary.updated_at = now
+    async def update_for_analyses(
+        self,
+        analyses: List[MessageAnalysis],
+    ) -> List[SenderSummary]:
+        """
+        Update sender aggregates for a batch of new analyses.
 
-        # Update horsemen counts
-        if analysis.has_horsemen:
-            summary.messages_with_horsemen = (summary.messages_with_horsemen or 0) + 1
-            summary.last_horseman_at = now
+        Analyses are grouped per (sender, channel) first, so each sender
+        summary is written once per batch rather than once per message.
 
-            # Update individual horseman counts
-            horsemen_counts = summary.horsemen_counts or {
-                "criticism": 0,
-                "contempt": 0,
-                "defensiveness": 0,
-                "stonewalling": 0,
-            }
+        Args:
+            analyses: New MessageAnalysis records (channel already parsed)
 
-            if analysis.has_criticism:
-                summary.criticism_count = (summary.criticism_count or 0) + 1
-                horsemen_counts["criticism"] = (horsemen_counts.get("criticism", 0) or 0) + 1
+        Returns:
+            Updated SenderSummary records, one per (sender, channel)
+        """
+        return await self.apply_deltas(self.group_deltas(analyses))
+
+    def group_deltas(self, analyses: List[MessageAnalysis]) -> List[SenderDelta]:
+        """Pre-aggregate counter increments per (sender, channel)."""
+        deltas: Dict[Tuple[str, str], SenderDelta] = {}
+        for analysis in analyses:
+            channel_value = self._parse_channel(analysis.channel or MessageChannel.OTHER.value)
+            key = (analysis.sender_identifier, channel_value)
+            if key not in deltas:
+                deltas[key] = SenderDelta(sender_identifier=key[0], channel=key[1])
+            deltas[key].add(analysis)
+        return list(deltas.values())
+
+    async def apply_deltas(self, deltas: List[SenderDelta]) -> List[SenderSummary]:
+        """
+        Apply pre-aggregated deltas to sender summaries.
 
-            if analysis.has_contempt:
-                summary.contempt_count = (summary.contempt_count or 0) + 1
-                horsemen_counts["contempt"] = (horsemen_counts.get("contempt", 0) or 0) + 1
+        On Postgres the counters are incremented in the database with a
+        single INSERT ... ON CONFLICT DO UPDATE, so concurrent batches for
+        the same sender cannot lose updates. Other engines fall back to a
+        grouped read-modify-write.
 
-            if analysis.has_defensiveness:
-                summary.defensiveness_count = (summary.defensiveness_count or 0) + 1
-                horsemen_counts["defensiveness"] = (horsemen_counts.get("defensiveness", 0) or 0) + 1
+        Args:
+            deltas: Counter increments per (sender, channel)
 
-            if analysis.has_stonewalling:
-                summary.stonewalling_count = (summary.stonewalling_count or 0) + 1
-                horsemen_counts["stonewalling"] = (horsemen_counts.get("stonewalling", 0) or 0) + 1
+        Returns:
+            Updated SenderSummary records in delta order
+        """
+        if not deltas:
+            return []
+
+        if SenderSummary._meta.db.engine_type == "postgres":
+            return await self._upsert_deltas(deltas)
+        return await self._apply_deltas_read_modify_write(deltas)
+
+    async def _upsert_deltas(self, deltas: List[SenderDelta]) -> List[SenderSummary]:
+        """Increment counters atomically via the unique (user, sender, channel) index."""
+        # ON CONFLICT cannot touch the same row twice in one statement
+        merged: Dict[Tuple[str, str], SenderDelta] = {}
+        for delta in deltas:
+            key = (delta.sender_identifier, delta.channel)
+            if key not in merged:
+                merged[key] = SenderDelta(sender_identifier=key[0], channel=key[1])
+            merged[key].merge(delta)
+
+        # Lock rows in a stable order so concurrent batches cannot deadlock
+        ordered = [merged[key] for key in sorted(merged)]
+        now = datetime.now()
+        by_key: Dict[Tuple[str, str], SenderSummary] = {}
+
+        for start in range(0, len(ordered), UPSERT_CHUNK_SIZE):
+            chunk = ordered[start:start + UPSERT_CHUNK_SIZE]
+            values_sql = []
+            args: List[Any] = []
+            for delta in chunk:
+                values_sql.append(UPSERT_ROW)
+                args.extend(self._upsert_args(delta, now))
+
+            rows = await SenderSummary.raw(
+                UPSERT_SQL.format(values=", ".join(values_sql)), *args
+            ).run()
+            for row in rows:
+                summary = SenderSummary.from_dict(row)
+                by_key[(summary.sender_identifier, summary.channel)] = summary
+
+        return [by_key[(d.sender_identifier, d.channel)] for d in deltas]
+
+    def _upsert_args(self, delta: SenderDelta, now: datetime) -> List[Any]:
+        """Positional arguments for one UPSERT_ROW."""
+        counts = delta.horsemen_counts
+        return [
+            uuid4(),
+            self.user_id,
+            delta.sender_identifier,
+            delta.channel,
+            delta.total_messages,
+            delta.messages_with_horsemen,
+            delta.clean_messages,
+            counts["criticism"],
+            counts["contempt"],
+            counts["defensiveness"],
+            counts["stonewalling"],
+            json.dumps(counts),
+            now,
+            now,
+            now if delta.messages_with_horsemen else None,
+            now,
+            now,
+        ]
+
+    async def _apply_deltas_read_modify_write(
+        self,
+        deltas: List[SenderDelta],
+    ) -> List[SenderSummary]:
+        """
+        Apply deltas by loading, mutating and saving summaries.
 
-            summary.horsemen_counts = horsemen_counts
-        else:
-            summary.clean_messages = (summary.clean_messages or 0) + 1
+        Existing summaries for all senders are loaded in one query and new
+        ones are created with a single multi-row insert. Not safe against
+        concurrent writers; only used where ON CONFLICT is unavailable.
+        """
+        senders = list({d.sender_identifier for d in deltas})
+        existing = await (
+            SenderSummary.objects()
+            .where(SenderSummary.user == self.user_id)
+            .where(SenderSummary.sender_identifier.is_in(senders))
+            .run()
+        )
+        by_key = {(s.sender_identifier, s.channel): s for s in existing}
 
-        await summary.save().run()
-        return summary
+        now = datetime.now()
+        summaries: List[SenderSummary] = []
+        to_insert: List[SenderSummary] = []
+        to_update: List[SenderSummary] = []
+
+        for delta in deltas:
+            summary = by_key.get((delta.sender_identifier, delta.channel))
+            if summary is None:
+                summary = SenderSummary(
+                    user=self.user_id,
+                    sender_identifier=delta.sender_identifier,
+                    channel=delta.channel,
+                    total_messages=0,
+                    messages_with_horsemen=0,
+                    clean_messages=0,
+                    criticism_count=0,
+                    contempt_count=0,
+                    defensiveness_count=0,
+                    stonewalling_count=0,
+                    horsemen_counts=dict.fromkeys(HORSEMEN, 0),
+                    first_message_at=now,
+                    last_message_at=now,
+                    created_at=now,
+                    updated_at=now,
+                )
+                by_key[(delta.sender_identifier, delta.channel)] = summary
+                to_insert.append(summary)
+            elif summary not in to_update:
+                to_update.append(summary)
+
+            delta.apply_to(summary, now)
+            summaries.append(summary)
+
+        if to_insert:
+            await SenderSummary.insert(*to_insert).run()
+        for summary in to_update:
+            await summary.save().run()
+
+        return summaries
 
     async def get_sender_summary(
         self,
@@ -1,22 +1,234 @@
 """Analysis caching service for cost optimization."""
 
+import asyncio
 import hashlib
 import json
 import logging
-from typing import Dict, Optional
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
 from datetime import datetime, timedelta
 
+from .near_duplicate_index import NearDuplicateIndex
+
+# Optional Redis import with graceful degradation
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_ENTRIES = 10_000
+REDIS_KEY_PREFIX = "cellophanemail:"
+
+
+class CacheBackend(ABC):
+    """Storage for cached analysis results."""
+
+    # True when operations do network I/O and should stay off the event loop
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        pass
+
+    @abstractmethod
+    def cleanup_expired(self) -> int:
+        pass
+
+    @abstractmethod
+    def clear(self) -> int:
+        pass
+
+    @abstractmethod
+    def size(self) -> int:
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def cleanup_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if now >= expires_at]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed cache shared by all web and arq worker processes."""
+
+    blocking = True
+
+    def __init__(self, redis_url: str, max_entries: int = DEFAULT_MAX_ENTRIES, client=None):
+        # Local fallback keeps caching (per process) when Redis is unreachable
+        self._fallback = InMemoryCacheBackend(max_entries)
+        self.redis_client = client
+        if self.redis_client is not None:
+            return
+
+        if not REDIS_AVAILABLE:
+            logger.warning("Redis not installed, analysis cache falling back to in-memory")
+            return
+
+        try:
+            self.redis_client = redis.from_url(
+                redis_url,
+                socket_connect_timeout=2,
+                socket_timeout=0.5,
+                health_check_interval=30
+            )
+            self.redis_client.ping()
+            logger.info("Redis analysis cache initialized")
+        except Exception as e:
+            logger.warning(f"Redis connection failed: {e}, analysis cache falling back to in-memory")
+            self.redis_client = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.redis_client:
+            return self._fallback.get(key)
+        try:
+            raw = self.redis_client.get(REDIS_KEY_PREFIX + key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.error(f"Redis cache get error: {e}")
+            return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        if not self.redis_client:
+            self._fallback.set(key, value, ttl_seconds)
+            return
+        try:
+            # Redis enforces the TTL; maxmemory-policy handles the size bound
+            self.redis_client.set(
+                REDIS_KEY_PREFIX + key,
+                json.dumps(value, default=str),
+                ex=max(1, int(ttl_seconds))
+            )
+        except Exception as e:
+            logger.error(f"Redis cache set error: {e}")
+
+    def cleanup_expired(self) -> int:
+        return self._fallback.cleanup_expired()
+
+    def clear(self) -> int:
+        count = self._fallback.clear()
+        if self.redis_client:
+            try:
+                keys = list(self.redis_client.scan_iter(match=f"{REDIS_KEY_PREFIX}analysis:*"))
+                if keys:
+                    count += self.redis_client.delete(*keys)
+            except Exception as e:
+                logger.error(f"Redis cache clear error: {e}")
+        return count
+
+    def size(self) -> int:
+        return self._fallback.size()
+
+
+def create_cache_backend() -> CacheBackend:
+    """
+    Build the cache backend from environment configuration.
+
+    ANALYSIS_CACHE_BACKEND selects "memory" (default) or "redis";
+    ANALYSIS_CACHE_MAX_ENTRIES bounds the in-process LRU.
+    """
+    try:
+        max_entries = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+    except ValueError:
+        logger.warning("Invalid ANALYSIS_CACHE_MAX_ENTRIES, using default")
+        max_entries = DEFAULT_MAX_ENTRIES
+
+    if os.getenv("ANALYSIS_CACHE_BACKEND", "memory").lower() == "redis":
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        return RedisCacheBackend(redis_url, max_entries=max_entries)
+    return InMemoryCacheBackend(max_entries=max_entries)
+
+
+def create_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """
+    Build the near-duplicate index from environment configuration.
+
+    ANALYSIS_CACHE_NEAR_DUPLICATES=false disables it;
+    ANALYSIS_CACHE_SIMILARITY_THRESHOLD sets the minimum estimated Jaccard
+    similarity of word shingles (default 0.8).
+    """
+    if os.getenv("ANALYSIS_CACHE_NEAR_DUPLICATES", "true").lower() in ("false", "0", "no"):
+        return None
+    try:
+        threshold = float(os.getenv("ANALYSIS_CACHE_SIMILARITY_THRESHOLD", "0.8"))
+    except ValueError:
+        logger.warning("Invalid ANALYSIS_CACHE_SIMILARITY_THRESHOLD, using default")
+        threshold = 0.8
+    return NearDuplicateIndex(similarity_threshold=threshold)
+
 
 class AnalysisCacheService:
     """Cache service to reduce AI analysis costs through intelligent caching."""
-    
-    def __init__(self):
-        # In production, use Redis. For now, simple in-memory cache
-        self._cache = {}
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        metrics_collector=None,
+        near_duplicate_index: Optional[NearDuplicateIndex] = None,
+        enable_near_duplicates: bool = True,
+    ):
+        self._backend = backend or create_cache_backend()
+        self._metrics = metrics_collector
+        if near_duplicate_index is None and enable_near_duplicates:
+            near_duplicate_index = create_near_duplicate_index()
+        self._near_duplicates = near_duplicate_index
+        self._stats_lock = threading.Lock()
         self._cache_stats = {
             'hits': 0,
+            'near_duplicate_hits': 0,
             'misses': 0,
             'cost_saved_usd': 0.0
         }
@@ -27,118 +239,217 @@ class AnalysisCacheService:
             'suspicious': timedelta(hours=1),       # Suspicious content cache briefly
             'harmful': timedelta(minutes=30)        # Harmful content minimal cache
         }
-    
-    def _generate_cache_key(self, content: str, sender: str) -> str:
+
+    @property
+    def backend(self) -> CacheBackend:
+        """Storage backend in use."""
+        return self._backend
+
+    def set_metrics_collector(self, metrics_collector) -> None:
+        """Export hit/miss counts through a MetricsCollector."""
+        self._metrics = metrics_collector
+
+    def _generate_cache_key(self, content: str, sender: str, namespace: str = "default") -> str:
         """Generate cache key from content and sender."""
         # Normalize content for better cache hits
         normalized_content = content.lower().strip()
         # Hash to create consistent key while protecting privacy
         content_hash = hashlib.sha256(
-            f"{normalized_content}:{sender}".encode()
-        ).hexdigest()[:16]
+            f"{namespace}:{normalized_content}:{sender}".encode()
+        ).hexdigest()[:32]
         return f"analysis:{content_hash}"
-    
+
     def _get_cache_category(self, classification: str, content: str) -> str:
         """Determine cache category for TTL selection."""
         business_indicators = [
-            'unsubscribe', 'newsletter', 'receipt', 'invoice', 
+            'unsubscribe', 'newsletter', 'receipt', 'invoice',
             'order confirmation', 'delivery', 'account statement'
         ]
-        
+
         if classification == 'SAFE':
+            lowered = content.lower()
             for indicator in business_indicators:
-                if indicator in content.lower():
+                if indicator in lowered:
                     return 'safe_business'
             return 'safe_personal'
         elif classification in ['WARNING']:
             return 'suspicious'
         else:  # HARMFUL, ABUSIVE
             return 'harmful'
-    
-    def get_cached_analysis(self, content: str, sender: str) -> Optional[Dict]:
-        """Get cached analysis result if available."""
-        cache_key = self._generate_cache_key(content, sender)
-        
-        if cache_key in self._cache:
-            cached_data = self._cache[cache_key]
-            
-            # Check if cache entry is still valid
-            if datetime.now() < cached_data['expires_at']:
+
+    def _near_duplicate_scope(self, sender: str, recipient: str, namespace: str) -> str:
+        """Near-duplicates only match within one sender and one recipient."""
+        return f"{namespace}:{recipient.lower().strip()}:{sender.lower().strip()}"
+
+    def _find_near_duplicate(
+        self, content: str, sender: str, recipient: Optional[str], namespace: str
+    ) -> Optional[tuple[Dict[str, Any], float]]:
+        if self._near_duplicates is None or not recipient:
+            return None
+        match = self._near_duplicates.find(self._near_duplicate_scope(sender, recipient, namespace), content)
+        if match is None:
+            return None
+        cached_data, similarity, novel_tokens = match
+        # A small hostile addition to a long benign message can stay above
+        # the threshold; a SAFE verdict says nothing about words it never saw
+        if novel_tokens and str(cached_data.get('cache_category', '')).startswith('safe'):
+            return None
+        return cached_data, similarity
+
+    @staticmethod
+    def _without_message_details(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop text quoted from the cached message; only the verdict carries over."""
+        result['reasoning'] = 'Near-duplicate of a previously analyzed message'
+        result.pop('indicators', None)
+        if isinstance(result.get('horsemen_detected'), list):
+            result['horsemen_detected'] = [
+                {**h, 'indicators': []} if isinstance(h, dict) else h
+                for h in result['horsemen_detected']
+            ]
+        return result
+
+    def _record(self, hit: bool, cache_key: str, cache_type: str = 'analysis') -> None:
+        with self._stats_lock:
+            if hit:
                 self._cache_stats['hits'] += 1
+                if cache_type == 'analysis_near_duplicate':
+                    self._cache_stats['near_duplicate_hits'] += 1
                 # Estimate cost savings (approximate Anthropic API cost)
                 self._cache_stats['cost_saved_usd'] += 0.003  # ~$3 per 1000 tokens
-                
-                result = cached_data['result'].copy()
-                result['cache_hit'] = True
-                result['cached_at'] = cached_data['cached_at'].isoformat()
-                
-                logger.info(f"Cache HIT for analysis - saved $0.003")
-                return result
             else:
-                # Cache expired, remove entry
-                del self._cache[cache_key]
-        
-        self._cache_stats['misses'] += 1
-        return None
-    
-    def cache_analysis(self, content: str, sender: str, analysis_result: Dict) -> None:
+                self._cache_stats['misses'] += 1
+
+        if self._metrics is not None:
+            if hit:
+                self._metrics.record_cache_hit(cache_type, cache_key)
+            else:
+                self._metrics.record_cache_miss(cache_type, cache_key)
+
+    def get_cached_analysis(
+        self, content: str, sender: str, namespace: str = "default", recipient: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Get cached analysis result if available.
+
+        Near-duplicate matches are only considered when ``recipient`` is given.
+        """
+        cache_key = self._generate_cache_key(content, sender, namespace)
+        cached_data = self._backend.get(cache_key)
+        similarity = None
+
+        if cached_data is None:
+            match = self._find_near_duplicate(content, sender, recipient, namespace)
+            if match is not None:
+                cached_data, similarity = match
+
+        if cached_data is None:
+            self._record(False, cache_key)
+            return None
+
+        self._record(
+            True, cache_key,
+            'analysis' if similarity is None else 'analysis_near_duplicate'
+        )
+        result = dict(cached_data['result'])
+        result['cache_hit'] = True
+        result['cached_at'] = cached_data['cached_at']
+        if similarity is not None:
+            result = self._without_message_details(result)
+            result['near_duplicate_similarity'] = round(similarity, 4)
+
+        logger.debug(f"Cache HIT for analysis ({cached_data.get('cache_category')})")
+        return result
+
+    def cache_analysis(
+        self, content: str, sender: str, analysis_result: Dict, namespace: str = "default",
+        recipient: Optional[str] = None
+    ) -> None:
         """Cache analysis result with appropriate TTL."""
-        cache_key = self._generate_cache_key(content, sender)
-        
+        cache_key = self._generate_cache_key(content, sender, namespace)
+
         # Determine cache duration based on result
         classification = analysis_result.get('classification', 'SAFE')
         cache_category = self._get_cache_category(classification, content)
         ttl = self._cache_ttl[cache_category]
-        
+
         cached_data = {
-            'result': analysis_result.copy(),
-            'cached_at': datetime.now(),
-            'expires_at': datetime.now() + ttl,
+            'result': dict(analysis_result),
+            'cached_at': datetime.now().isoformat(),
             'cache_category': cache_category
         }
-        
-        self._cache[cache_key] = cached_data
-        
-        logger.info(f"Cached analysis result - category: {cache_category}, TTL: {ttl}")
-    
+
+        self._backend.set(cache_key, cached_data, ttl.total_seconds())
+        if self._near_duplicates is not None and recipient:
+            self._near_duplicates.add(
+                self._near_duplicate_scope(sender, recipient, namespace),
+                content,
+                cached_data,
+                ttl.total_seconds()
+            )
+
+        logger.debug(f"Cached analysis result - category: {cache_category}, TTL: {ttl}")
+
+    async def get_cached_analysis_async(
+        self, content: str, sender: str, namespace: str = "default", recipient: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Cache lookup that keeps network backends off the event loop."""
+        if self._backend.blocking:
+            return await asyncio.to_thread(self.get_cached_analysis, content, sender, namespace, recipient)
+        return self.get_cached_analysis(content, sender, namespace, recipient)
+
+    async def cache_analysis_async(
+        self, content: str, sender: str, analysis_result: Dict, namespace: str = "default",
+        recipient: Optional[str] = None
+    ) -> None:
+        """Cache store that keeps network backends off the event loop."""
+        if self._backend.blocking:
+            await asyncio.to_thread(self.cache_analysis, content, sender, analysis_result, namespace, recipient)
+        else:
+            self.cache_analysis(content, sender, analysis_result, namespace, recipient)
+
     def get_cache_stats(self) -> Dict:
         """Get cache performance statistics."""
         total_requests = self._cache_stats['hits'] + self._cache_stats['misses']
         hit_rate = (self._cache_stats['hits'] / total_requests * 100) if total_requests > 0 else 0
-        
+
         return {
             'cache_hits': self._cache_stats['hits'],
+            'near_duplicate_hits': self._cache_stats['near_duplicate_hits'],
             'cache_misses': self._cache_stats['misses'],
             'hit_rate_percent': round(hit_rate, 2),
             'total_cost_saved_usd': round(self._cache_stats['cost_saved_usd'], 4),
-            'cache_entries': len(self._cache)
+            'cache_entries': self._backend.size(),
+            'cache_evictions': getattr(self._backend, 'evictions', 0),
+            'cache_backend': type(self._backend).__name__
         }
-    
+
     def cleanup_expired_entries(self) -> int:
         """Remove expired cache entries to manage memory."""
-        now = datetime.now()
-        expired_keys = [
-            key for key, data in self._cache.items()
-            if now >= data['expires_at']
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
-        
-        logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
-        return len(expired_keys)
-    
+        removed = self._backend.cleanup_expired()
+        if self._near_duplicates is not None:
+            removed += self._near_duplicates.cleanup_expired()
+        logger.info(f"Cleaned up {removed} expired cache entries")
+        return removed
+
     def clear_cache(self) -> None:
         """Clear all cache entries (for testing/maintenance)."""
-        entries_cleared = len(self._cache)
-        self._cache.clear()
+        entries_cleared = self._backend.clear()
+        if self._near_duplicates is not None:
+            self._near_duplicates.clear()
         logger.info(f"Cleared {entries_cleared} cache entries")
 
 
 # Global cache instance
-_analysis_cache = AnalysisCacheService()
+_analysis_cache: Optional[AnalysisCacheService] = None
+_analysis_cache_lock = threading.Lock()
 
 
 def get_analysis_cache() -> AnalysisCacheService:
     """Get the global analysis cache instance."""
-    return _analysis_cache
\ No newline at end of file
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                from ..features.monitoring.metrics_collector import get_metrics_collector
+                _analysis_cache = AnalysisCacheService(metrics_collector=get_metrics_collector())
+    return _analysis_cache
@@ -1,8 +1,12 @@
 """Batch analyzer service for processing multiple messages."""
 
+import asyncio
 import logging
+import os
+import weakref
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from uuid import UUID
 
 from cellophanemail.models import (
@@ -11,12 +15,75 @@ from cellophanemail.models import (
     MessageDirection,
     SenderSummary,
 )
-from cellophanemail.features.email_protection.analyzer_factory import AnalyzerFactory
+from cellophanemail.features.email_protection.analyzer_interface import IEmailAnalyzer, analysis_recipient
+from cellophanemail.features.email_protection.analyzer_registry import get_analyzer_registry
 from cellophanemail.services.aggregation_service import AggregationService
 
 logger = logging.getLogger(__name__)
 
 
+def _env_number(name: str, default, cast=int):
+    """Read a positive numeric setting from the environment."""
+    try:
+        value = cast(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name}, using default {default}")
+        return default
+    return value if value > 0 else default
+
+
+class AnalysisConcurrencyLimiter:
+    """
+    Global and per-user caps on in-flight message analyses.
+
+    The global semaphore protects the LLM backend from bursts across all
+    users; the per-user semaphore stops one large sync from starving others.
+    """
+
+    def __init__(self, global_limit: int, per_user_limit: int):
+        self.global_limit = global_limit
+        self.per_user_limit = per_user_limit
+        self._global = asyncio.Semaphore(global_limit)
+        # Entries disappear once no running batch holds the user's semaphore
+        self._per_user: "weakref.WeakValueDictionary[UUID, asyncio.Semaphore]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def for_user(self, user_id: UUID) -> asyncio.Semaphore:
+        """Get (or create) the semaphore for a user."""
+        semaphore = self._per_user.get(user_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_user_limit)
+            self._per_user[user_id] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, user_semaphore: asyncio.Semaphore):
+        """Hold one per-user slot and one global slot."""
+        async with user_semaphore:
+            async with self._global:
+                yield
+
+
+# Semaphores are bound to an event loop, so keep one limiter per loop
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AnalysisConcurrencyLimiter]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_concurrency_limiter() -> AnalysisConcurrencyLimiter:
+    """Get the shared limiter for the running event loop."""
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = AnalysisConcurrencyLimiter(
+            global_limit=BatchAnalyzerService.MAX_CONCURRENT_ANALYSES,
+            per_user_limit=BatchAnalyzerService.MAX_CONCURRENT_PER_USER,
+        )
+        _limiters[loop] = limiter
+    return limiter
+
+
 class BatchAnalyzerService:
     """Service for batch message analysis with Four Horsemen detection."""
 
@@ -26,28 +93,49 @@ class BatchAnalyzerService:
     # Async job batch size limit
     ASYNC_BATCH_LIMIT = 1000
 
-    def __init__(self, user_id: UUID):
+    # In-flight analysis limits (process-wide and per user)
+    MAX_CONCURRENT_ANALYSES = _env_number("BATCH_MAX_CONCURRENCY", 20)
+    MAX_CONCURRENT_PER_USER = _env_number("BATCH_MAX_CONCURRENCY_PER_USER", 5)
+
+    # Per-message LLM timeout in seconds
+    MESSAGE_TIMEOUT_SECONDS = _env_number("BATCH_MESSAGE_TIMEOUT_SECONDS", 30.0, float)
+
+    def __init__(
+        self,
+        user_id: UUID,
+        message_timeout: Optional[float] = None,
+        analyzer: Optional[IEmailAnalyzer] = None,
+    ):
         """
         Initialize batch analyzer for a specific user.
 
         Args:
             user_id: UUID of the authenticated user
+            message_timeout: Per-message analysis timeout in seconds
+            analyzer: Analyzer to use (defaults to the shared registry instance)
         """
         self.user_id = user_id
-        self.analyzer = AnalyzerFactory.create_analyzer()
+        self.analyzer = analyzer or get_analyzer_registry().get()
         self.aggregation_service = AggregationService(user_id)
+        self.message_timeout = message_timeout or self.MESSAGE_TIMEOUT_SECONDS
 
     async def process_batch(
         self,
         messages: List[Dict[str, Any]],
         privacy_settings: Optional[Dict[str, Any]] = None,
+        concurrent: bool = True,
     ) -> List[Dict[str, Any]]:
         """
         Process a batch of messages synchronously.
 
+        In concurrent mode messages are analyzed in parallel, bounded by the
+        global and per-user limits, so batch latency tracks the slowest
+        message rather than the sum. Results keep the input order.
+
         Args:
             messages: List of message dicts with content and metadata
             privacy_settings: Optional privacy configuration
+            concurrent: Analyze messages in parallel (False for one at a time)
 
         Returns:
             List of analysis results
@@ -62,22 +150,131 @@ class BatchAnalyzerService:
             )
 
         privacy = privacy_settings or {"store_body": False, "body_ttl_hours": 24}
-        results: List[Dict[str, Any]] = []
+        outcomes = await self.analyze_many(messages, privacy, concurrent=concurrent)
 
-        for message in messages:
-            try:
-                analysis = await self.analyze_single(message, privacy)
-                results.append(self._format_result(analysis, message))
-            except Exception as e:
-                logger.error(f"Failed to analyze message {message.get('client_message_id')}: {e}")
+        results: List[Dict[str, Any]] = []
+        for message, outcome in zip(messages, outcomes):
+            if isinstance(outcome, BaseException):
                 results.append({
                     "client_message_id": message.get("client_message_id"),
                     "success": False,
-                    "error": str(e),
+                    "error": str(outcome),
                 })
+            else:
+                results.append(self._format_result(outcome, message))
 
         return results
 
+    async def analyze_many(
+        self,
+        messages: List[Dict[str, Any]],
+        privacy_settings: Dict[str, Any],
+        concurrent: bool = True,
+    ) -> List[Union[MessageAnalysis, BaseException]]:
+        """
+        Analyze a list of messages with bulk database access.
+
+        Uses one IN query for the idempotency check, one multi-row insert
+        for new MessageAnalysis rows (retried row by row if it fails) and one grouped SenderSummary update,
+        instead of several round-trips per message. Duplicate
+        client_message_ids share a single analysis.
+
+        Args:
+            messages: List of message dicts with content and metadata
+            privacy_settings: Privacy configuration for body storage
+            concurrent: Run LLM calls in parallel (bounded by the limiter)
+
+        Returns:
+            One MessageAnalysis or exception per input message, in order
+        """
+        message_ids = list(dict.fromkeys(m.get("client_message_id", "") for m in messages))
+        existing = await self._find_existing(message_ids)
+
+        pending: Dict[str, Dict[str, Any]] = {}
+        for message in messages:
+            key = message.get("client_message_id", "")
+            if key not in existing and key not in pending:
+                pending[key] = message
+
+        if existing:
+            logger.debug(f"Returning {len(existing)} existing analyses")
+
+        if concurrent:
+            limiter = get_concurrency_limiter()
+            user_semaphore = limiter.for_user(self.user_id)
+
+            async def limited(message: Dict[str, Any]) -> MessageAnalysis:
+                async with limiter.slot(user_semaphore):
+                    return await self._analyze_message(message, privacy_settings)
+
+            outcomes = await asyncio.gather(
+                *(limited(message) for message in pending.values()),
+                return_exceptions=True,
+            )
+        else:
+            outcomes = []
+            for message in pending.values():
+                try:
+                    outcomes.append(await self._analyze_message(message, privacy_settings))
+                except Exception as e:
+                    outcomes.append(e)
+
+        built: Dict[str, Union[MessageAnalysis, BaseException]] = dict(zip(pending.keys(), outcomes))
+        for key, outcome in built.items():
+            if isinstance(outcome, BaseException):
+                logger.error(f"Failed to analyze message {key}: {outcome}")
+
+        new_analyses = await self._insert_analyses(built)
+        if new_analyses:
+            await self.aggregation_service.update_for_analyses(new_analyses)
+
+        return [
+            existing.get(m.get("client_message_id", "")) or built[m.get("client_message_id", "")]
+            for m in messages
+        ]
+
+    async def _insert_analyses(
+        self, built: Dict[str, Union[MessageAnalysis, BaseException]]
+    ) -> List[MessageAnalysis]:
+        """
+        Insert new analyses, falling back to row-by-row inserts.
+
+        One multi-row insert covers the common case. If it fails (e.g. a
+        concurrent request already stored one of the client_message_ids),
+        each row is retried alone so only the offending rows fail, and a
+        row another request already stored resolves to that stored analysis.
+        Failed entries in ``built`` are replaced by their exception.
+
+        Returns:
+            The analyses this call inserted
+        """
+        new = {key: a for key, a in built.items() if isinstance(a, MessageAnalysis)}
+        if not new:
+            return []
+
+        try:
+            await MessageAnalysis.insert(*new.values()).run()
+            return list(new.values())
+        except Exception as e:
+            logger.warning(f"Bulk insert of {len(new)} analyses failed, retrying row by row: {e}")
+
+        inserted: List[MessageAnalysis] = []
+        for key, analysis in new.items():
+            try:
+                await MessageAnalysis.insert(analysis).run()
+                inserted.append(analysis)
+            except Exception as e:
+                logger.error(f"Insert of analysis {key} failed: {e}")
+                built[key] = e
+
+        failed = [key for key in new if isinstance(built[key], BaseException)]
+        if failed:
+            try:
+                built.update(await self._find_existing(failed))
+            except Exception as e:
+                logger.error(f"Lookup of {len(failed)} analyses after failed inserts failed: {e}")
+        return inserted
+
     async def analyze_single(
         self,
         message: Dict[str, Any],
@@ -94,30 +291,64 @@ class BatchAnalyzerService:
             MessageAnalysis record (saved to DB)
         """
         client_message_id = message.get("client_message_id", "")
-        content = message.get("content", "")
-        sender = message.get("sender", "")
-        channel = message.get("channel", "sms")
-        direction = message.get("direction", "inbound")
-        timestamp = message.get("timestamp")
 
         # Check for existing analysis (idempotency)
-        existing = await (
-            MessageAnalysis.select()
+        existing = await self._find_existing([client_message_id])
+
+        if existing:
+            logger.debug(f"Returning existing analysis for {client_message_id}")
+            return existing[client_message_id]
+
+        analysis = await self._analyze_message(message, privacy_settings)
+
+        await analysis.save().run()
+
+        # Update sender aggregates
+        await self.aggregation_service.update_for_analysis(
+            analysis=analysis,
+            channel=analysis.channel,
+        )
+
+        return analysis
+
+    async def _find_existing(self, client_message_ids: List[str]) -> Dict[str, MessageAnalysis]:
+        """Load already-analyzed messages with a single IN query."""
+        if not client_message_ids:
+            return {}
+
+        rows = await (
+            MessageAnalysis.objects()
             .where(MessageAnalysis.user == self.user_id)
-            .where(MessageAnalysis.client_message_id == client_message_id)
-            .first()
+            .where(MessageAnalysis.client_message_id.is_in(client_message_ids))
             .run()
         )
+        return {row.client_message_id: row for row in rows}
 
-        if existing:
-            logger.debug(f"Returning existing analysis for {client_message_id}")
-            return existing
+    async def _analyze_message(
+        self,
+        message: Dict[str, Any],
+        privacy_settings: Dict[str, Any],
+    ) -> MessageAnalysis:
+        """Run the LLM on one message and build an unsaved MessageAnalysis."""
+        client_message_id = message.get("client_message_id", "")
+        content = message.get("content", "")
+        sender = message.get("sender", "")
+        channel = message.get("channel", "sms")
+        direction = message.get("direction", "inbound")
+        timestamp = message.get("timestamp")
 
         # Call LLM analyzer
-        analysis_result = self.analyzer.analyze_email_toxicity(
-            email_content=content,
-            sender_email=sender,
-        )
+        try:
+            with analysis_recipient(str(self.user_id)):
+                analysis_result = await asyncio.wait_for(
+                    self.analyzer.analyze_email_toxicity_async(
+                        email_content=content,
+                        sender_email=sender,
+                    ),
+                    timeout=self.message_timeout,
+                )
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Analysis timed out after {self.message_timeout:g}s")
 
         # Extract horsemen data
         horsemen_detected = [
@@ -142,7 +373,7 @@ class BatchAnalyzerService:
             body_expires_at = datetime.now() + timedelta(hours=ttl_hours)
 
         # Create analysis record
-        analysis = MessageAnalysis(
+        return MessageAnalysis(
             user=self.user_id,
             client_message_id=client_message_id,
             channel=self._parse_channel(channel),
@@ -165,16 +396,6 @@ class BatchAnalyzerService:
             analyzed_at=datetime.now(),
         )
 
-        await analysis.save().run()
-
-        # Update sender aggregates
-        await self.aggregation_service.update_for_analysis(
-            analysis=analysis,
-            channel=channel,
-        )
-
-        return analysis
-
     def _format_result(
         self,
         analysis: MessageAnalysis,
@@ -7,6 +7,7 @@ from dataclasses import dataclass
 import httpx
 from ..core.email_message import EmailMessage
 from ..config.settings import get_settings
+from ..core.email_delivery.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -48,31 +49,31 @@ class PostmarkDeliveryService:
             logger.info(f"Sending email {email_message.id} via Postmark to {email_message.to_addresses}")
             logger.debug(f"Postmark payload: From={payload.get('From')}, To={payload.get('To')}, Subject={payload.get('Subject')}")
             
-            # Send via Postmark API
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/email",
-                    json=payload,
-                    headers=self.headers,
-                    timeout=30.0
+            # Send via Postmark API over the pooled keep-alive connection
+            client = get_http_client()
+            response = await client.post(
+                f"{self.base_url}/email",
+                json=payload,
+                headers=self.headers,
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                logger.info(f"Email {email_message.id} sent successfully via Postmark: {result.get('MessageID')}")
+                return DeliveryResult(
+                    success=True,
+                    message_id=result.get("MessageID"),
+                    delivery_time_ms=result.get("SubmittedAt")
+                )
+            else:
+                error_msg = f"Postmark API error: {response.status_code} - {response.text}"
+                logger.error(f"Failed to send email {email_message.id}: {error_msg}")
+                return DeliveryResult(
+                    success=False,
+                    error=error_msg
                 )
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    logger.info(f"Email {email_message.id} sent successfully via Postmark: {result.get('MessageID')}")
-                    return DeliveryResult(
-                        success=True,
-                        message_id=result.get("MessageID"),
-                        delivery_time_ms=result.get("SubmittedAt")
-                    )
-                else:
-                    error_msg = f"Postmark API error: {response.status_code} - {response.text}"
-                    logger.error(f"Failed to send email {email_message.id}: {error_msg}")
-                    return DeliveryResult(
-                        success=False,
-                        error=error_msg
-                    )
-                    
         except Exception as e:
             logger.error(f"Exception sending email {email_message.id} via Postmark: {e}", exc_info=True)
             return DeliveryResult(
@@ -0,0 +1,211 @@
+"""Near-duplicate content index for analysis caching.
+
+Bulk senders send templated messages that differ only by names, numbers or
+tracking links, so exact content hashes rarely repeat. This index keeps
+MinHash signatures of normalized word shingles in LSH band buckets so that a
+near-identical message from the same sender to the same user can reuse a
+cached analysis. Entries also keep hashes of their normalized words so
+callers can tell whether a match introduces words the cached message never
+had.
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+NUM_PERMUTATIONS = 64
+BAND_ROWS = 4
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")
+_NUMBER_RE = re.compile(r"\d+(?:[.,:/-]\d+)*")
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+Signature = Tuple[int, ...]
+
+
+def normalize_for_fingerprint(content: str) -> List[str]:
+    """Lowercase and replace URLs, emails and numbers with placeholders."""
+    text = content.lower()
+    text = _URL_RE.sub(" url ", text)
+    text = _EMAIL_RE.sub(" email ", text)
+    text = _NUMBER_RE.sub(" 0 ", text)
+    return _TOKEN_RE.findall(text)
+
+
+def minhash(tokens: List[str], shingle_size: int = 3) -> Signature:
+    """MinHash signature over word shingles."""
+    if len(tokens) < shingle_size:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {
+            " ".join(tokens[i:i + shingle_size])
+            for i in range(len(tokens) - shingle_size + 1)
+        }
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def token_hashes(tokens: List[str]) -> FrozenSet[int]:
+    """Hashed vocabulary of a message (its words are not kept)."""
+    return frozenset(
+        int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "big")
+        for t in tokens
+    )
+
+
+def estimate_similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+@dataclass
+class _Entry:
+    scope: str
+    signature: Signature
+    tokens: FrozenSet[int]
+    value: Dict[str, Any]
+    expires_at: float
+
+
+class NearDuplicateIndex:
+    """
+    Bounded MinHash index with LSH band buckets, partitioned by scope.
+
+    Signatures are split into bands of BAND_ROWS values; two messages become
+    candidates when any band matches exactly, and a candidate is accepted only
+    if its estimated Jaccard similarity reaches the threshold.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.8,
+        max_entries: int = 10_000,
+        min_tokens: int = 8,
+    ):
+        """
+        Args:
+            similarity_threshold: Minimum estimated Jaccard similarity for a match
+            max_entries: LRU bound on indexed signatures
+            min_tokens: Shorter messages are not matched (one word can flip meaning)
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max(1, max_entries)
+        self.min_tokens = min_tokens
+
+        self._entries: "OrderedDict[Tuple[str, Signature], _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, Signature], Set[Signature]] = {}
+        self._lock = threading.Lock()
+
+    def signature(self, content: str) -> Optional[Signature]:
+        """Signature for content, or None if it is too short to match safely."""
+        fingerprint = self._fingerprint(content)
+        return fingerprint[0] if fingerprint is not None else None
+
+    def _fingerprint(self, content: str) -> Optional[Tuple[Signature, FrozenSet[int]]]:
+        tokens = normalize_for_fingerprint(content)
+        if len(tokens) < self.min_tokens:
+            return None
+        return minhash(tokens), token_hashes(tokens)
+
+    @staticmethod
+    def _band_keys(scope: str, signature: Signature):
+        for start in range(0, len(signature), BAND_ROWS):
+            yield (scope, start, signature[start:start + BAND_ROWS])
+
+    def _remove(self, key: Tuple[str, Signature]) -> None:
+        entry = self._entries.pop(key)
+        for band_key in self._band_keys(entry.scope, entry.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(entry.signature)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def add(self, scope: str, content: str, value: Dict[str, Any], ttl_seconds: float) -> bool:
+        """Index a value under the content's signature. Returns False if too short."""
+        fingerprint = self._fingerprint(content)
+        if fingerprint is None:
+            return False
+        signature, tokens = fingerprint
+
+        key = (scope, signature)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(scope, signature, tokens, value, time.monotonic() + ttl_seconds)
+            for band_key in self._band_keys(scope, signature):
+                self._buckets.setdefault(band_key, set()).add(signature)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def find(self, scope: str, content: str) -> Optional[Tuple[Dict[str, Any], float, int]]:
+        """
+        Return (value, similarity, novel_tokens) of the closest live match
+        above the threshold; novel_tokens counts distinct normalized words
+        of ``content`` that the matched message did not contain.
+        """
+        fingerprint = self._fingerprint(content)
+        if fingerprint is None:
+            return None
+        signature, tokens = fingerprint
+
+        now = time.monotonic()
+        with self._lock:
+            candidates: Set[Signature] = set()
+            for band_key in self._band_keys(scope, signature):
+                candidates |= self._buckets.get(band_key, set())
+
+            best: Optional[_Entry] = None
+            best_similarity = self.similarity_threshold
+            for candidate in candidates:
+                similarity = estimate_similarity(signature, candidate)
+                if similarity < best_similarity:
+                    continue
+                entry = self._entries[(scope, candidate)]
+                if now >= entry.expires_at:
+                    continue
+                best, best_similarity = entry, similarity
+
+            if best is None:
+                return None
+            self._entries.move_to_end((scope, best.signature))
+            return best.value, best_similarity, len(tokens - best.tokens)
+
+    def cleanup_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if now >= entry.expires_at]
+            for key in expired:
+                self._remove(key)
+        return len(expired)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._buckets.clear()
+        return count
+
+    def __len__(self) -> int:
+        return len(self._entries)
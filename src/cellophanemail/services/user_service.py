@@ -8,6 +8,8 @@ from datetime import datetime
 from ..models.user import User, SubscriptionStatus
 from ..models.shield_address import ShieldAddress
 from ..models.organization import Organization
+from ..features.shield_addresses.lookup import get_shield_lookup
+from ..features.shield_addresses.recipient_filter import get_recipient_filter
 
 logger = logging.getLogger(__name__)
 
@@ -81,6 +83,7 @@ class UserService:
             shield_address = await ShieldAddress.create_for_user(
                 user_id=str(user.id)
             )
+            get_recipient_filter().add(shield_address.shield_address)
             
             logger.info(f"Created shield address {shield_address.shield_address} for user {user.id}")
             
@@ -171,6 +174,7 @@ class UserService:
             for shield in shields:
                 await shield.deactivate()
                 count += 1
+            get_shield_lookup().invalidate_user(user_id)
             
             logger.info(f"Deactivated {count} shield addresses for user {user_id}")
             return count
@@ -224,6 +228,9 @@ class UserService:
             )
             
             await shield.save()
+            # Drop any cached "not found" for the new address
+            get_shield_lookup().invalidate(shield_address_str)
+            get_recipient_filter().add(shield_address_str)
             logger.info(f"Created additional shield {shield_address_str} for user {user_id}")
             
             return shield
@@ -51,5 +51,7 @@ def set_testing_env():
     
     yield
     # Clean up after test
+    from cellophanemail.features.email_protection.analyzer_registry import get_analyzer_registry
+    get_analyzer_registry().clear()
     if "TESTING" in os.environ:
         del os.environ["TESTING"]
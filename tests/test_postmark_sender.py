@@ -4,6 +4,8 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from cellophanemail.core.email_delivery.senders.postmark_sender import PostmarkEmailSender
 
+GET_HTTP_CLIENT = 'cellophanemail.core.email_delivery.senders.postmark_sender.get_http_client'
+
 
 class TestPostmarkEmailSender:
     """Test suite for PostmarkEmailSender."""
@@ -40,7 +42,7 @@ class TestPostmarkEmailSender:
     @pytest.mark.asyncio
     async def test_send_email_success(self, postmark_sender):
         """Test successful email sending via Postmark API."""
-        # Mock httpx.AsyncClient
+        # Mock the pooled httpx client
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
@@ -49,9 +51,9 @@ class TestPostmarkEmailSender:
             'SubmittedAt': '2025-08-09T10:00:00Z'
         }
         
-        with patch('httpx.AsyncClient') as mock_client_class:
+        with patch(GET_HTTP_CLIENT) as get_client:
             mock_client = AsyncMock()
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            get_client.return_value = mock_client
             mock_client.post.return_value = mock_response
             
             result = await postmark_sender.send_email(
@@ -96,7 +98,7 @@ class TestPostmarkEmailSender:
     @pytest.mark.asyncio
     async def test_send_email_api_failure(self, postmark_sender):
         """Test email sending failure handling - API error."""
-        # Mock httpx.AsyncClient with error response
+        # Mock the pooled httpx client with error response
         mock_response = MagicMock()
         mock_response.status_code = 422
         mock_response.json.return_value = {
@@ -104,9 +106,9 @@ class TestPostmarkEmailSender:
             'Message': 'Invalid email request'
         }
         
-        with patch('httpx.AsyncClient') as mock_client_class:
+        with patch(GET_HTTP_CLIENT) as get_client:
             mock_client = AsyncMock()
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            get_client.return_value = mock_client
             mock_client.post.return_value = mock_response
             
             result = await postmark_sender.send_email(
@@ -121,9 +123,9 @@ class TestPostmarkEmailSender:
     @pytest.mark.asyncio
     async def test_send_email_network_failure(self, postmark_sender):
         """Test email sending failure handling - network exception."""
-        with patch('httpx.AsyncClient') as mock_client_class:
+        with patch(GET_HTTP_CLIENT) as get_client:
             mock_client = AsyncMock()
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            get_client.return_value = mock_client
             mock_client.post.side_effect = Exception("Network timeout")
             
             result = await postmark_sender.send_email(
@@ -142,9 +144,9 @@ class TestPostmarkEmailSender:
         mock_response.status_code = 200
         mock_response.json.return_value = {'MessageID': 'test-id'}
         
-        with patch('httpx.AsyncClient') as mock_client_class:
+        with patch(GET_HTTP_CLIENT) as get_client:
             mock_client = AsyncMock()
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            get_client.return_value = mock_client
             mock_client.post.return_value = mock_response
             
             ai_result = {'ai_classification': 'SAFE'}
@@ -179,9 +181,9 @@ class TestPostmarkEmailSender:
         mock_response.status_code = 200
         mock_response.json.return_value = {'MessageID': 'test-id'}
         
-        with patch('httpx.AsyncClient') as mock_client_class:
+        with patch(GET_HTTP_CLIENT) as get_client:
             mock_client = AsyncMock()
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            get_client.return_value = mock_client
             mock_client.post.return_value = mock_response
             
             ai_result = {
@@ -214,3 +216,47 @@ class TestPostmarkEmailSender:
             assert 'Original sender: abusiveparent@gmail.com' in text_body
             assert 'Detected: criticism, contempt' in text_body
             assert 'Classification: ABUSIVE' in text_body
+
+
+class TestPooledHttpClient:
+    """The sender reuses one keep-alive client instead of one per message."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_until_closed(self):
+        from cellophanemail.core.email_delivery import http_client
+
+        first = http_client.get_http_client()
+        assert http_client.get_http_client() is first
+
+        await http_client.close_http_client()
+        assert first.is_closed
+        assert http_client.get_http_client() is not first
+        await http_client.close_http_client()
+
+    @pytest.mark.asyncio
+    async def test_pool_limits_come_from_environment(self, monkeypatch):
+        from cellophanemail.core.email_delivery import http_client
+
+        monkeypatch.setenv('DELIVERY_HTTP_MAX_CONNECTIONS', '7')
+        monkeypatch.setenv('DELIVERY_HTTP_TIMEOUT_SECONDS', '3')
+        client = http_client.create_http_client()
+
+        assert client._transport._pool._max_connections == 7
+        assert client.timeout.read == 3.0
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_injected_client_used_for_every_send(self):
+        mock_response = MagicMock(status_code=200)
+        client = AsyncMock()
+        client.post.return_value = mock_response
+        sender = PostmarkEmailSender({
+            'SMTP_DOMAIN': 'cellophanemail.com',
+            'EMAIL_USERNAME': 'user@example.com',
+            'POSTMARK_API_TOKEN': 'token',
+        }, http_client=client)
+
+        for _ in range(3):
+            assert await sender.send_email('a@example.com', 'Hi', 'Body', {})
+
+        assert client.post.await_count == 3
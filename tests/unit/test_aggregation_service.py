@@ -0,0 +1,138 @@
+"""
+Tests for grouped sender-summary updates in AggregationService.
+"""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from cellophanemail.services import aggregation_service
+from cellophanemail.services.aggregation_service import AggregationService
+
+
+def _analysis(sender: str, channel: str = "sms", **horsemen) -> SimpleNamespace:
+    flags = {f"has_{h}": horsemen.get(h, False)
+             for h in ("criticism", "contempt", "defensiveness", "stonewalling")}
+    return SimpleNamespace(
+        sender_identifier=sender,
+        channel=channel,
+        has_horsemen=any(flags.values()),
+        **flags,
+    )
+
+
+def _query(result=None):
+    query = MagicMock()
+    query.where.return_value = query
+    query.run = AsyncMock(return_value=result)
+    return query
+
+
+class TestGroupedAggregation:
+    """Deltas are pre-aggregated per (sender, channel)."""
+
+    def test_group_deltas_counts_per_sender_and_channel(self):
+        service = AggregationService(uuid.uuid4())
+        analyses = [
+            _analysis("+1555", criticism=True),
+            _analysis("+1555", criticism=True, contempt=True),
+            _analysis("+1555"),
+            _analysis("+1555", channel="email"),
+            _analysis("+1666", stonewalling=True),
+        ]
+
+        deltas = {(d.sender_identifier, d.channel): d for d in service.group_deltas(analyses)}
+
+        sms = deltas[("+1555", "sms")]
+        assert sms.total_messages == 3
+        assert sms.messages_with_horsemen == 2
+        assert sms.clean_messages == 1
+        assert sms.horsemen_counts == {
+            "criticism": 2, "contempt": 1, "defensiveness": 0, "stonewalling": 0,
+        }
+        assert deltas[("+1555", "email")].clean_messages == 1
+        assert deltas[("+1666", "sms")].horsemen_counts["stonewalling"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fallback_inserts_new_senders_in_one_statement(self):
+        service = AggregationService(uuid.uuid4())
+        inserted = []
+
+        def insert(*rows):
+            inserted.append(rows)
+            return _query()
+
+        with patch.object(aggregation_service.SenderSummary._meta.db, "engine_type", "sqlite"), \
+             patch.object(aggregation_service.SenderSummary, "objects", return_value=_query([])), \
+             patch.object(aggregation_service.SenderSummary, "insert", side_effect=insert):
+            summaries = await service.update_for_analyses([
+                _analysis("+1555", contempt=True),
+                _analysis("+1555"),
+                _analysis("+1666"),
+            ])
+
+        assert len(inserted) == 1
+        assert len(inserted[0]) == 2
+        first = summaries[0]
+        assert first.total_messages == 2
+        assert first.contempt_count == 1
+        assert first.clean_messages == 1
+        assert first.horsemen_counts["contempt"] == 1
+
+
+class TestAtomicUpsert:
+    """On Postgres, counters are incremented in SQL rather than in Python."""
+
+    @pytest.mark.asyncio
+    async def test_one_upsert_statement_for_many_senders(self):
+        user_id = uuid.uuid4()
+        service = AggregationService(user_id)
+        statements = []
+
+        def raw(sql, *args):
+            statements.append((sql, args))
+            rows = [
+                {"id": uuid.uuid4(), "user": user_id, "sender_identifier": args[i + 2],
+                 "channel": args[i + 3], "total_messages": args[i + 4]}
+                for i in range(0, len(args), 17)
+            ]
+            return _query(rows)
+
+        with patch.object(aggregation_service.SenderSummary._meta.db, "engine_type", "postgres"), \
+             patch.object(aggregation_service.SenderSummary, "raw", side_effect=raw):
+            summaries = await service.update_for_analyses([
+                _analysis("+1666", criticism=True),
+                _analysis("+1555"),
+                _analysis("+1555"),
+            ])
+
+        assert len(statements) == 1
+        sql, args = statements[0]
+        assert 'ON CONFLICT ("user", sender_identifier, channel) DO UPDATE' in sql
+        assert sql.count("::json") == 2
+        # Rows are sorted by key so concurrent upserts lock in the same order
+        assert args[2] == "+1555" and args[17 + 2] == "+1666"
+        assert args[4] == 2 and args[6] == 2
+        assert args[17 + 7] == 1 and args[17 + 14] is not None
+        assert [s.sender_identifier for s in summaries] == ["+1666", "+1555"]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_keys_are_merged_before_upsert(self):
+        service = AggregationService(uuid.uuid4())
+        first = service.group_deltas([_analysis("+1555", contempt=True)])[0]
+        second = service.group_deltas([_analysis("+1555")])[0]
+        captured = []
+
+        def raw(sql, *args):
+            captured.append(args)
+            return _query([{"user": args[1], "sender_identifier": args[2],
+                            "channel": args[3], "total_messages": args[4]}])
+
+        with patch.object(aggregation_service.SenderSummary._meta.db, "engine_type", "postgres"), \
+             patch.object(aggregation_service.SenderSummary, "raw", side_effect=raw):
+            summaries = await service.apply_deltas([first, second])
+
+        assert len(captured[0]) == 17
+        assert captured[0][4] == 2
+        assert summaries[0] is summaries[1]
@@ -0,0 +1,237 @@
+"""
+Tests for the bounded analysis cache and the CachingAnalyzer decorator.
+"""
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from cellophanemail.features.email_protection.analyzer_factory import AnalyzerFactory
+from cellophanemail.features.email_protection.analyzer_interface import analysis_recipient
+from cellophanemail.features.email_protection.caching_analyzer import CachingAnalyzer
+from cellophanemail.features.email_protection.mock_analyzer import create_toxic_analyzer
+from cellophanemail.features.email_protection.models import ThreatLevel
+from cellophanemail.features.monitoring import MetricsCollector
+from cellophanemail.services.analysis_cache import (
+    AnalysisCacheService,
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+)
+from cellophanemail.services.near_duplicate_index import (
+    NearDuplicateIndex,
+    normalize_for_fingerprint,
+)
+
+SHIPPING_TEMPLATE = (
+    "Hi {name}, your order {order} has shipped and will arrive on {date}. "
+    "Track your parcel at {url} and reply STOP to opt out of delivery updates. "
+    "Thanks for shopping with us! If anything is wrong with your items you can "
+    "return them within 30 days from the returns page in your account."
+)
+
+
+class FakeRedis:
+    """Minimal stand-in for a redis client."""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.expiry[key] = ex
+
+
+class TestInMemoryBackend:
+    """LRU bound and per-entry TTL."""
+
+    def test_evicts_least_recently_used(self):
+        backend = InMemoryCacheBackend(max_entries=2)
+        backend.set("a", {"v": 1}, 60)
+        backend.set("b", {"v": 2}, 60)
+        backend.get("a")
+        backend.set("c", {"v": 3}, 60)
+
+        assert backend.get("b") is None
+        assert backend.get("a") == {"v": 1}
+        assert backend.evictions == 1
+        assert backend.size() == 2
+
+    def test_expired_entries_are_not_returned(self):
+        backend = InMemoryCacheBackend()
+        backend.set("a", {"v": 1}, 0.01)
+        time.sleep(0.02)
+
+        assert backend.get("a") is None
+        assert backend.size() == 0
+
+
+class TestAnalysisCacheService:
+    """Hit/miss accounting and metrics export."""
+
+    def test_hits_and_misses_reach_metrics_collector(self):
+        collector = MetricsCollector()
+        cache = AnalysisCacheService(InMemoryCacheBackend(), metrics_collector=collector)
+
+        assert cache.get_cached_analysis("hello", "a@b.com") is None
+        cache.cache_analysis("hello", "a@b.com", {"classification": "SAFE"})
+        assert cache.get_cached_analysis("hello", "a@b.com")["cache_hit"] is True
+
+        stats = collector.get_performance_metrics().cache_stats["analysis"]
+        assert stats == {"hits": 1, "misses": 1}
+        assert 'cache="analysis",result="hit"} 1' in collector.export_prometheus_format()
+
+    def test_redis_backend_stores_json_with_category_ttl(self):
+        client = FakeRedis()
+        cache = AnalysisCacheService(RedisCacheBackend("redis://unused", client=client))
+
+        cache.cache_analysis("Your invoice is attached", "shop@x.com", {"classification": "SAFE"})
+
+        (key, ttl), = client.expiry.items()
+        assert key.startswith("cellophanemail:analysis:")
+        assert ttl == 7 * 24 * 3600
+        assert cache.get_cached_analysis("Your invoice is attached", "shop@x.com")["cache_hit"]
+
+
+class TestNearDuplicateCache:
+    """Templated messages from one sender to one user reuse a cached analysis."""
+
+    def _shipping(self, name, order, date, url):
+        return SHIPPING_TEMPLATE.format(name=name, order=order, date=date, url=url)
+
+    def test_normalization_masks_numbers_urls_and_emails(self):
+        tokens = normalize_for_fingerprint("Order #12345 at https://x.co/a?b=1 for bob@ex.com")
+        assert tokens == ["order", "0", "at", "url", "for", "email"]
+
+    def test_templated_message_hits_within_sender_and_recipient_scope(self):
+        cache = AnalysisCacheService(InMemoryCacheBackend())
+        first = self._shipping("Alice", "1001", "12/03", "https://trk.io/abc")
+        second = self._shipping("Alice", "7781", "15/04", "https://trk.io/zzz9")
+
+        cache.cache_analysis(first, "ship@store.com", {"classification": "SAFE"}, recipient="alice@example.com")
+
+        hit = cache.get_cached_analysis(second, "ship@store.com", recipient="alice@example.com")
+        assert hit is not None and hit["near_duplicate_similarity"] >= 0.8
+        assert cache.get_cached_analysis(second, "other@store.com", recipient="alice@example.com") is None
+        assert cache.get_cached_analysis(second, "ship@store.com", recipient="bob@example.com") is None
+        assert cache.get_cached_analysis(second, "ship@store.com") is None
+        assert cache.get_cache_stats()["near_duplicate_hits"] == 1
+
+    def test_near_duplicate_hit_drops_quoted_details(self):
+        cache = AnalysisCacheService(InMemoryCacheBackend())
+        first = self._shipping("Alice", "1001", "12/03", "https://trk.io/abc")
+        cache.cache_analysis(first, "ship@store.com", {
+            "classification": "WARNING",
+            "reasoning": "Alice's order 1001 mentions a complaint",
+            "horsemen_detected": [{"horseman": "criticism", "indicators": ["order 1001"]}],
+        }, recipient="alice@example.com")
+
+        hit = cache.get_cached_analysis(
+            self._shipping("Alice", "2002", "15/04", "https://trk.io/x"), "ship@store.com",
+            recipient="alice@example.com",
+        )
+
+        assert "1001" not in hit["reasoning"]
+        assert hit["horsemen_detected"] == [{"horseman": "criticism", "indicators": []}]
+
+    def test_safe_verdict_not_reused_for_new_words(self):
+        cache = AnalysisCacheService(InMemoryCacheBackend())
+        benign = self._shipping("Alice", "1001", "12/03", "https://trk.io/abc")
+        cache.cache_analysis(benign, "ship@store.com", {"classification": "SAFE"}, recipient="alice@example.com")
+
+        hostile = benign + " Die."
+        assert cache.get_cached_analysis(hostile, "ship@store.com", recipient="alice@example.com") is None
+
+    def test_meaning_change_in_short_sentence_does_not_match(self):
+        index = NearDuplicateIndex()
+        index.add("s", "You always listen to me and everyone at work thinks you are great", {"v": 1}, 60)
+
+        assert index.find("s", "You never listen to me and everyone at work thinks you are useless") is None
+
+    def test_short_messages_never_match_approximately(self):
+        index = NearDuplicateIndex()
+        index.add("s", "I love you", {"v": 1}, 60)
+
+        assert index.find("s", "I hate you") is None
+
+    def test_different_content_does_not_match(self):
+        cache = AnalysisCacheService(InMemoryCacheBackend())
+        cache.cache_analysis(
+            self._shipping("Alice", "1", "2", "https://a.io"), "ship@store.com",
+            {"classification": "SAFE"}, recipient="alice@example.com",
+        )
+
+        other = "You never listen to me and frankly everyone at the office thinks you are useless"
+        assert cache.get_cached_analysis(other, "ship@store.com", recipient="alice@example.com") is None
+
+    def test_index_is_bounded(self):
+        index = NearDuplicateIndex(max_entries=2)
+        for i, word in enumerate(["alpha", "bravo", "charlie"]):
+            index.add("s", f"{word} " * 10 + f"unique tail {word} words here", {"v": i}, 60)
+
+        assert len(index) == 2
+
+
+class TestCachingAnalyzer:
+    """Repeated content skips the wrapped analyzer."""
+
+    def _analyzer(self):
+        inner = create_toxic_analyzer()
+        return inner, CachingAnalyzer(inner, cache=AnalysisCacheService(InMemoryCacheBackend()))
+
+    def test_repeated_content_uses_cache(self):
+        inner, analyzer = self._analyzer()
+
+        first = analyzer.analyze_email_toxicity("You are an idiot", "a@b.com")
+        second = analyzer.analyze_email_toxicity("You are an idiot", "a@b.com")
+        analyzer.analyze_email_toxicity("You are an idiot", "other@b.com")
+
+        assert inner.call_count == 2
+        assert second.threat_level == first.threat_level
+        assert [h.horseman for h in second.horsemen_detected] == \
+            [h.horseman for h in first.horsemen_detected]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_call(self):
+        inner, analyzer = self._analyzer()
+        original = inner.analyze_email_toxicity_async
+
+        async def slow(content, sender):
+            await asyncio.sleep(0.02)
+            return await original(content, sender)
+
+        inner.analyze_email_toxicity_async = slow
+        results = await asyncio.gather(*[
+            analyzer.analyze_email_toxicity_async("Weekly newsletter", "news@x.com")
+            for _ in range(5)
+        ])
+
+        assert inner.call_count == 1
+        assert all(r.threat_level == ThreatLevel.SAFE for r in results)
+
+    def test_near_duplicates_scoped_to_recipient(self):
+        inner, analyzer = self._analyzer()
+        first = SHIPPING_TEMPLATE.format(name="Al", order="1", date="2", url="https://a.io")
+        second = SHIPPING_TEMPLATE.format(name="Al", order="9", date="8", url="https://b.io")
+
+        with analysis_recipient("alice@example.com"):
+            analyzer.analyze_email_toxicity(first, "ship@store.com")
+            analyzer.analyze_email_toxicity(second, "ship@store.com")
+        with analysis_recipient("bob@example.com"):
+            analyzer.analyze_email_toxicity(second, "ship@store.com")
+
+        assert inner.call_count == 2
+
+    def test_factory_wraps_llm_analyzers_but_not_mocks(self, monkeypatch):
+        monkeypatch.delenv("ANALYSIS_CACHE_ENABLED", raising=False)
+        monkeypatch.setenv("ANALYSIS_PREFILTER_ENABLED", "false")
+
+        assert isinstance(AnalyzerFactory.create_analyzer(analyzer_type="anthropic"), CachingAnalyzer)
+        assert not isinstance(AnalyzerFactory.create_analyzer(analyzer_type="mock"), CachingAnalyzer)
+
+        monkeypatch.setenv("ANALYSIS_CACHE_ENABLED", "false")
+        assert not isinstance(AnalyzerFactory.create_analyzer(analyzer_type="anthropic"), CachingAnalyzer)
@@ -0,0 +1,162 @@
+"""
+Tests for the shared analyzer registry and the local model pool.
+"""
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+
+from cellophanemail.features.email_protection import llama_analyzer
+from cellophanemail.features.email_protection.analyzer_registry import (
+    WARM_UP_CONTENT,
+    AnalyzerPool,
+    AnalyzerRegistry,
+)
+from cellophanemail.features.email_protection.analyzer_executor import run_in_analyzer_executor
+from cellophanemail.features.email_protection.analyzer_factory import AnalyzerFactory
+from cellophanemail.features.email_protection.llama_email_analyzer import LlamaEmailAnalyzer
+from cellophanemail.features.email_protection.mock_analyzer import create_toxic_analyzer
+from cellophanemail.features.email_protection.prefilter import PrefilteredAnalyzer
+from cellophanemail.services.batch_analyzer import BatchAnalyzerService
+
+
+class SlowModel:
+    """Stand-in for a model instance that must not run two generations at once."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self.warmed = False
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def analyze_email_toxicity(self, content, sender):
+        if content == WARM_UP_CONTENT:
+            self.warmed = True
+            return content
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.calls += 1
+            self.threads.add(threading.current_thread().name)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return content
+
+
+class TestAnalyzerRegistry:
+    """Analyzers are built once and shared."""
+
+    def test_same_instance_returned_per_temperature(self):
+        built = []
+        registry = AnalyzerRegistry(factory=lambda t: built.append(t) or create_toxic_analyzer())
+
+        assert registry.get() is registry.get()
+        assert registry.get(0.5) is not registry.get()
+        assert built == [0.0, 0.5]
+
+        registry.clear()
+        registry.get()
+        assert built == [0.0, 0.5, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_warm_up_builds_and_exercises_pooled_models(self):
+        models = [SlowModel(), SlowModel()]
+        registry = AnalyzerRegistry(factory=lambda t: PrefilteredAnalyzer(AnalyzerPool(models)))
+
+        analyzer = await registry.warm_up()
+
+        assert registry.get() is analyzer
+        assert all(m.warmed for m in models)
+
+    def test_batch_service_uses_injected_analyzer(self):
+        analyzer = create_toxic_analyzer()
+        service = BatchAnalyzerService(user_id=uuid.uuid4(), analyzer=analyzer)
+
+        assert service.analyzer is analyzer
+
+
+class TestAnalyzerPool:
+    """Concurrent callers get separate instances, never the same one twice."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_spread_across_instances(self):
+        models = [SlowModel(), SlowModel()]
+        pool = AnalyzerPool(models)
+
+        results = await asyncio.gather(*[
+            pool.analyze_email_toxicity_async(f"msg {i}", "a@b.com") for i in range(6)
+        ])
+
+        assert results == [f"msg {i}" for i in range(6)]
+        assert all(m.peak == 1 for m in models)
+        assert sum(m.calls for m in models) == 6
+
+    @pytest.mark.asyncio
+    async def test_queued_leases_do_not_occupy_the_shared_executor(self):
+        models = [SlowModel()]
+        pool = AnalyzerPool(models)
+
+        pooled = asyncio.gather(*[
+            pool.analyze_email_toxicity_async(f"msg {i}", "a@b.com") for i in range(8)
+        ])
+        await asyncio.sleep(0.01)
+        # Shared executor threads stay free while seven callers wait for the one model
+        assert await asyncio.wait_for(run_in_analyzer_executor(lambda: "free"), timeout=0.05) == "free"
+        await pooled
+
+        assert all(name.startswith("analyzer-pool") for name in models[0].threads)
+        pool.shutdown()
+
+    def test_requires_at_least_one_instance(self):
+        with pytest.raises(ValueError):
+            AnalyzerPool([])
+
+
+class FakeLlama:
+    """llama.cpp stand-in whose output depends on the email in the prompt."""
+
+    def __init__(self, **kwargs):
+        self.calls = 0
+
+    def tokenize(self, data, special=False):
+        raise RuntimeError("no prefix cache in this test")
+
+    def __call__(self, prompt, **kwargs):
+        self.calls += 1
+        toxic = "worthless" in prompt
+        return {"choices": [{"text": (
+            f'{{"toxicity_score": {0.9 if toxic else 0.0}, "gaslighting": {str(toxic).lower()}, '
+            f'"defensive": false, "stonewalling": false, "manipulation": false, '
+            f'"action": "{"TOXIC" if toxic else "SAFE"}"}}'
+        )}]}
+
+
+class TestFactoryLlamaPool:
+    """LLAMA_POOL_SIZE > 1 builds a pool of IEmailAnalyzer instances."""
+
+    @pytest.mark.asyncio
+    async def test_pooled_llama_models_analyze_and_warm_up(self, monkeypatch, tmp_path):
+        model = tmp_path / "model.gguf"
+        model.write_bytes(b"")
+        monkeypatch.setenv("LLAMA_MODEL_PATH", str(model))
+        monkeypatch.setenv("LLAMA_POOL_SIZE", "2")
+        monkeypatch.delenv("LLAMA_WORKERS", raising=False)
+        monkeypatch.setenv("ANALYSIS_CACHE_ENABLED", "false")
+        monkeypatch.setattr(llama_analyzer, "Llama", FakeLlama)
+
+        registry = AnalyzerRegistry(factory=lambda t: AnalyzerFactory.create_analyzer(t, analyzer_type="llama"))
+        analyzer = await registry.warm_up()
+        pool = analyzer.wrapped
+
+        assert isinstance(pool, AnalyzerPool)
+        assert all(isinstance(instance, LlamaEmailAnalyzer) for instance in pool.analyzers)
+        assert [instance.llm.calls for instance in pool.analyzers] == [1, 1]
+
+        toxic = await analyzer.analyze_email_toxicity_async("You are worthless", "a@example.com")
+        assert not toxic.safe
+        assert [h.horseman for h in toxic.horsemen_detected] == ["contempt"]
@@ -0,0 +1,125 @@
+"""
+Tests for the non-blocking analyzer path (analyze_email_toxicity_async).
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from cellophanemail.features.email_protection.analyzer_interface import IEmailAnalyzer
+from cellophanemail.features.email_protection.email_toxicity_analyzer import EmailToxicityAnalyzer
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.in_memory_processor import InMemoryProcessor
+from cellophanemail.features.email_protection.mock_analyzer import (
+    EmailAnalysis,
+    create_toxic_analyzer,
+)
+from cellophanemail.features.email_protection.models import ThreatLevel
+
+
+class SlowSyncAnalyzer(IEmailAnalyzer):
+    """Analyzer that blocks like the synchronous Anthropic client."""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.threads = []
+
+    def analyze_email_toxicity(self, email_content: str, sender_email: str) -> EmailAnalysis:
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        return EmailAnalysis(
+            threat_level=ThreatLevel.SAFE,
+            safe=True,
+            horsemen_detected=[],
+            reasoning="slow",
+            confidence=0.9,
+            processing_time_ms=int(self.delay * 1000),
+        )
+
+    def analyze_fact_presentation(self, fact_text, full_email_content, sender_email) -> str:
+        return "neutral"
+
+
+class FakeAsyncMessages:
+    """Stand-in for anthropic.AsyncAnthropic().messages."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return SimpleNamespace(content=[SimpleNamespace(text=self.text)])
+
+
+def _email(message_id: str) -> EphemeralEmail:
+    return EphemeralEmail(
+        message_id=message_id,
+        from_address="sender@example.com",
+        to_addresses=["shield@cellophanemail.com"],
+        subject="Hello",
+        text_body="See you at the meeting",
+        user_email="user@example.com",
+        ttl_seconds=300,
+    )
+
+
+class TestAsyncAnalyzerPath:
+    """Async analysis must not run blocking LLM calls on the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_default_async_runs_in_executor_thread(self):
+        analyzer = SlowSyncAnalyzer(delay=0.01)
+
+        result = await analyzer.analyze_email_toxicity_async("hi", "a@b.com")
+
+        assert result.threat_level == ThreatLevel.SAFE
+        assert analyzer.threads[0].startswith("analyzer")
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive_during_analysis(self):
+        analyzer = SlowSyncAnalyzer(delay=0.2)
+        processor = InMemoryProcessor(analyzer=analyzer)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        await asyncio.gather(processor.process_email(_email("async-1")), heartbeat())
+
+        # Heartbeat completes while the analysis is still sleeping in its thread
+        assert ticks == 10
+
+    @pytest.mark.asyncio
+    async def test_mock_analyzer_async_matches_sync(self):
+        analyzer = create_toxic_analyzer()
+
+        sync_result = analyzer.analyze_email_toxicity("I hate this", "a@b.com")
+        async_result = await analyzer.analyze_email_toxicity_async("I hate this", "a@b.com")
+
+        assert async_result.threat_level == sync_result.threat_level
+        assert analyzer.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_anthropic_analyzer_uses_async_client(self):
+        analyzer = EmailToxicityAnalyzer()
+        fake_messages = FakeAsyncMessages(
+            '{"safe": true, "horsemen_detected": [], "reasoning": "ok", "confidence": 0.9}'
+        )
+        # Pre-populate clients so no real API client is constructed
+        analyzer.client = object()
+        analyzer.async_client = SimpleNamespace(messages=fake_messages)
+        analyzer.model_name = "test-model"
+        analyzer.provider = "anthropic"
+
+        result = await analyzer.analyze_email_toxicity_async("Thanks for the update", "a@b.com")
+
+        assert fake_messages.calls == 1
+        assert result.safe is True
+        assert result.threat_level == ThreatLevel.SAFE
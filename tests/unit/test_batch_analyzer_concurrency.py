@@ -0,0 +1,207 @@
+"""
+Tests for concurrent fan-out and bulk persistence in BatchAnalyzerService.
+"""
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from cellophanemail.services import batch_analyzer
+from cellophanemail.services.batch_analyzer import (
+    AnalysisConcurrencyLimiter,
+    BatchAnalyzerService,
+)
+
+
+def _messages(count: int):
+    return [
+        {"client_message_id": f"sms:{i}", "content": f"message {i}", "sender": "+15550000"}
+        for i in range(count)
+    ]
+
+
+def _query(result=None):
+    """Chainable stand-in for a Piccolo query."""
+    query = MagicMock()
+    query.where.return_value = query
+    query.first.return_value = query
+    query.run = AsyncMock(return_value=result)
+    return query
+
+
+@pytest.fixture
+def fake_db():
+    """Patch MessageAnalysis persistence and record the queries issued."""
+    db = MagicMock()
+    db.existing = []
+    db.objects_calls = 0
+    db.inserted = []
+
+    def objects():
+        db.objects_calls += 1
+        return _query(list(db.existing))
+
+    def insert(*rows):
+        db.inserted.append(rows)
+        return _query()
+
+    with patch.object(batch_analyzer.MessageAnalysis, "objects", side_effect=objects), \
+         patch.object(batch_analyzer.MessageAnalysis, "insert", side_effect=insert):
+        yield db
+
+
+class TestConcurrentBatch:
+    """process_batch should fan out, respect limits and keep order."""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_input_order(self, fake_db):
+        service = BatchAnalyzerService(user_id=uuid.uuid4())
+
+        original = service._analyze_message
+
+        async def fake_analyze(message, privacy):
+            # Later messages finish first
+            await asyncio.sleep(0.01 * (10 - int(message["client_message_id"].split(":")[1])))
+            return await original(message, privacy)
+
+        service._analyze_message = fake_analyze
+        with patch.object(service.aggregation_service, "update_for_analyses", AsyncMock()):
+            results = await service.process_batch(_messages(10))
+
+        assert [r["client_message_id"] for r in results] == [f"sms:{i}" for i in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_per_user_limit_caps_in_flight_analyses(self, fake_db):
+        service = BatchAnalyzerService(user_id=uuid.uuid4())
+        in_flight = 0
+        peak = 0
+
+        original = service._analyze_message
+
+        async def fake_analyze(message, privacy):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await original(message, privacy)
+
+        service._analyze_message = fake_analyze
+        limiter = AnalysisConcurrencyLimiter(global_limit=10, per_user_limit=3)
+        with patch.object(batch_analyzer, "get_concurrency_limiter", return_value=limiter), \
+             patch.object(service.aggregation_service, "update_for_analyses", AsyncMock()):
+            await service.process_batch(_messages(12))
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_duplicate_message_ids_analyzed_once(self, fake_db):
+        service = BatchAnalyzerService(user_id=uuid.uuid4())
+        calls = []
+        original = service._analyze_message
+
+        async def fake_analyze(message, privacy):
+            calls.append(message["client_message_id"])
+            return await original(message, privacy)
+
+        service._analyze_message = fake_analyze
+        messages = _messages(2) + _messages(1)
+        with patch.object(service.aggregation_service, "update_for_analyses", AsyncMock()):
+            results = await service.process_batch(messages)
+
+        assert len(results) == 3
+        assert sorted(calls) == ["sms:0", "sms:1"]
+
+    @pytest.mark.asyncio
+    async def test_slow_message_times_out_without_failing_batch(self, fake_db):
+        service = BatchAnalyzerService(user_id=uuid.uuid4(), message_timeout=0.05)
+        original = service.analyzer.analyze_email_toxicity_async
+
+        async def maybe_slow(email_content, sender_email):
+            if email_content == "message 1":
+                await asyncio.sleep(1)
+            return await original(email_content, sender_email)
+
+        service.analyzer.analyze_email_toxicity_async = maybe_slow
+
+        with patch.object(service.aggregation_service, "update_for_analyses", AsyncMock()):
+            results = await service.process_batch(_messages(3))
+
+        assert [r["success"] for r in results] == [True, False, True]
+        assert "timed out" in results[1]["error"]
+
+
+class TestBulkPersistence:
+    """analyze_many should batch its database round-trips."""
+
+    @pytest.mark.asyncio
+    async def test_one_lookup_and_one_insert_per_batch(self, fake_db):
+        service = BatchAnalyzerService(user_id=uuid.uuid4())
+        update = AsyncMock()
+
+        with patch.object(service.aggregation_service, "update_for_analyses", update):
+            outcomes = await service.analyze_many(_messages(20), {"store_body": False})
+
+        assert fake_db.objects_calls == 1
+        assert len(fake_db.inserted) == 1
+        assert len(fake_db.inserted[0]) == 20
+        update.assert_awaited_once()
+        assert len(update.await_args.args[0]) == 20
+        assert [o.client_message_id for o in outcomes] == [f"sms:{i}" for i in range(20)]
+
+    @pytest.mark.asyncio
+    async def test_existing_analyses_are_not_reanalyzed(self, fake_db):
+        service = BatchAnalyzerService(user_id=uuid.uuid4())
+        stored = MagicMock(client_message_id="sms:1", has_horsemen=False)
+        fake_db.existing = [stored]
+
+        with patch.object(service.aggregation_service, "update_for_analyses", AsyncMock()):
+            outcomes = await service.analyze_many(_messages(3), {"store_body": False})
+
+        assert outcomes[1] is stored
+        assert [row.client_message_id for row in fake_db.inserted[0]] == ["sms:0", "sms:2"]
+        assert service.analyzer.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_insert_marks_new_messages_failed(self, fake_db):
+        service = BatchAnalyzerService(user_id=uuid.uuid4())
+
+        def broken_insert(*rows):
+            query = _query()
+            query.run = AsyncMock(side_effect=RuntimeError("db down"))
+            return query
+
+        with patch.object(batch_analyzer.MessageAnalysis, "insert", side_effect=broken_insert), \
+             patch.object(service.aggregation_service, "update_for_analyses", AsyncMock()) as update:
+            results = await service.process_batch(_messages(2))
+
+        assert [r["success"] for r in results] == [False, False]
+        assert results[0]["error"] == "db down"
+        update.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_bulk_insert_retries_row_by_row(self, fake_db):
+        service = BatchAnalyzerService(user_id=uuid.uuid4())
+        stored = MagicMock(client_message_id="sms:1", has_horsemen=False)
+        lookups = iter([[], [stored]])
+        inserted = []
+
+        def insert(*rows):
+            query = _query()
+            if len(rows) > 1 or rows[0].client_message_id == "sms:1":
+                # sms:1 was stored by a concurrent request in the meantime
+                query.run = AsyncMock(side_effect=RuntimeError("duplicate key"))
+            else:
+                inserted.extend(rows)
+            return query
+
+        with patch.object(batch_analyzer.MessageAnalysis, "objects", side_effect=lambda: _query(next(lookups))), \
+             patch.object(batch_analyzer.MessageAnalysis, "insert", side_effect=insert), \
+             patch.object(service.aggregation_service, "update_for_analyses", AsyncMock()) as update:
+            outcomes = await service.analyze_many(_messages(3), {"store_body": False})
+
+        assert [row.client_message_id for row in inserted] == ["sms:0", "sms:2"]
+        assert outcomes[1] is stored
+        assert [o.client_message_id for o in outcomes] == ["sms:0", "sms:1", "sms:2"]
+        assert [row.client_message_id for row in update.await_args.args[0]] == ["sms:0", "sms:2"]
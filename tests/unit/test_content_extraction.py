@@ -0,0 +1,131 @@
+"""
+Tests for the shared HTML-to-text and analysis content stage.
+"""
+import time
+
+import pytest
+
+from cellophanemail.features.email_protection.content_extraction import (
+    CHARS_PER_TOKEN,
+    DEFAULT_MAX_CONTENT_TOKENS,
+    build_analysis_content,
+    build_delivery_content,
+    html_to_text,
+    truncate_to_tokens,
+)
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.in_memory_processor import InMemoryProcessor
+from cellophanemail.features.email_protection.mock_analyzer import MockAnalyzer
+from cellophanemail.features.email_protection.streamlined_processor import StreamlinedEmailProtectionProcessor
+from cellophanemail.providers.contracts import EmailMessage
+
+
+class TestHtmlToText:
+    """Readable text out; hidden blocks and quoted replies dropped."""
+
+    def test_drops_style_script_and_decodes_entities(self):
+        html = (
+            "<html><head><style>p { color: red }</style><title>x</title></head>"
+            "<body><script>track()</script><p>Fish &amp; chips&nbsp;at 5&#33;</p>"
+            "<p>See&lt;you&gt;</p></body></html>"
+        )
+
+        assert html_to_text(html) == "Fish & chips at 5!\n\nSee<you>"
+
+    def test_drops_trailing_quoted_thread(self):
+        html = (
+            "<div>Sounds good.</div>"
+            "<div class=\"gmail_quote\">On Mon, Bob wrote:<blockquote>You are useless</blockquote></div>"
+            "<blockquote type=\"cite\">old thread</blockquote>\n"
+        )
+
+        assert html_to_text(html) == "Sounds good."
+        assert "useless" in html_to_text(html, drop_quotes=False)
+
+    def test_keeps_quote_blocks_followed_by_content(self):
+        html = (
+            "<p>Hi</p>"
+            "<div class=\"gmail_quote\">You worthless idiot</div>"
+            "<p>Thanks</p>"
+            "<div class=\"yahoo_quoted\"><blockquote type=\"cite\">I will hurt you</blockquote></div>"
+            "<div>See you</div>"
+        )
+
+        assert html_to_text(html) == "Hi\n\nYou worthless idiot\n\nThanks\n\nI will hurt you\n\nSee you"
+
+    def test_outlook_reply_marker_is_not_a_quote(self):
+        html = "<p>Approved.</p><div id=\"divRplyFwdMsg\">From: Bob</div><div>I know where you live</div>"
+        assert "I know where you live" in html_to_text(html)
+
+    def test_stops_at_budget(self):
+        assert len(html_to_text("<p>" + "word " * 10_000 + "</p>", max_chars=100)) <= 100
+
+    def test_malformed_markup_is_linear(self):
+        started = time.perf_counter()
+        text = html_to_text("<" + "a" * 200_000 + " <b>bold")
+        assert time.perf_counter() - started < 2
+        assert isinstance(text, str)
+
+
+class TestAnalysisContent:
+    """Every processor builds its prompt content the same way."""
+
+    def test_prefers_text_then_html(self):
+        assert build_analysis_content("Hi", "plain body", "<p>html</p>") == "Subject: Hi\n\nplain body"
+        assert build_analysis_content("Hi", None, "<p>html &amp; more</p>") == "Subject: Hi\n\nhtml & more"
+        assert build_analysis_content(None, None, None) == ""
+
+    def test_token_budget(self):
+        content = build_analysis_content("Hi", "word " * 1000, max_tokens=50)
+        assert len(content) <= 200
+        assert truncate_to_tokens("short", 50) == "short"
+
+    def test_processors_share_stage(self, monkeypatch):
+        monkeypatch.setenv("ANALYSIS_MAX_CONTENT_TOKENS", "0")
+        html = "<style>.x{}</style><p>Hello &amp; welcome</p>"
+        ephemeral = EphemeralEmail(
+            message_id="m1", from_address="a@example.com", to_addresses=["b@cellophanemail.com"],
+            subject="Hi", text_body="", user_email="b@example.com", html_body=html
+        )
+        message = EmailMessage(
+            message_id="m1", from_address="a@example.com", to_addresses=["b@cellophanemail.com"],
+            subject="Hi", html_body=html
+        )
+
+        expected = "Subject: Hi\n\nHello & welcome"
+        assert ephemeral.get_content_for_analysis() == expected
+        assert StreamlinedEmailProtectionProcessor._prepare_email_content(None, message) == expected
+
+
+class TestDeliveryContent:
+    """The token budget bounds the prompt, never the delivered body."""
+
+    @pytest.mark.asyncio
+    async def test_long_safe_email_is_delivered_unchanged(self, monkeypatch):
+        monkeypatch.delenv("ANALYSIS_MAX_CONTENT_TOKENS", raising=False)
+        analyzer = MockAnalyzer()
+        seen = []
+        original = analyzer.analyze_email_toxicity
+
+        def record(content, sender):
+            seen.append(content)
+            return original(content, sender)
+
+        analyzer.analyze_email_toxicity = record
+        body = "The quarterly figures are attached for review. " * 800
+        email = EphemeralEmail(
+            message_id="long-1", from_address="a@example.com", to_addresses=["b@cellophanemail.com"],
+            subject="Report", text_body=body, user_email="b@example.com"
+        )
+
+        result = await InMemoryProcessor(analyzer=analyzer).process_email(email)
+
+        assert len(body) > DEFAULT_MAX_CONTENT_TOKENS * CHARS_PER_TOKEN * 2
+        assert result.processed_content == f"Subject: Report\n\n{body}"
+        assert len(seen[0]) <= DEFAULT_MAX_CONTENT_TOKENS * CHARS_PER_TOKEN
+
+    def test_html_only_mail_keeps_quoted_thread(self):
+        html = "<p>Sounds good.</p><blockquote type=\"cite\">Earlier message</blockquote>"
+
+        assert build_delivery_content("Re: plan", None, html) == "Subject: Re: plan\n\nSounds good.\n\nEarlier message"
+        assert build_delivery_content("Re: plan", "plain", html) == "Subject: Re: plan\n\nplain"
@@ -0,0 +1,226 @@
+"""
+Tests for the process-based Llama worker pool and orchestrator back-pressure.
+"""
+import asyncio
+import os
+import queue
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cellophanemail.core.webhook_models import PostmarkWebhookPayload
+from cellophanemail.features.email_protection import llama_worker_pool
+from cellophanemail.features.email_protection.analyzer_factory import AnalyzerFactory
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.graduated_decision_maker import ProtectionAction
+from cellophanemail.features.email_protection.in_memory_processor import InMemoryProcessor
+from cellophanemail.features.email_protection.llama_worker_pool import (
+    InferenceOverloadedError,
+    InferenceUnavailableError,
+    LlamaWorkerPool,
+)
+from cellophanemail.features.privacy_integration import privacy_webhook_orchestrator
+from cellophanemail.features.privacy_integration.privacy_webhook_orchestrator import (
+    PrivacyWebhookOrchestrator,
+)
+
+
+def _echo_worker(request_queue, result_queue, model_path, n_threads, temperature, gc_interval):
+    """Worker stand-in that echoes content instead of loading a model."""
+    result_queue.put(("ready", os.getpid(), None))
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+        request_id, content = request
+        if content == "slow":
+            time.sleep(0.3)
+        result_queue.put((request_id, {"content": content, "pid": os.getpid()}, None))
+
+
+def _unloadable_worker(request_queue, result_queue, model_path, n_threads, temperature, gc_interval):
+    """Worker stand-in whose model never loads."""
+    time.sleep(0.2)
+    result_queue.put(("failed", os.getpid(), "model file not found"))
+
+
+class FakeLlamaAnalyzer:
+    def __init__(self, **kwargs):
+        if kwargs.get("model_path") == "missing.gguf":
+            raise FileNotFoundError("missing.gguf")
+        self.kwargs = kwargs
+
+    def analyze_toxicity(self, content):
+        if content == "boom":
+            raise ValueError("bad input")
+        return {"toxicity_score": 0.0, "content": content}
+
+
+@pytest.fixture
+def forked_pool(monkeypatch):
+    pools = []
+
+    def make(worker=_echo_worker, **kwargs):
+        monkeypatch.setattr(llama_worker_pool, "_worker_main", worker)
+        pool = LlamaWorkerPool(start_method="fork", **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown(timeout=2)
+
+
+class TestLlamaWorkerPool:
+    """Requests fan out across worker processes with bounded in-flight work."""
+
+    @pytest.mark.asyncio
+    async def test_requests_are_served_by_worker_processes(self, forked_pool):
+        pool = forked_pool(num_workers=2)
+
+        results = await asyncio.gather(*[pool.analyze_toxicity_async(f"m{i}") for i in range(6)])
+
+        assert [r["content"] for r in results] == [f"m{i}" for i in range(6)]
+        assert all(r["pid"] != os.getpid() for r in results)
+        assert pool.get_stats()["completed"] == 6
+        assert pool.in_flight == 0
+
+    def test_saturated_pool_refuses_new_work(self, forked_pool):
+        pool = forked_pool(num_workers=1, max_in_flight=1)
+
+        pending = pool.submit("slow")
+        assert pool.is_saturated
+        with pytest.raises(InferenceOverloadedError):
+            pool.submit("next")
+
+        assert pending.result(timeout=5)["content"] == "slow"
+        assert not pool.is_saturated
+        assert pool.get_stats()["rejected"] == 1
+
+    def test_pool_fails_fast_when_no_worker_loads_the_model(self, forked_pool):
+        pool = forked_pool(worker=_unloadable_worker, num_workers=2)
+
+        pending = pool.submit("hello")
+        with pytest.raises(InferenceUnavailableError, match="model file not found"):
+            pending.result(timeout=5)
+
+        with pytest.raises(InferenceUnavailableError):
+            pool.submit("next")
+        assert pool.get_stats()["workers_failed"] == 2
+        assert pool.in_flight == 0
+
+    def test_default_worker_count_follows_core_budget(self):
+        with patch.object(llama_worker_pool.os, "cpu_count", return_value=16):
+            pool = LlamaWorkerPool(threads_per_worker=4)
+
+        assert pool.num_workers == 4
+        assert pool.max_in_flight == 32
+
+
+class TestWorkerLoop:
+    """The worker serves one request per wakeup and reports errors instead of dying."""
+
+    def test_one_request_per_wakeup_and_error_reporting(self):
+        class RecordingQueue(queue.Queue):
+            """Records how many results were reported before each wakeup."""
+
+            def get(self, *args, **kwargs):
+                reported.append(results.qsize())
+                return super().get(*args, **kwargs)
+
+        reported = []
+        requests, results = RecordingQueue(), queue.Queue()
+        for item in [(1, "hello"), (2, "boom"), (3, "bye"), None]:
+            requests.put(item)
+
+        with patch("cellophanemail.features.email_protection.llama_analyzer.LlamaAnalyzer", FakeLlamaAnalyzer):
+            llama_worker_pool._worker_main(requests, results, None, 2, 0.1, 4)
+
+        items = [results.get_nowait() for _ in range(results.qsize())]
+        assert items[0][0] == "ready"
+        assert items[1] == (1, {"toxicity_score": 0.0, "content": "hello"}, None)
+        assert items[2] == (2, None, "bad input")
+        assert items[3][0] == 3
+        # Each request is answered before the worker takes another one
+        assert reported == [1, 2, 3, 4]
+
+    def test_model_load_failure_is_reported(self):
+        requests, results = queue.Queue(), queue.Queue()
+
+        with patch("cellophanemail.features.email_protection.llama_analyzer.LlamaAnalyzer", FakeLlamaAnalyzer):
+            llama_worker_pool._worker_main(requests, results, "missing.gguf", 2, 0.1, 4)
+
+        request_id, _, error = results.get_nowait()
+        assert request_id == "failed"
+        assert "missing.gguf" in error
+
+
+class TestOrchestratorBackPressure:
+    """Webhooks are deferred while local inference is saturated."""
+
+    @pytest.mark.asyncio
+    async def test_saturated_inference_defers_webhook(self):
+        orchestrator = PrivacyWebhookOrchestrator()
+        payload = PostmarkWebhookPayload(
+            From="a@example.com", To="shield@cellophanemail.com", Subject="Hi",
+            MessageID="msg-1", Date="Thu, 16 Oct 2026 10:00:00 +0000", TextBody="Hello",
+        )
+        saturated = MagicMock(is_saturated=True)
+
+        with patch.object(privacy_webhook_orchestrator, "current_llama_worker_pool", return_value=saturated):
+            response = await orchestrator.process_webhook(payload)
+
+        assert response["status"] == "deferred"
+        assert response["reason"] == "inference_backpressure"
+        assert orchestrator.memory_manager.get_email("msg-1") is None
+
+
+def _toxicity_worker(request_queue, result_queue, model_path, n_threads, temperature, gc_interval):
+    """Worker stand-in returning LlamaAnalyzer-shaped results."""
+    result_queue.put(("ready", os.getpid(), None))
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+        request_id, content = request
+        toxic = "pathetic" in content
+        result_queue.put((request_id, {
+            "toxicity_score": 0.9 if toxic else 0.0,
+            "manipulation": False,
+            "gaslighting": toxic,
+            "stonewalling": False,
+            "defensive": toxic,
+            "action": "TOXIC" if toxic else "SAFE",
+        }, None))
+
+
+class TestWorkerPoolThroughProcessor:
+    """LLAMA_WORKERS analyzers serve InMemoryProcessor like any IEmailAnalyzer."""
+
+    @pytest.mark.asyncio
+    async def test_factory_pool_analyzes_ephemeral_email(self, monkeypatch):
+        monkeypatch.setattr(llama_worker_pool, "_worker_main", _toxicity_worker)
+        monkeypatch.setenv("LLAMA_WORKERS", "1")
+        pool = LlamaWorkerPool(num_workers=1, start_method="fork")
+        monkeypatch.setattr(llama_worker_pool, "_pool", pool)
+        try:
+            analyzer = AnalyzerFactory.create_analyzer(analyzer_type="llama")
+            processor = InMemoryProcessor(analyzer=analyzer)
+
+            def email(message_id, body):
+                return EphemeralEmail(
+                    message_id=message_id, from_address="a@example.com",
+                    to_addresses=["shield@cellophanemail.com"], subject="Update",
+                    text_body=body, user_email="user@example.com",
+                )
+
+            toxic = await processor.process_email(email("w-1", "You are pathetic and everyone knows it"))
+            clean = await processor.process_email(email("w-2", "The contract draft is ready for your review"))
+        finally:
+            pool.shutdown(timeout=2)
+
+        assert toxic.action == ProtectionAction.BLOCK_ENTIRELY
+        assert clean.action == ProtectionAction.FORWARD_CLEAN
+        assert pool.get_stats()["completed"] == 2
+        assert analyzer.is_saturated is False
@@ -0,0 +1,89 @@
+"""
+Tests for byte-budgeted MemoryManager capacity and body compression.
+"""
+import pytest
+
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.memory_manager import MemoryManager
+
+HTML = "<p>" + "Quarterly numbers attached, see table below. " * 2000 + "</p>"
+
+
+def _email(message_id, text_body="Short note", html_body=None):
+    return EphemeralEmail(
+        message_id=message_id,
+        from_address="sender@example.com",
+        to_addresses=["recipient@example.com"],
+        subject="Subject",
+        text_body=text_body,
+        user_email="user@example.com",
+        html_body=html_body,
+    )
+
+
+class TestByteBudget:
+    """Capacity is charged by footprint, not by email count."""
+
+    def test_large_email_rejected_small_emails_fit(self):
+        manager = MemoryManager(capacity=1000, max_bytes=20_000)
+
+        assert not manager.store_email(_email("big", html_body=HTML))
+        assert all(manager.store_email(_email(f"small-{i}")) for i in range(5))
+
+        stats = manager.get_stats()
+        assert stats["rejected_emails"] == 1
+        assert 0 < stats["bytes_used"] <= 20_000
+        assert stats["available_bytes"] == 20_000 - stats["bytes_used"]
+
+    @pytest.mark.asyncio
+    async def test_bytes_released_on_remove_and_expiry(self):
+        manager = MemoryManager(max_bytes=1_000_000)
+        email = _email("m1", html_body=HTML)
+        manager.store_email(email)
+        assert manager.get_stats()["bytes_used"] >= len(HTML)
+
+        await manager.remove_email("m1")
+
+        assert manager.get_stats()["bytes_used"] == 0
+
+    def test_body_reassignment_is_recharged(self):
+        manager = MemoryManager(max_bytes=1_000_000)
+        email = _email("m1")
+        manager.store_email(email)
+        before = manager.get_stats()["bytes_used"]
+
+        email.text_body = HTML
+
+        assert manager.get_stats()["bytes_used"] - before >= len(HTML) - len("Short note")
+
+
+class TestBodyCompression:
+    """Waiting bodies are held compressed but read back as plain text."""
+
+    def test_compressed_bodies_read_transparently(self):
+        manager = MemoryManager(max_bytes=1_000_000, compression="zlib")
+        email = _email("m1", text_body=HTML, html_body=HTML)
+
+        assert manager.store_email(email)
+
+        assert email.is_compressed
+        assert email.text_body == HTML and email.html_body == HTML
+        stats = manager.get_stats()
+        assert stats["bytes_used"] < len(HTML) // 4
+        assert stats["compression_ratio"] < 0.1
+
+    def test_small_bodies_stay_plain(self):
+        manager = MemoryManager(compression="zlib", compression_min_bytes=1024)
+        email = _email("m1")
+
+        manager.store_email(email)
+
+        assert not email.is_compressed
+        assert manager.get_stats()["compression_ratio"] == 1.0
+
+    def test_unavailable_zstd_falls_back_to_zlib(self):
+        email = _email("m1", text_body=HTML)
+
+        email.compress_bodies("zstd")
+
+        assert email.text_body == HTML
@@ -0,0 +1,110 @@
+"""
+Tests for the MemoryManager expiry index.
+"""
+import time
+from unittest.mock import patch
+
+import pytest
+
+from cellophanemail.features.email_protection.background_cleanup import BackgroundCleanupService
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.memory_manager import MemoryManager
+
+
+def _email(message_id, ttl_seconds=300):
+    return EphemeralEmail(
+        message_id=message_id,
+        from_address="sender@example.com",
+        to_addresses=["recipient@example.com"],
+        subject="Subject",
+        text_body="Body",
+        user_email="user@example.com",
+        ttl_seconds=ttl_seconds,
+    )
+
+
+class TestExpiryIndex:
+    """Cleanup visits expired emails only, in expiry order."""
+
+    @pytest.mark.asyncio
+    async def test_cleanup_does_not_inspect_live_emails(self):
+        manager = MemoryManager(capacity=1000)
+        for i in range(500):
+            manager.store_email(_email(f"live-{i}"))
+        expired = _email("expired", ttl_seconds=0)
+        expired._created_at = time.time() - 1
+        manager.store_email(expired)
+
+        with patch.object(EphemeralEmail, "is_expired", property(lambda self: pytest.fail("full scan"))):
+            cleaned = await manager.cleanup_expired()
+
+        assert cleaned == 1
+        assert manager.get_email("expired") is None
+        assert manager.get_stats()["current_emails"] == 500
+
+    @pytest.mark.asyncio
+    async def test_backdating_after_store_is_indexed(self):
+        manager = MemoryManager()
+        email = _email("backdated")
+        manager.store_email(email)
+
+        email._created_at = time.time() - 400
+
+        assert await manager.cleanup_expired() == 1
+
+    @pytest.mark.asyncio
+    async def test_extended_ttl_supersedes_old_entry(self):
+        manager = MemoryManager()
+        email = _email("extended", ttl_seconds=300)
+        email._created_at = time.time() - 400
+        manager.store_email(email)
+
+        email.ttl_seconds = 600
+
+        assert await manager.cleanup_expired() == 0
+        assert manager.get_email("extended") is email
+
+    @pytest.mark.asyncio
+    async def test_limit_and_grace(self):
+        manager = MemoryManager(capacity=10)
+        for i, age in enumerate([320, 330, 400, 500]):
+            email = _email(f"e{i}")
+            email._created_at = time.time() - age
+            manager.store_email(email)
+
+        assert await manager.cleanup_expired(grace_seconds=60, limit=1) == 1
+        assert manager.get_email("e3") is None
+        assert await manager.cleanup_expired(grace_seconds=60) == 1
+        assert manager.get_email("e2") is None
+        assert manager.get_stats()["current_emails"] == 2
+
+    @pytest.mark.asyncio
+    async def test_removed_emails_leave_no_stale_expiry(self):
+        manager = MemoryManager()
+        email = _email("removed")
+        manager.store_email(email)
+        await manager.remove_email("removed")
+
+        email._created_at = time.time() - 400
+        manager.store_email(_email("removed"))
+
+        assert await manager.cleanup_expired() == 0
+        assert manager.get_email("removed") is not None
+
+
+class TestBackgroundCleanupWithIndex:
+    """The cleanup service drains every expired email, not just a first batch."""
+
+    @pytest.mark.asyncio
+    async def test_more_than_one_batch_is_removed(self):
+        manager = MemoryManager(capacity=1000)
+        for i in range(250):
+            email = _email(f"old-{i}")
+            email._created_at = time.time() - 600
+            manager.store_email(email)
+        manager.store_email(_email("fresh"))
+
+        cleaned = await BackgroundCleanupService(manager).cleanup_expired_emails()
+
+        assert cleaned == 250
+        assert manager.get_stats()["current_emails"] == 1
@@ -0,0 +1,191 @@
+"""
+Tests for Postmark batch sending and the coalescing delivery queue.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from cellophanemail.core.email_delivery.batch_queue import BatchDeliveryQueue, close_batch_queues
+from cellophanemail.core.email_delivery.senders.postmark_sender import (
+    BatchSendResult,
+    PostmarkEmailSender,
+)
+from cellophanemail.features.email_protection.email_composition_strategy import (
+    DeliveryConfiguration,
+    EmailComposition,
+)
+from cellophanemail.features.email_protection.in_memory_processor import ProtectionAction
+from cellophanemail.features.email_protection.integrated_delivery_manager import (
+    IntegratedDeliveryManager,
+)
+
+POSTMARK_CONFIG = {
+    'SMTP_DOMAIN': 'cellophanemail.com',
+    'EMAIL_USERNAME': 'user@example.com',
+    'POSTMARK_API_TOKEN': 'token',
+}
+
+
+class RecordingSender:
+    """Batch sender that fails chosen recipients a set number of times."""
+
+    def __init__(self, failures=None, error_code=500):
+        self.failures = dict(failures or {})
+        self.error_code = error_code
+        self.batches = []
+
+    async def send_batch(self, messages):
+        self.batches.append([m['to_address'] for m in messages])
+        results = []
+        for message in messages:
+            remaining = self.failures.get(message['to_address'], 0)
+            if remaining:
+                self.failures[message['to_address']] = remaining - 1
+                results.append(BatchSendResult(False, self.error_code, "Temporary failure"))
+            else:
+                results.append(BatchSendResult(True, 0, "OK", f"id-{message['to_address']}"))
+        return results
+
+
+def _submit(queue, to_address):
+    return queue.submit(to_address, "Subject", "Body", {})
+
+
+class TestPostmarkSendBatch:
+    """Per-message results from /email/batch."""
+
+    @pytest.mark.asyncio
+    async def test_results_map_to_messages_in_order(self):
+        response = MagicMock(status_code=200)
+        response.json.return_value = [
+            {"ErrorCode": 0, "Message": "OK", "MessageID": "m-1"},
+            {"ErrorCode": 406, "Message": "Inactive recipient"},
+        ]
+        client = AsyncMock()
+        client.post.return_value = response
+        sender = PostmarkEmailSender(POSTMARK_CONFIG, http_client=client)
+
+        results = await sender.send_batch([
+            {"to_address": "a@x.com", "subject": "S", "content": "B", "headers": {"Reply-To": "r@x.com"}},
+            {"to_address": "b@x.com", "subject": "S", "content": "B", "headers": {}},
+        ])
+
+        url = client.post.call_args.args[0]
+        payload = client.post.call_args.kwargs['json']
+        assert url.endswith('/email/batch')
+        assert [p['To'] for p in payload] == ["a@x.com", "b@x.com"]
+        assert payload[0]['ReplyTo'] == "r@x.com"
+        assert results[0].success and results[0].message_id == "m-1"
+        assert not results[1].success and not results[1].retryable
+
+    @pytest.mark.asyncio
+    async def test_rejected_call_fails_every_entry(self):
+        client = AsyncMock()
+        client.post.return_value = MagicMock(status_code=401, text="bad token")
+        sender = PostmarkEmailSender(POSTMARK_CONFIG, http_client=client)
+
+        results = await sender.send_batch([
+            {"to_address": "a@x.com", "subject": "S", "content": "B"},
+            {"to_address": "b@x.com", "subject": "S", "content": "B"},
+        ])
+
+        assert [r.success for r in results] == [False, False]
+        assert all(r.retryable for r in results)
+
+
+class TestBatchDeliveryQueue:
+    """Coalescing window, size-triggered flush and per-entry retry."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sends_share_one_batch(self):
+        sender = RecordingSender()
+        queue = BatchDeliveryQueue(sender, window_ms=20)
+
+        outcomes = await asyncio.gather(*[_submit(queue, f"u{i}@x.com") for i in range(5)])
+
+        assert len(sender.batches) == 1
+        assert all(o.success and o.attempts == 1 for o in outcomes)
+        assert outcomes[3].message_id == "id-u3@x.com"
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting_for_window(self):
+        sender = RecordingSender()
+        queue = BatchDeliveryQueue(sender, max_batch_size=2, window_ms=10_000)
+
+        outcomes = await asyncio.wait_for(
+            asyncio.gather(_submit(queue, "a@x.com"), _submit(queue, "b@x.com")), timeout=1
+        )
+
+        assert sender.batches == [["a@x.com", "b@x.com"]]
+        assert all(o.success for o in outcomes)
+
+    @pytest.mark.asyncio
+    async def test_only_failed_entries_are_retried(self):
+        sender = RecordingSender(failures={"b@x.com": 1})
+        queue = BatchDeliveryQueue(sender, window_ms=5)
+
+        outcomes = await asyncio.gather(*[_submit(queue, a) for a in ("a@x.com", "b@x.com", "c@x.com")])
+
+        assert sender.batches == [["a@x.com", "b@x.com", "c@x.com"], ["b@x.com"]]
+        assert [o.attempts for o in outcomes] == [1, 2, 1]
+        assert all(o.success for o in outcomes)
+        assert queue.get_stats()["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_failure_is_reported_once(self):
+        sender = RecordingSender(failures={"gone@x.com": 5}, error_code=406)
+        queue = BatchDeliveryQueue(sender, window_ms=5)
+
+        outcome = await _submit(queue, "gone@x.com")
+
+        assert not outcome.success
+        assert outcome.attempts == 1
+        assert outcome.error_message == "Temporary failure"
+
+    @pytest.mark.asyncio
+    async def test_shutdown_flushes_pending_messages(self):
+        sender = RecordingSender()
+        queue = BatchDeliveryQueue(sender, window_ms=10_000)
+        pending = asyncio.ensure_future(_submit(queue, "late@x.com"))
+        await asyncio.sleep(0)
+
+        assert await close_batch_queues() >= 1
+
+        assert sender.batches == [["late@x.com"]]
+        assert (await asyncio.wait_for(pending, timeout=1)).success
+        with pytest.raises(RuntimeError):
+            await _submit(queue, "after@x.com")
+
+
+class TestIntegratedBatchDelivery:
+    """IntegratedDeliveryManager routes through the queue when batching is enabled."""
+
+    @pytest.mark.asyncio
+    async def test_results_map_back_to_enhanced_delivery_results(self):
+        manager = IntegratedDeliveryManager(DeliveryConfiguration(
+            config=POSTMARK_CONFIG, batch_delivery=True, batch_window_ms=5,
+        ))
+        sender = RecordingSender(failures={"b@x.com": 1})
+        manager.batch_queue.sender = sender
+        manager.composer.compose_email = MagicMock(return_value=EmailComposition(
+            subject="S", body="B", headers={}, from_address="noreply@cellophanemail.com",
+        ))
+
+        def processing_result(target):
+            return MagicMock(
+                requires_delivery=True, delivery_targets=[target],
+                action=ProtectionAction.FORWARD_CLEAN, toxicity_score=0.0,
+            )
+
+        results = await asyncio.gather(*[
+            manager.deliver_email(processing_result(t), MagicMock(message_id=t))
+            for t in ("a@x.com", "b@x.com")
+        ])
+
+        assert sender.batches[0] == ["a@x.com", "b@x.com"]
+        assert [(r.success, r.attempts) for r in results] == [(True, 1), (True, 2)]
+
+    def test_batching_is_off_by_default(self):
+        manager = IntegratedDeliveryManager(DeliveryConfiguration(config=POSTMARK_CONFIG))
+        assert manager.batch_queue is None
@@ -0,0 +1,109 @@
+"""
+Tests for the heuristic pre-filter tier in front of the LLM analyzers.
+"""
+import pytest
+
+from cellophanemail.features.email_protection.analyzer_factory import AnalyzerFactory
+from cellophanemail.features.email_protection.caching_analyzer import CachingAnalyzer
+from cellophanemail.features.email_protection.mock_analyzer import create_toxic_analyzer
+from cellophanemail.features.email_protection.models import ThreatLevel
+from cellophanemail.features.email_protection.prefilter import (
+    HeuristicPrefilter,
+    PrefilteredAnalyzer,
+)
+from cellophanemail.features.monitoring import MetricsCollector
+
+
+class TestHeuristicPrefilter:
+    """Only short, cue-free messages are cleared locally."""
+
+    @pytest.mark.parametrize("content", [
+        "On my way, 5 mins",
+        "Subject: Lunch\n\nMeeting moved to 1pm in room 4",
+        "Thanks, sounds good",
+        "Running 10 mins late. I'll be there by 6pm",
+        "Invoice attached",
+    ])
+    def test_clean_short_messages_are_safe(self, content):
+        result = HeuristicPrefilter().classify(content)
+
+        assert not result.escalate
+        assert result.threat_level == ThreatLevel.SAFE
+        assert 0.8 <= result.confidence <= 0.95
+
+    @pytest.mark.parametrize("content", [
+        "You are such an idiot",
+        "Whatever. Do what you want",
+        "You never listen",
+        "It's not my fault you forgot",
+        "WHY did you do that",
+        "Are you serious??",
+        "You said you would and your promise meant nothing to you",
+        "",
+        "You disgust me",
+        "Nobody will ever love you.",
+        "I know where you live.",
+        "I'm going to make sure you lose your job",
+        "Eres un inútil",
+        "T'es vraiment nul",
+        "Can you grab milk on the way home?",
+    ])
+    def test_uncertain_messages_escalate(self, content):
+        assert HeuristicPrefilter().classify(content).escalate
+
+    @pytest.mark.parametrize("content", [
+        "You are no good",
+        "I will get you",
+        "I will be at your house tonight",
+        "you are done",
+        "Get out",
+        "Go home",
+    ])
+    def test_threats_in_ordinary_words_escalate(self, content):
+        assert HeuristicPrefilter().classify(content).escalate
+
+    def test_long_messages_escalate(self):
+        content = " ".join(["word"] * 31)
+        assert HeuristicPrefilter(max_tokens=30).classify(content).escalate
+
+    def test_lexicon_matches_whole_words_only(self):
+        prefilter = HeuristicPrefilter()
+
+        assert prefilter.classify("Meeting in the assembly hall").matched_terms == []
+        assert prefilter.classify("What the hell").matched_terms == ["hell"]
+
+    def test_counts_llm_calls_avoided(self):
+        prefilter = HeuristicPrefilter()
+        prefilter.classify("On my way")
+        prefilter.classify("You idiot")
+
+        assert prefilter.get_stats() == {
+            'evaluated': 2, 'short_circuited': 1, 'escalated': 1, 'llm_calls_avoided': 1,
+        }
+
+
+class TestPrefilteredAnalyzer:
+    """The decorator skips the wrapped analyzer for cleared messages."""
+
+    @pytest.mark.asyncio
+    async def test_only_uncertain_messages_reach_llm(self):
+        inner = create_toxic_analyzer()
+        collector = MetricsCollector()
+        analyzer = PrefilteredAnalyzer(inner, HeuristicPrefilter(), metrics_collector=collector)
+
+        clean = await analyzer.analyze_email_toxicity_async("On my way, 5 mins", "+1555")
+        await analyzer.analyze_email_toxicity_async("You are a pathetic loser", "+1555")
+
+        assert inner.call_count == 1
+        assert clean.safe and clean.horsemen_detected == []
+        assert collector.get_performance_metrics().prefilter_short_circuited == 1
+        assert "cellophanemail_llm_calls_avoided_total 1" in collector.export_prometheus_format()
+
+    def test_factory_puts_prefilter_outside_cache(self, monkeypatch):
+        monkeypatch.delenv("ANALYSIS_CACHE_ENABLED", raising=False)
+        monkeypatch.delenv("ANALYSIS_PREFILTER_ENABLED", raising=False)
+
+        analyzer = AnalyzerFactory.create_analyzer(analyzer_type="anthropic")
+
+        assert isinstance(analyzer, PrefilteredAnalyzer)
+        assert isinstance(analyzer.wrapped, CachingAnalyzer)
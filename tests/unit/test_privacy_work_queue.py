@@ -0,0 +1,162 @@
+"""
+Tests for the bounded, per-organization fair work queue in the privacy pipeline.
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from cellophanemail.core.webhook_models import PostmarkWebhookPayload
+from cellophanemail.features.email_processing_strategy import ProcessingStrategyManager
+from cellophanemail.features.monitoring import MetricsCollector
+from cellophanemail.features.privacy_integration.privacy_webhook_orchestrator import (
+    PrivacyProcessingConfig,
+    PrivacyWebhookOrchestrator,
+    shutdown_orchestrators,
+)
+from cellophanemail.features.privacy_integration.work_queue import FairWorkQueue
+
+GET_COLLECTOR = 'cellophanemail.features.privacy_integration.privacy_webhook_orchestrator.get_metrics_collector'
+
+
+def _payload(message_id, to="shield@cellophanemail.com"):
+    return PostmarkWebhookPayload(
+        From="a@example.com", To=to, Subject="Hi", MessageID=message_id,
+        Date="Thu, 16 Oct 2026 10:00:00 +0000", TextBody="Hello",
+    )
+
+
+class TestFairWorkQueue:
+    """Lanes are served round-robin and limits are enforced at put time."""
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_organizations(self):
+        queue = FairWorkQueue(max_size=10)
+        for i in range(3):
+            queue.put_nowait("org-a", f"a{i}")
+        queue.put_nowait("org-b", "b0")
+
+        served = [await queue.get() for _ in range(4)]
+
+        assert served == ["a0", "b0", "a1", "a2"]
+        assert queue.qsize() == 0
+
+    def test_total_and_per_key_limits(self):
+        queue = FairWorkQueue(max_size=3, max_per_key=2)
+        queue.put_nowait("org-a", 1)
+        queue.put_nowait("org-a", 2)
+
+        assert not queue.can_accept("org-a")
+        with pytest.raises(asyncio.QueueFull):
+            queue.put_nowait("org-a", 3)
+
+        queue.put_nowait("org-b", 1)
+        assert queue.full() and not queue.can_accept("org-c")
+        assert queue.depth_by_key() == {"org-a": 2, "org-b": 1}
+
+
+class TestOrchestratorAdmissionControl:
+    """Consumer count is bounded and excess webhooks are deferred."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_by_max_concurrent_tasks(self):
+        orchestrator = PrivacyWebhookOrchestrator(PrivacyProcessingConfig(max_concurrent_tasks=2))
+        running, peak, release = 0, 0, asyncio.Event()
+
+        async def slow_process(email):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+
+        with patch.object(orchestrator, "_process_email_async", side_effect=slow_process):
+            responses = [await orchestrator.process_webhook(_payload(f"q-{i}")) for i in range(5)]
+            await asyncio.sleep(0.01)
+
+            assert all(r["status"] == "accepted" for r in responses)
+            assert peak == 2
+            assert orchestrator.get_processing_stats()["queue_depth"] == 3
+
+            release.set()
+            await asyncio.sleep(0.01)
+
+        assert orchestrator.get_processing_stats()["queue_depth"] == 0
+        await orchestrator.shutdown_gracefully()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_drains_queue_before_stopping_consumers(self):
+        orchestrator = PrivacyWebhookOrchestrator(PrivacyProcessingConfig(max_concurrent_tasks=1))
+        processed = []
+
+        async def process(email):
+            await asyncio.sleep(0.01)
+            processed.append(email.message_id)
+
+        with patch.object(orchestrator, "_process_email_async", side_effect=process):
+            for i in range(3):
+                await orchestrator.process_webhook(_payload(f"drain-{i}"))
+            await shutdown_orchestrators()
+
+        assert processed == ["drain-0", "drain-1", "drain-2"]
+        assert all(task.done() for task in orchestrator._background_tasks)
+
+    @pytest.mark.asyncio
+    async def test_saturated_queue_defers_without_storing(self):
+        config = PrivacyProcessingConfig(max_concurrent_tasks=1, max_queued_emails=1)
+        orchestrator = PrivacyWebhookOrchestrator(config)
+        collector = MetricsCollector()
+        blocker = asyncio.Event()
+
+        with patch.object(orchestrator, "_process_email_async", AsyncMock(side_effect=lambda e: blocker.wait())), \
+             patch(GET_COLLECTOR, return_value=collector):
+            await orchestrator.process_webhook(_payload("sat-1"))
+            await asyncio.sleep(0)  # worker takes sat-1
+            await orchestrator.process_webhook(_payload("sat-2"))
+            deferred = await orchestrator.process_webhook(_payload("sat-3"))
+
+        assert deferred["status"] == "deferred"
+        assert deferred["reason"] == "processing_queue_full"
+        assert orchestrator.memory_manager.get_email("sat-3") is None
+        assert collector.get_performance_metrics().processing_queue_rejections == 1
+        assert "cellophanemail_processing_queue_depth 1" in collector.export_prometheus_format()
+        blocker.set()
+        await orchestrator.shutdown_gracefully()
+
+    @pytest.mark.asyncio
+    async def test_queue_filled_during_storage_defers_and_removes_email(self):
+        config = PrivacyProcessingConfig(max_concurrent_tasks=1, max_queued_emails=1)
+        orchestrator = PrivacyWebhookOrchestrator(config)
+        blocker = asyncio.Event()
+        store = orchestrator.memory_manager.store_email_async
+
+        async def slow_store(email):
+            stored = await store(email)
+            await asyncio.sleep(0.01)  # a Redis round trip
+            return stored
+
+        with patch.object(orchestrator, "_process_email_async", AsyncMock(side_effect=lambda e: blocker.wait())), \
+             patch.object(orchestrator.memory_manager, "store_email_async", side_effect=slow_store):
+            await orchestrator.process_webhook(_payload("race-1"))
+            await asyncio.sleep(0.02)  # worker takes race-1
+            responses = await asyncio.gather(
+                orchestrator.process_webhook(_payload("race-2")),
+                orchestrator.process_webhook(_payload("race-3")),
+            )
+
+        assert [r["status"] for r in responses] == ["accepted", "deferred"]
+        assert responses[1]["reason"] == "processing_queue_full"
+        assert orchestrator.memory_manager.get_email("race-3") is None
+        blocker.set()
+        await orchestrator.shutdown_gracefully()
+
+    @pytest.mark.asyncio
+    async def test_deferred_response_maps_to_429(self):
+        manager = ProcessingStrategyManager()
+        deferred = {"status": "deferred", "message_id": "m1", "processing": "privacy_pipeline_deferred"}
+
+        with patch.object(manager.orchestrator, "process_webhook", AsyncMock(return_value=deferred)) as process:
+            result = await manager.process_email(_payload("m1"), {"organization": "org-1"})
+
+        assert result.status_code == 429
+        assert process.call_args.kwargs["organization_id"] == "org-1"
@@ -0,0 +1,186 @@
+"""
+Tests for the Anthropic system prompt and prompt-prefix caching on the local Llama path.
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from analysis_engine import ANALYSIS_INSTRUCTIONS, format_analysis_prompt
+from cellophanemail.features.email_protection import llama_analyzer
+from cellophanemail.features.email_protection.analyzer_factory import AnalyzerFactory
+from cellophanemail.features.email_protection.email_toxicity_analyzer import (
+    ANALYSIS_SYSTEM_PROMPT,
+    EmailToxicityAnalyzer,
+)
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.graduated_decision_maker import ProtectionAction
+from cellophanemail.features.email_protection.in_memory_processor import InMemoryProcessor
+from cellophanemail.features.monitoring import MetricsCollector
+
+GET_COLLECTOR = 'cellophanemail.features.monitoring.metrics_collector.get_metrics_collector'
+
+SAFE_JSON = '{"safe": true, "horsemen_detected": [], "reasoning": "ok", "confidence": 0.9}'
+
+
+def _response(input_tokens=20, cache_read=0, cache_write=0):
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=SAFE_JSON)],
+        usage=SimpleNamespace(
+            input_tokens=input_tokens,
+            cache_read_input_tokens=cache_read,
+            cache_creation_input_tokens=cache_write,
+        ),
+    )
+
+
+def _anthropic_analyzer(response):
+    analyzer = EmailToxicityAnalyzer()
+    analyzer.provider = "anthropic"
+    analyzer.model_name = "test-model"
+    analyzer.client = MagicMock()
+    analyzer.client.messages.create.return_value = response
+    analyzer.async_client = MagicMock()
+    analyzer.async_client.messages.create = AsyncMock(return_value=response)
+    return analyzer
+
+
+class TestAnthropicSystemPrompt:
+    """The static instructions go in the system prompt, ahead of the message."""
+
+    @pytest.mark.asyncio
+    async def test_instructions_sent_as_system_prompt(self):
+        analyzer = _anthropic_analyzer(_response())
+
+        with patch(GET_COLLECTOR, return_value=MetricsCollector()):
+            await analyzer.analyze_email_toxicity_async("See you at 5", "a@b.com")
+
+        kwargs = analyzer.async_client.messages.create.call_args.kwargs
+        # Too short for Anthropic's minimum cacheable prefix, so no cache_control marker
+        assert kwargs["system"] == ANALYSIS_SYSTEM_PROMPT
+        user_content = kwargs["messages"][0]["content"]
+        assert "See you at 5" in user_content
+        assert "FOUR HORSEMEN" not in user_content
+
+    def test_usage_feeds_cached_token_ratio(self):
+        collector = MetricsCollector()
+        analyzer = _anthropic_analyzer(_response(input_tokens=30, cache_read=270))
+
+        with patch(GET_COLLECTOR, return_value=collector):
+            analyzer.analyze_email_toxicity("See you at 5", "a@b.com")
+
+        metrics = collector.get_performance_metrics()
+        assert metrics.prompt_tokens_cache_read == 270
+        assert metrics.cached_token_ratio == pytest.approx(0.9)
+        assert "cellophanemail_llm_cached_token_ratio 0.9000" in collector.export_prometheus_format()
+
+
+class FakeLlama:
+    """Minimal llama.cpp stand-in tracking evaluated tokens and saved states."""
+
+    def __init__(self, **kwargs):
+        self.input_ids = []
+        self.loads = 0
+
+    @property
+    def n_tokens(self):
+        return len(self.input_ids)
+
+    def tokenize(self, data, special=False):
+        return list(data)
+
+    def reset(self):
+        self.input_ids = []
+
+    def eval(self, tokens):
+        self.input_ids = self.input_ids + list(tokens)
+
+    def save_state(self):
+        return list(self.input_ids)
+
+    def load_state(self, state):
+        self.loads += 1
+        self.input_ids = list(state)
+
+    def __call__(self, prompt, **kwargs):
+        self.input_ids = list(prompt.encode("utf-8"))
+        return {"choices": [{"text": '"toxicity_score": 0.0, "action": "SAFE"}'}]}
+
+
+class TestLlamaPrefixState:
+    """The analysis prefix is evaluated once and restored when displaced."""
+
+    def _analyzer(self, tmp_path):
+        model = tmp_path / "model.gguf"
+        model.write_bytes(b"")
+        with patch.object(llama_analyzer, "Llama", FakeLlama):
+            return llama_analyzer.LlamaAnalyzer(model_path=str(model))
+
+    def test_prefix_is_primed_at_load_and_reused(self, tmp_path):
+        analyzer = self._analyzer(tmp_path)
+        collector = MetricsCollector()
+
+        with patch(GET_COLLECTOR, return_value=collector):
+            analyzer.analyze_toxicity("hello there")
+            analyzer.analyze_toxicity("second email")
+
+        assert analyzer._prefix_tokens == list(llama_analyzer.ANALYSIS_PREFIX.encode("utf-8"))
+        assert analyzer.llm.loads == 0
+        assert collector.get_performance_metrics().prompt_tokens_cache_read == 2 * len(analyzer._prefix_tokens)
+
+    def test_state_restored_after_a_different_prompt(self, tmp_path):
+        analyzer = self._analyzer(tmp_path)
+
+        with patch(GET_COLLECTOR, return_value=MetricsCollector()):
+            analyzer.analyze_fact_manner("fact", "email body", "a@b.com")
+            analyzer.analyze_toxicity("hello there")
+
+        assert analyzer.llm.loads == 1
+
+
+class TestPortablePromptOrder:
+    """The shared engine prompt puts the static instructions first."""
+
+    def test_instructions_precede_content(self):
+        prompt = format_analysis_prompt("Hello world", "test@example.com")
+
+        assert prompt.startswith(ANALYSIS_INSTRUCTIONS)
+        assert prompt.endswith("From: test@example.com\nContent: Hello world")
+
+
+class TestLlamaPrefixThroughProcessor:
+    """Production analyses reach the cached prefix via the IEmailAnalyzer adapter."""
+
+    @pytest.mark.asyncio
+    async def test_processor_reuses_prefix_state(self, tmp_path, monkeypatch):
+        model = tmp_path / "model.gguf"
+        model.write_bytes(b"")
+        monkeypatch.setenv("LLAMA_MODEL_PATH", str(model))
+        monkeypatch.delenv("LLAMA_POOL_SIZE", raising=False)
+        monkeypatch.delenv("LLAMA_WORKERS", raising=False)
+        monkeypatch.setenv("ANALYSIS_CACHE_ENABLED", "false")
+        monkeypatch.setattr(llama_analyzer, "Llama", FakeLlama)
+        collector = MetricsCollector()
+
+        with patch(GET_COLLECTOR, return_value=collector):
+            analyzer = AnalyzerFactory.create_analyzer(analyzer_type="llama")
+            processor = InMemoryProcessor(analyzer=analyzer)
+            for index, body in enumerate(["Quarterly numbers attached", "Budget review notes"]):
+                result = await processor.process_email(EphemeralEmail(
+                    message_id=f"prefix-{index}", from_address="a@example.com",
+                    to_addresses=["shield@cellophanemail.com"], subject="Update",
+                    text_body=body, user_email="user@example.com",
+                ))
+                assert result.action == ProtectionAction.FORWARD_CLEAN
+
+            analyzer.analyze_fact_presentation("fact", "email body", "a@example.com")
+            await processor.process_email(EphemeralEmail(
+                message_id="prefix-2", from_address="a@example.com",
+                to_addresses=["shield@cellophanemail.com"], subject="Update",
+                text_body="Revised forecast", user_email="user@example.com",
+            ))
+
+        model = analyzer.wrapped.wrapped
+        prefix_tokens = len(llama_analyzer.ANALYSIS_PREFIX.encode("utf-8"))
+        assert collector.get_performance_metrics().prompt_tokens_cache_read == 3 * prefix_tokens
+        assert model.llm.loads == 1
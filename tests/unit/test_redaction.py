@@ -0,0 +1,96 @@
+"""
+Tests for the single-pass redaction engine.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.in_memory_processor import InMemoryProcessor
+from cellophanemail.features.email_protection.mock_analyzer import MockAnalyzer
+from cellophanemail.features.email_protection.models import HorsemanDetection
+from cellophanemail.features.email_protection import redaction
+from cellophanemail.features.email_protection.redaction import (
+    RedactionEngine,
+    default_redaction_engine,
+)
+
+
+class TestRedactionEngine:
+    """One scan, word boundaries, accurate spans."""
+
+    def test_redacts_every_occurrence_with_spans(self):
+        content = "Stupid plan. Truly stupid, and awful."
+        result = default_redaction_engine.redact(content)
+
+        assert result.content == "[REDACTED] plan. Truly [REDACTED], and [REDACTED]."
+        assert result.count == 3
+        assert [content[s.start:s.end] for s in result.spans] == ["Stupid", "stupid", "awful"]
+
+    def test_respects_word_boundaries(self):
+        result = default_redaction_engine.redact("Whatever, the chateau was awfully nice")
+
+        assert result.count == 0
+        assert result.content == "Whatever, the chateau was awfully nice"
+
+    def test_redacts_llm_indicator_phrases(self):
+        content = "Nobody asked for your opinion, as usual. It was stupid."
+        result = default_redaction_engine.redact(
+            content, ["nobody asked for your opinion", "  ", "ok"]
+        )
+
+        assert result.content == "[REDACTED], as usual. It was [REDACTED]."
+        assert [s.source for s in result.spans] == ["indicator", "lexicon"]
+
+    def test_longest_match_wins(self):
+        engine = RedactionEngine(["hate", "hate you"])
+        result = engine.redact("I hate you")
+
+        assert result.content == "I [REDACTED]"
+        assert result.spans[0].text == "hate you"
+
+    def test_indicator_patterns_are_compiled_per_call(self):
+        engine = RedactionEngine()
+
+        with patch.object(redaction, "_compile", wraps=redaction._compile) as compile_pattern:
+            engine.redact("Nobody cares what you think", ["nobody cares"])
+            engine.redact("Nobody cares what you think", ["nobody cares"])
+            engine.redact("Stupid plan")
+
+        # Per-message snippets are not retained; lexicon-only calls reuse the engine pattern
+        assert compile_pattern.call_count == 2
+
+
+class TestProcessorRedaction:
+    """REDACT_HARMFUL results carry spans and an accurate count."""
+
+    @pytest.mark.asyncio
+    async def test_processor_redacts_indicators_and_reports_spans(self):
+        analyzer = MockAnalyzer()
+        analyzer.set_horsemen_response(
+            "deadline",
+            [
+                HorsemanDetection(horseman="criticism", confidence=0.8,
+                                  indicators=["you always miss"], severity="medium"),
+                HorsemanDetection(horseman="defensiveness", confidence=0.8,
+                                  indicators=["not my problem"], severity="medium"),
+            ],
+            safe=False,
+        )
+        processor = InMemoryProcessor(analyzer=analyzer)
+        email = EphemeralEmail(
+            message_id="redact-1",
+            from_address="boss@example.com",
+            to_addresses=["shield@cellophanemail.com"],
+            subject="Deadline",
+            text_body="You always miss the deadline. Not my problem, it was stupid.",
+            user_email="user@example.com",
+            ttl_seconds=300,
+        )
+
+        result = await processor.process_email(email)
+
+        assert result.redaction_spans is not None
+        assert len(result.redaction_spans) == 3
+        assert "[NOTE: 3 inappropriate terms" in result.processed_content
+        assert "always miss" not in result.processed_content
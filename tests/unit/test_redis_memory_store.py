@@ -0,0 +1,203 @@
+"""
+Tests for the cross-process, encrypted Redis ephemeral store.
+"""
+import threading
+import time
+
+import pytest
+
+from cellophanemail.core.webhook_models import PostmarkWebhookPayload
+from cellophanemail.features.email_protection import memory_manager_singleton
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.memory_manager import MemoryManager
+from cellophanemail.features.email_protection.redis_memory_store import (
+    INDEX_KEY,
+    KEY_PREFIX,
+    RedisMemoryStore,
+)
+from cellophanemail.features.privacy_integration.privacy_webhook_orchestrator import (
+    PrivacyWebhookOrchestrator,
+)
+
+
+class FakeRedis:
+    """Minimal stand-in for the redis commands the store uses."""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+        self.zsets = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        self.expiry[key] = ex
+        return True
+
+    def exists(self, *keys):
+        return sum(key in self.store for key in keys)
+
+    def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def zadd(self, key, mapping, nx=False):
+        members = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not (nx and member in members):
+                members[member] = score
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    def zrange(self, key, start, end):
+        return [m for m, _ in sorted(self.zsets.get(key, {}).items(), key=lambda kv: kv[1])]
+
+    def zrangebyscore(self, key, low, high, start=None, num=None):
+        cutoff = float(high.lstrip("("))
+        members = [m for m in self.zrange(key, 0, -1) if self.zsets[key][m] < cutoff]
+        return members[:num] if num is not None else members
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+def _email(message_id, text_body="Confidential: Q4 revenue is $2.5M"):
+    return EphemeralEmail(
+        message_id=message_id,
+        from_address="sender@example.com",
+        to_addresses=["shield@cellophanemail.com"],
+        subject="Numbers",
+        text_body=text_body,
+        user_email="user@example.com",
+        html_body="<p>secret</p>",
+    )
+
+
+def _store(client=None, capacity=100, key="shared-secret"):
+    return RedisMemoryStore(encryption_key=key, capacity=capacity, client=client or FakeRedis())
+
+
+class TestRedisMemoryStore:
+    """Workers share one encrypted store with Redis-native expiry."""
+
+    def test_two_workers_see_the_same_email(self):
+        client = FakeRedis()
+        worker_a, worker_b = _store(client), _store(client)
+
+        assert worker_a.store_email(_email("m1"))
+
+        copy = worker_b.get_email("m1")
+        assert copy.text_body == "Confidential: Q4 revenue is $2.5M"
+        assert copy.html_body == "<p>secret</p>"
+        assert worker_b.get_stats()["current_emails"] == 1
+
+    def test_records_are_encrypted_with_native_ttl(self):
+        client = FakeRedis()
+        _store(client).store_email(_email("m1"))
+
+        raw = client.store[KEY_PREFIX + "m1"]
+        assert b"Q4 revenue" not in raw and b"sender@example.com" not in raw
+        assert 299 <= client.expiry[KEY_PREFIX + "m1"] <= 300
+        assert _store(client, key="other-secret").get_email("m1") is None
+
+    def test_capacity_is_shared_across_workers(self):
+        client = FakeRedis()
+        worker_a, worker_b = _store(client, capacity=2), _store(client, capacity=2)
+
+        assert worker_a.store_email(_email("m1"))
+        assert worker_b.store_email(_email("m2"))
+        assert not worker_a.store_email(_email("m3"))
+        assert worker_b.store_email(_email("m2"))  # retry of a stored email still succeeds
+        assert worker_a.get_stats()["rejected_emails"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cleanup_prunes_expired_index_entries(self):
+        client = FakeRedis()
+        store = _store(client)
+        old = _email("old")
+        old._created_at = time.time() - 400
+        store.store_email(old)
+        store.store_email(_email("fresh"))
+        client.zadd(INDEX_KEY, {"old": time.time() - 100})  # the record outlived its TTL
+
+        assert await store.cleanup_expired() == 1
+        assert [e.message_id for e in await store.get_all_emails()] == ["fresh"]
+        assert await store.remove_email("fresh")
+        assert store.get_stats()["current_emails"] == 0
+
+    def test_retry_does_not_replace_stored_email(self):
+        client = FakeRedis()
+        store = _store(client)
+        store.store_email(_email("m1"))
+
+        assert store.store_email(_email("m1", text_body="retried copy"))
+        assert store.get_email("m1").text_body == "Confidential: Q4 revenue is $2.5M"
+        assert store.contains_email("m1") and not store.contains_email("m2")
+
+    def test_encryption_key_is_required(self):
+        with pytest.raises(ValueError):
+            RedisMemoryStore(encryption_key="", client=FakeRedis())
+
+
+class TestBackendSelection:
+    """MEMORY_BACKEND=redis falls back to per-process memory when unusable."""
+
+    def test_unreachable_redis_falls_back(self, monkeypatch):
+        monkeypatch.setenv("MEMORY_BACKEND", "redis")
+        monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")
+        monkeypatch.setenv("EPHEMERAL_ENCRYPTION_KEY", "shared-secret")
+        memory_manager_singleton.reset_memory_manager()
+        try:
+            assert isinstance(memory_manager_singleton.get_memory_manager(), MemoryManager)
+        finally:
+            memory_manager_singleton.reset_memory_manager()
+
+
+class TestOrchestratorRedisIntake:
+    """Webhook intake stores through the async API and ignores provider retries."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_message_id_is_queued_once(self, monkeypatch):
+        client = FakeRedis()
+        orchestrator = PrivacyWebhookOrchestrator()
+        orchestrator.memory_manager = _store(client)
+        monkeypatch.setattr(orchestrator, "_ensure_workers", lambda: None)
+        writer_threads = []
+        original_set = client.set
+
+        def set(key, value, ex=None, nx=False):
+            writer_threads.append(threading.get_ident())
+            return original_set(key, value, ex=ex, nx=nx)
+
+        monkeypatch.setattr(client, "set", set)
+        payload = PostmarkWebhookPayload(
+            From="a@example.com", To="shield@cellophanemail.com", Subject="Hi",
+            MessageID="msg-1", Date="Thu, 16 Oct 2026 10:00:00 +0000", TextBody="Hello",
+        )
+
+        first = await orchestrator.process_webhook(payload)
+        retry = await orchestrator.process_webhook(payload)
+
+        assert first["status"] == retry["status"] == "accepted"
+        assert retry["reason"] == "duplicate_message_id"
+        # Redis writes ran in a worker thread, not on the event loop
+        assert writer_threads and threading.get_ident() not in writer_threads
+        assert client.zcard(INDEX_KEY) == 1
+        assert orchestrator._queue.qsize() == 1
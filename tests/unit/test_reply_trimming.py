@@ -0,0 +1,156 @@
+"""
+Tests for quoted-reply trimming of analysis content.
+"""
+import pytest
+
+from cellophanemail.features.email_protection.content_extraction import (
+    build_analysis_content,
+    prepare_analysis_content,
+)
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.in_memory_processor import InMemoryProcessor
+from cellophanemail.features.email_protection.mock_analyzer import MockAnalyzer
+from cellophanemail.features.email_protection.reply_trimming import segment_reply, trim_reply
+from cellophanemail.features.monitoring.metrics_collector import get_metrics_collector
+
+GMAIL_REPLY = """Thanks, Friday works for me.
+
+On Mon, Mar 3, 2025 at 9:14 AM Bob Smith <bob@example.com> wrote:
+> Can we move the meeting?
+> You never listen anyway.
+"""
+
+OUTLOOK_REPLY = """Approved.
+
+Jane
+
+________________________________
+From: Bob Smith <bob@example.com>
+Sent: Monday, March 3, 2025 9:14 AM
+To: Jane
+Subject: Budget
+
+Please approve the budget.
+"""
+
+
+class TestSegmentReply:
+    """New text is separated from the quoted thread and signature."""
+
+    def test_gmail_reply(self):
+        segments = segment_reply(GMAIL_REPLY)
+
+        assert segments.new_text == "Thanks, Friday works for me."
+        assert "You never listen anyway." in segments.quoted_text
+
+    def test_wrapped_attribution_line(self):
+        text = "Sure.\n\nOn Mon, Mar 3, 2025 at 9:14 AM Bob Smith\n<bob@example.com> wrote:\n> old\n"
+        assert segment_reply(text).new_text == "Sure."
+
+    def test_unprefixed_outlook_thread_is_kept(self):
+        assert segment_reply(OUTLOOK_REPLY).new_text == OUTLOOK_REPLY
+
+    @pytest.mark.parametrize("text", [
+        "Hi, see attached invoice.\n--\nYou worthless idiot, I know where you live and I will hurt you.",
+        "Hi, see attached invoice.\n\nOn Mon, Bob wrote:\nYou worthless idiot, I will hurt you.",
+        "Hi, see attached invoice.\n> old line\nYou worthless idiot, I will hurt you.",
+        "Just a note.\nSent from my iPhone",
+    ])
+    def test_unquoted_text_is_never_dropped(self, text):
+        segments = segment_reply(text)
+
+        assert segments.new_text == text
+        assert trim_reply(text) == text
+
+    def test_inline_quotes_are_kept(self):
+        text = "> Are you coming?\nYes.\n> Bringing food?\nNo, sorry."
+        assert segment_reply(text).new_text == text
+
+    def test_trailing_quote_block_without_attribution(self):
+        segments = segment_reply("Yes, Friday.\n\n> Can we move the meeting?\n>\n> Thanks")
+
+        assert segments.new_text == "Yes, Friday."
+        assert segments.quoted_text.startswith("> Can we move")
+
+    def test_forward_and_plain_mail_untouched(self):
+        forward = "FYI\n\n---------- Forwarded message ---------\nFrom: Bob\n> quoted"
+        assert trim_reply(forward) == forward
+        assert trim_reply("Hello there") == "Hello there"
+
+
+class TestTrimmedContent:
+    """Analysis content keeps only new text unless context is requested."""
+
+    def test_quote_only_message_is_analyzed_whole(self):
+        assert trim_reply("> You never listen anyway.") == "> You never listen anyway."
+
+    def test_bounded_context(self):
+        content = build_analysis_content("Re: Meeting", GMAIL_REPLY, trim_replies=True, reply_context_tokens=5)
+
+        assert content.startswith("Subject: Re: Meeting\n\nThanks, Friday works for me.\n\n[Quoted context]\n")
+        assert len(content.split("[Quoted context]\n")[1]) == 20
+
+    def test_html_quotes_dropped_with_trimming(self):
+        html = '<p>Fine.</p><div class="gmail_quote">On Mon Bob wrote:<blockquote>old</blockquote></div>'
+
+        assert build_analysis_content(None, None, html, trim_replies=True) == "Fine."
+        assert "old" in build_analysis_content(None, None, html, trim_replies=False)
+
+    def test_tokens_saved_are_recorded(self, monkeypatch):
+        monkeypatch.delenv("ANALYSIS_TRIM_REPLIES", raising=False)
+        monkeypatch.delenv("ANALYSIS_REPLY_CONTEXT_TOKENS", raising=False)
+        metrics = get_metrics_collector().performance_metrics
+        emails, trimmed = metrics.analysis_emails, metrics.analysis_tokens_trimmed
+
+        content = prepare_analysis_content("Re: Meeting", GMAIL_REPLY, is_reply=True)
+
+        assert content == "Subject: Re: Meeting\n\nThanks, Friday works for me."
+        assert metrics.analysis_emails == emails + 1
+        assert metrics.analysis_tokens_trimmed > trimmed
+
+    def test_only_threaded_replies_are_trimmed(self, monkeypatch):
+        monkeypatch.delenv("ANALYSIS_TRIM_REPLIES", raising=False)
+        assert "You never listen anyway." in prepare_analysis_content("Re: Meeting", GMAIL_REPLY)
+
+    def test_trimming_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv("ANALYSIS_TRIM_REPLIES", "false")
+        content = prepare_analysis_content("Re: Meeting", GMAIL_REPLY, is_reply=True)
+        assert "You never listen anyway." in content
+
+
+class TestDeliveryKeepsThread:
+    """Trimming shortens the prompt only; the recipient gets the whole reply."""
+
+    @pytest.mark.asyncio
+    async def test_quoted_thread_is_delivered(self):
+        analyzer = MockAnalyzer()
+        processor = InMemoryProcessor(analyzer=analyzer)
+        body = "Thanks, sounds good.\n\n-- \nJane Doe\n\nOn Mon, Bob wrote:\n> Please sign the contract.\n"
+        email = EphemeralEmail(
+            message_id="reply-1",
+            from_address="jane@example.com",
+            to_addresses=["shield@cellophanemail.com"],
+            subject="Re: contract",
+            text_body=body,
+            user_email="user@example.com",
+            ttl_seconds=300,
+            in_reply_to="<contract-1@example.com>",
+        )
+
+        result = await processor.process_email(email)
+
+        assert email.get_content_for_analysis() == "Subject: Re: contract\n\nThanks, sounds good.\n\n-- \nJane Doe"
+        assert result.processed_content == f"Subject: Re: contract\n\n{body}"
+
+    def test_signature_text_reaches_the_analyzer(self):
+        email = EphemeralEmail(
+            message_id="reply-2",
+            from_address="mallory@example.com",
+            to_addresses=["shield@cellophanemail.com"],
+            subject="Re: invoice",
+            text_body="Hi, see attached invoice.\n--\nYou worthless idiot, I know where you live and I will hurt you.",
+            user_email="user@example.com",
+            in_reply_to="<invoice-1@example.com>",
+        )
+
+        assert "I will hurt you" in email.get_content_for_analysis()
@@ -0,0 +1,103 @@
+"""
+Tests for the sharded MemoryManager and shared sync/async locking.
+"""
+import threading
+import time
+
+import pytest
+
+from cellophanemail.features.email_protection import memory_manager_singleton
+from cellophanemail.features.email_protection.background_cleanup import BackgroundCleanupService
+from cellophanemail.features.email_protection.ephemeral_email import EphemeralEmail
+from cellophanemail.features.email_protection.memory_manager import MemoryManager
+from cellophanemail.features.email_protection.sharded_memory_manager import ShardedMemoryManager
+
+
+def _email(message_id, text_body="Body"):
+    return EphemeralEmail(
+        message_id=message_id,
+        from_address="sender@example.com",
+        to_addresses=["recipient@example.com"],
+        subject="Subject",
+        text_body=text_body,
+        user_email="user@example.com",
+    )
+
+
+class TestShardedMemoryManager:
+    """Same API as MemoryManager, with state spread across shards."""
+
+    @pytest.mark.asyncio
+    async def test_sync_and_async_callers_see_the_same_store(self):
+        manager = ShardedMemoryManager(shards=4, capacity=100)
+
+        assert manager.store_email(_email("sync-1"))
+        assert await manager.store_email_async(_email("async-1"))
+
+        assert (await manager.get_email_async("sync-1")).message_id == "sync-1"
+        assert manager.get_email("async-1").message_id == "async-1"
+        assert await manager.remove_email("sync-1")
+        assert manager.get_email("sync-1") is None
+
+    @pytest.mark.asyncio
+    async def test_emails_spread_and_stats_aggregate(self):
+        manager = ShardedMemoryManager(shards=4, capacity=400, max_bytes=10_000_000)
+        for i in range(200):
+            manager.store_email(_email(f"m{i}"))
+
+        stats = manager.get_stats()
+        assert stats["current_emails"] == 200
+        assert stats["available_slots"] == 200
+        assert stats["shards"] == 4
+        assert stats["bytes_used"] == sum(s.get_stats()["bytes_used"] for s in manager._shards)
+        assert all(len(shard._emails) > 0 for shard in manager._shards)
+        assert len(await manager.get_all_emails()) == 200
+
+    @pytest.mark.asyncio
+    async def test_cleanup_limit_spans_shards(self):
+        manager = ShardedMemoryManager(shards=4, capacity=400)
+        for i in range(150):
+            email = _email(f"old-{i}")
+            email._created_at = time.time() - 600
+            manager.store_email(email)
+
+        assert await manager.cleanup_expired(limit=100) == 100
+        assert await BackgroundCleanupService(manager).cleanup_expired_emails() == 50
+        assert manager.get_stats()["current_emails"] == 0
+
+    def test_concurrent_threads_keep_counts_consistent(self):
+        manager = ShardedMemoryManager(shards=8, capacity=10_000)
+
+        def intake(worker):
+            for i in range(500):
+                manager.store_email(_email(f"w{worker}-{i}"))
+
+        threads = [threading.Thread(target=intake, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert manager.get_stats()["current_emails"] == 4000
+
+
+class TestSingletonSelection:
+    """MEMORY_SHARDS selects the sharded store for the shared instance."""
+
+    def test_memory_shards_env(self, monkeypatch):
+        monkeypatch.setenv("MEMORY_SHARDS", "4")
+        memory_manager_singleton.reset_memory_manager()
+        try:
+            manager = memory_manager_singleton.get_memory_manager()
+            assert isinstance(manager, ShardedMemoryManager)
+            assert manager.shard_count == 4
+        finally:
+            memory_manager_singleton.reset_memory_manager()
+
+    def test_single_store_by_default(self, monkeypatch):
+        monkeypatch.delenv("MEMORY_SHARDS", raising=False)
+        memory_manager_singleton.reset_memory_manager()
+        try:
+            assert isinstance(memory_manager_singleton.get_memory_manager(), MemoryManager)
+        finally:
+            memory_manager_singleton.reset_memory_manager()
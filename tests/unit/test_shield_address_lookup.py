@@ -0,0 +1,139 @@
+"""
+Tests for the shared, cached shield address lookup.
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from cellophanemail.features.shield_addresses import ShieldAddressManager
+from cellophanemail.features.shield_addresses import lookup as lookup_module
+from cellophanemail.features.shield_addresses.lookup import ShieldAddressLookup
+from cellophanemail.features.shield_addresses.models import ShieldAddressInfo
+
+
+def _info(address="abc@cellophanemail.com", user_id="user-42"):
+    return ShieldAddressInfo(shield_address=address, user_id=user_id, user_email="real@example.com")
+
+
+class CountingLookup(ShieldAddressLookup):
+    """Lookup whose database query is an in-memory table."""
+
+    def __init__(self, table=None, **kwargs):
+        super().__init__(**kwargs)
+        self.table = table or {}
+        self.calls = 0
+        self.fail = False
+
+    async def _query(self, address):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("database down")
+        return self.table.get(address)
+
+
+@pytest.fixture
+def shared_lookup():
+    lookup = CountingLookup({"abc@cellophanemail.com": _info()})
+    with patch.object(lookup_module, "_shield_lookup", lookup):
+        yield lookup
+
+
+class TestShieldAddressLookup:
+    """Hits and misses are cached; invalidation and errors are not."""
+
+    @pytest.mark.asyncio
+    async def test_hits_and_negatives_are_cached(self):
+        lookup = CountingLookup({"abc@cellophanemail.com": _info()})
+
+        assert (await lookup.lookup(" ABC@cellophanemail.com ")).user_id == "user-42"
+        assert (await lookup.lookup("abc@cellophanemail.com")).user_id == "user-42"
+        assert await lookup.lookup("nobody@cellophanemail.com") is None
+        assert await lookup.lookup("nobody@cellophanemail.com") is None
+
+        assert lookup.calls == 2
+        assert lookup.get_stats()["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_query(self):
+        lookup = CountingLookup({"abc@cellophanemail.com": _info()})
+
+        results = await asyncio.gather(*[lookup.lookup("abc@cellophanemail.com") for _ in range(10)])
+
+        assert all(r.user_id == "user-42" for r in results)
+        assert lookup.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_negative_entries_expire_sooner(self):
+        lookup = CountingLookup(ttl_seconds=300, negative_ttl_seconds=0.01)
+        assert await lookup.lookup("new@cellophanemail.com") is None
+
+        lookup.table["new@cellophanemail.com"] = _info("new@cellophanemail.com")
+        await asyncio.sleep(0.02)
+
+        assert (await lookup.lookup("new@cellophanemail.com")) is not None
+
+    @pytest.mark.asyncio
+    async def test_invalidation(self):
+        lookup = CountingLookup({"abc@cellophanemail.com": _info()})
+        await lookup.lookup("abc@cellophanemail.com")
+
+        del lookup.table["abc@cellophanemail.com"]
+        assert lookup.invalidate_user("user-42") == 1
+        assert await lookup.lookup("abc@cellophanemail.com") is None
+
+        lookup.table["abc@cellophanemail.com"] = _info()
+        assert lookup.invalidate("ABC@cellophanemail.com")
+        assert await lookup.lookup("abc@cellophanemail.com") is not None
+
+    @pytest.mark.asyncio
+    async def test_database_errors_are_not_cached(self):
+        lookup = CountingLookup({"abc@cellophanemail.com": _info()})
+        lookup.fail = True
+
+        assert await lookup.lookup("abc@cellophanemail.com") is None
+        assert await lookup.lookup("abc@cellophanemail.com") is None
+        assert lookup.calls == 1  # backs off instead of retrying every email
+
+        lookup.fail = False
+        lookup.clear()
+        assert await lookup.lookup("abc@cellophanemail.com") is not None
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self):
+        lookup = CountingLookup(max_entries=2)
+        for i in range(5):
+            await lookup.lookup(f"a{i}@cellophanemail.com")
+
+        assert lookup.get_stats()["entries"] == 2
+        assert lookup.evictions == 3
+
+
+class TestManagerUsesSharedLookup:
+    """Per-request managers resolve database addresses through the shared cache."""
+
+    @pytest.mark.asyncio
+    async def test_managers_share_cache(self, shared_lookup):
+        for _ in range(3):
+            info = await ShieldAddressManager().lookup_user_by_shield_address("abc@cellophanemail.com")
+            assert info.user_id == "user-42"
+
+        assert shared_lookup.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_demo_addresses_skip_database(self, shared_lookup):
+        info = await ShieldAddressManager().lookup_user_by_shield_address("shield123@cellophanemail.com")
+
+        assert info.user_id == "user-003"
+        assert shared_lookup.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_deactivate_invalidates(self, shared_lookup):
+        manager = ShieldAddressManager()
+        await manager.lookup_user_by_shield_address("abc@cellophanemail.com")
+
+        del shared_lookup.table["abc@cellophanemail.com"]
+        await manager.deactivate_shield_address("abc@cellophanemail.com")
+
+        assert await manager.lookup_user_by_shield_address("abc@cellophanemail.com") is None
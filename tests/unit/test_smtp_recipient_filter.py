@@ -0,0 +1,154 @@
+"""
+Tests for the RCPT-time Bloom filter of active shield addresses.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from cellophanemail.features.shield_addresses.recipient_filter import (
+    BloomFilter,
+    ShieldRecipientFilter,
+)
+from cellophanemail.providers.smtp.server import SMTPHandler
+
+
+def _loader(addresses):
+    async def load():
+        return list(addresses)
+    return load
+
+
+class TestBloomFilter:
+    """No false negatives; false positives near the configured rate."""
+
+    def test_members_are_always_found(self):
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        members = [f"{i:032x}@cellophanemail.com" for i in range(5000)]
+        for member in members:
+            bloom.add(member)
+
+        assert all(member in bloom for member in members)
+        false_positives = sum(f"x{i}@cellophanemail.com" in bloom for i in range(10_000))
+        assert false_positives < 300
+
+
+class TestShieldRecipientFilter:
+    """Rejects definitely-unknown shield addresses, fails open otherwise."""
+
+    @pytest.mark.asyncio
+    async def test_fails_open_until_built(self):
+        recipient_filter = ShieldRecipientFilter(loader=_loader([]))
+
+        assert recipient_filter.might_exist("nobody@cellophanemail.com")
+
+        await recipient_filter.rebuild()
+        assert not recipient_filter.might_exist("nobody@cellophanemail.com")
+        assert recipient_filter.might_exist("someone@example.com")  # other domains untouched
+
+    @pytest.mark.asyncio
+    async def test_rebuild_and_immediate_adds(self):
+        recipient_filter = ShieldRecipientFilter(loader=_loader(["Known@CellophaneMail.com"]))
+        recipient_filter.pin(["demo@cellophanemail.com"])
+        await recipient_filter.rebuild()
+
+        assert recipient_filter.might_exist(" known@cellophanemail.com")
+        assert recipient_filter.might_exist("demo@cellophanemail.com")
+
+        recipient_filter.add("new@cellophanemail.com")
+        assert recipient_filter.might_exist("new@cellophanemail.com")
+        assert recipient_filter.get_stats()["rejections"] == 0
+
+    @pytest.mark.asyncio
+    async def test_address_created_during_rebuild_survives_swap(self):
+        recipient_filter = ShieldRecipientFilter(loader=_loader([]))
+        await recipient_filter.rebuild()
+
+        async def slow_load():
+            recipient_filter.add("racing@cellophanemail.com")
+            return []
+        recipient_filter._loader = slow_load
+        await recipient_filter.rebuild()
+
+        assert recipient_filter.might_exist("racing@cellophanemail.com")
+
+    @pytest.mark.asyncio
+    async def test_failed_rebuild_keeps_previous_filter(self):
+        recipient_filter = ShieldRecipientFilter(loader=_loader(["known@cellophanemail.com"]))
+        await recipient_filter.rebuild()
+
+        async def broken():
+            raise ConnectionError("database down")
+        recipient_filter._loader = broken
+
+        assert not await recipient_filter.rebuild()
+        assert recipient_filter.might_exist("known@cellophanemail.com")
+        assert recipient_filter.get_stats()["build_failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_periodic_refresh(self):
+        recipient_filter = ShieldRecipientFilter(loader=_loader(["a@cellophanemail.com"]), refresh_seconds=0.01)
+        recipient_filter.start()
+        await asyncio.sleep(0.05)
+        await recipient_filter.stop()
+
+        assert recipient_filter.ready
+
+
+class FakeLookup:
+    """Cached shield lookup stand-in: a fixed set of database addresses."""
+
+    def __init__(self, addresses=(), available=True):
+        self.addresses = set(addresses)
+        self.available = available
+        self.calls = []
+
+    async def lookup(self, address):
+        self.calls.append(address)
+        return SimpleNamespace(shield_address=address) if address in self.addresses else None
+
+
+class TestRcptRejection:
+    """handle_RCPT refuses unknown shield addresses before DATA."""
+
+    async def _handler(self, lookup):
+        handler = SMTPHandler(MagicMock())
+        handler.recipient_filter = ShieldRecipientFilter(
+            loader=_loader(["known@cellophanemail.com"]), lookup=lookup
+        )
+        await handler.recipient_filter.rebuild()
+        return handler
+
+    @pytest.mark.asyncio
+    async def test_unknown_shield_rejected_known_accepted(self):
+        lookup = FakeLookup()
+        handler = await self._handler(lookup)
+        envelope = SimpleNamespace(rcpt_tos=[])
+
+        rejected = await handler.handle_RCPT(None, None, envelope, "nobody@cellophanemail.com", [])
+        accepted = await handler.handle_RCPT(None, None, envelope, "known@cellophanemail.com", [])
+
+        assert rejected.startswith("550")
+        assert accepted == "250 OK"
+        assert envelope.rcpt_tos == ["known@cellophanemail.com"]
+        assert lookup.calls == ["nobody@cellophanemail.com"]  # Bloom hits skip the database
+
+    @pytest.mark.asyncio
+    async def test_shield_created_elsewhere_is_accepted_before_rebuild(self):
+        lookup = FakeLookup(["fresh@cellophanemail.com"])
+        handler = await self._handler(lookup)
+        envelope = SimpleNamespace(rcpt_tos=[])
+
+        assert await handler.handle_RCPT(None, None, envelope, "fresh@cellophanemail.com", []) == "250 OK"
+        assert await handler.handle_RCPT(None, None, envelope, "fresh@cellophanemail.com", []) == "250 OK"
+        assert lookup.calls == ["fresh@cellophanemail.com"]  # added to the filter after the first check
+        assert handler.recipient_filter.get_stats()["confirmed_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_miss_is_temporary(self):
+        handler = await self._handler(FakeLookup(available=False))
+
+        reply = await handler.handle_RCPT(None, None, SimpleNamespace(rcpt_tos=[]), "new@cellophanemail.com", [])
+
+        assert reply.startswith("450 4.1.1")
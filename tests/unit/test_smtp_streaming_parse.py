@@ -0,0 +1,86 @@
+"""
+Tests for streaming, size-capped MIME parsing on the SMTP intake path.
+"""
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from types import SimpleNamespace
+
+from cellophanemail.providers.smtp.mime_stream import parse_message_streaming
+from cellophanemail.providers.smtp.provider import SMTPProvider
+
+
+def _multipart(text="Hello there", html="<p>Hello there</p>", attachment=b"%PDF" + b"x" * 50_000):
+    msg = MIMEMultipart("mixed")
+    msg["From"] = "sender@example.com"
+    msg["To"] = "shield123@cellophanemail.com"
+    msg["Subject"] = "Quarterly report"
+    msg["Message-ID"] = "<abc@example.com>"
+    body = MIMEMultipart("alternative")
+    body.attach(MIMEText(text, "plain", "utf-8"))
+    body.attach(MIMEText(html, "html", "utf-8"))
+    msg.attach(body)
+    pdf = MIMEApplication(attachment, "pdf")
+    pdf.add_header("Content-Disposition", "attachment", filename="report.pdf")
+    msg.attach(pdf)
+    return msg.as_bytes()
+
+
+class TestParseMessageStreaming:
+    """Bodies are kept, attachment payloads are dropped but described."""
+
+    def test_keeps_bodies_and_attachment_metadata(self):
+        raw = _multipart()
+        result = parse_message_streaming(raw, chunk_size=1024)
+
+        assert result.text_body == "Hello there"
+        assert result.html_body == "<p>Hello there</p>"
+        assert result.attachments == [{'name': 'report.pdf', 'content_type': 'application/pdf', 'size': 50_004}]
+        assert result.message["Subject"] == "Quarterly report"
+        assert result.parsed_bytes == len(raw)
+        assert result.skipped_bytes > 50_000
+        assert not result.truncated
+
+        # No payload survives in the tree
+        assert all(part.get_payload() == "" for part in result.message.walk() if not part.is_multipart())
+
+    def test_body_budget_truncates(self):
+        result = parse_message_streaming(_multipart(text="é" * 5000, html="<p>" + "b" * 5000), max_body_bytes=1000)
+
+        assert len(result.text_body.encode("utf-8")) <= 1000
+        assert result.text_body.startswith("éé")
+        assert result.html_body == ""
+        assert result.truncated
+
+    def test_single_part_quoted_printable(self):
+        raw = (
+            b"From: a@example.com\r\nTo: b@cellophanemail.com\r\nSubject: hi\r\n"
+            b"Content-Type: text/plain; charset=utf-8\r\n"
+            b"Content-Transfer-Encoding: quoted-printable\r\n\r\n"
+            b"Caf=C3=A9 at noon?\r\n"
+        )
+        result = parse_message_streaming(raw)
+
+        assert result.text_body.strip() == "Café at noon?"
+        assert result.html_body is None
+
+
+class TestSMTPProviderParseModes:
+    """Streaming and full parsing produce the same EmailMessage."""
+
+    def test_modes_agree(self):
+        raw = _multipart()
+        envelope = SimpleNamespace(rcpt_tos=["shield123@cellophanemail.com"], mail_from="sender@example.com")
+
+        streaming = SMTPProvider()
+        full = SMTPProvider()
+        full.streaming_parse = False
+
+        a = streaming._parse_smtp_envelope(envelope, raw)
+        b = full._parse_smtp_envelope(envelope, raw)
+
+        assert (a.text_body, a.html_body, a.subject, a.message_id) == (b.text_body, b.html_body, b.subject, b.message_id)
+        assert a.attachments == b.attachments
+        assert a.shield_address == "shield123@cellophanemail.com"
+        assert streaming.parse_stats["skipped_bytes"] > 50_000
+        assert full.parse_stats["skipped_bytes"] == 0
@@ -0,0 +1,125 @@
+"""
+Tests for streaming early-exit parsing of analysis responses.
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cellophanemail.features.email_protection.email_toxicity_analyzer import EmailToxicityAnalyzer
+from cellophanemail.features.email_protection.models import ThreatLevel
+from cellophanemail.features.email_protection.streaming_json import StreamingAnalysisParser
+from cellophanemail.features.monitoring import MetricsCollector
+
+GET_COLLECTOR = 'cellophanemail.features.monitoring.metrics_collector.get_metrics_collector'
+
+TOXIC_CHUNKS = [
+    '```json\n{"safe": fal', 'se, "horsemen_detected": [{"horseman": "contempt", ',
+    '"confidence": 0.9, "severity": "high", "indicators": ["you\'re pathetic, {really}"]}]',
+    ', "reasoning": "Mockery and ', 'disgust throughout", "confidence": 0.9}\n```',
+]
+
+
+class FakeStream:
+    """Stand-in for the SDK's message stream, recording how many deltas were read."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.consumed = 0
+
+    def _events(self):
+        yield SimpleNamespace(type="message_start", message=SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=40, cache_read_input_tokens=0, cache_creation_input_tokens=0)
+        ))
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=chunk))
+
+    def __enter__(self):
+        return self._events()
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        events = self._events()
+
+        async def aiter():
+            for event in events:
+                yield event
+        return aiter()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _streaming_analyzer(stream, monkeypatch):
+    monkeypatch.setenv("ANALYSIS_STREAMING_ENABLED", "true")
+    analyzer = EmailToxicityAnalyzer()
+    analyzer.provider = "anthropic"
+    analyzer.model_name = "test-model"
+    analyzer.client = MagicMock()
+    analyzer.client.messages.stream.return_value = stream
+    analyzer.async_client = MagicMock()
+    analyzer.async_client.messages.stream.return_value = stream
+    return analyzer
+
+
+class TestStreamingAnalysisParser:
+    """Top-level fields become available as soon as their values close."""
+
+    def test_fields_complete_before_reasoning(self):
+        parser = StreamingAnalysisParser()
+
+        assert [parser.feed(chunk) for chunk in TOXIC_CHUNKS[:3]] == [False, False, False]
+        assert parser.feed(TOXIC_CHUNKS[3])
+        assert parser.fields["safe"] is False
+        assert parser.fields["horsemen_detected"][0]["indicators"] == ["you're pathetic, {really}"]
+        assert "reasoning" not in parser.fields
+        assert not parser.closed
+
+    def test_complete_object_parses_every_field(self):
+        parser = StreamingAnalysisParser()
+        parser.feed('{"horsemen_detected": [], "safe": true, "reasoning": "a \\"quoted\\", ok"}')
+
+        assert parser.closed and parser.ready
+        assert parser.fields["reasoning"] == 'a "quoted", ok'
+
+
+class TestStreamingAnalyzer:
+    """The analyzer stops reading the stream once the decision fields are in."""
+
+    def test_sync_analysis_exits_early(self, monkeypatch):
+        stream = FakeStream(TOXIC_CHUNKS)
+        analyzer = _streaming_analyzer(stream, monkeypatch)
+        collector = MetricsCollector()
+
+        with patch(GET_COLLECTOR, return_value=collector):
+            analysis = analyzer.analyze_email_toxicity("You're pathetic", "a@b.com")
+
+        assert stream.consumed == 4
+        assert analysis.threat_level == ThreatLevel.HIGH
+        assert analysis.horsemen_detected[0].horseman == "contempt"
+        assert analysis.reasoning == ""
+        assert collector.get_performance_metrics().prompt_tokens_uncached == 40
+
+    @pytest.mark.asyncio
+    async def test_async_analysis_exits_early(self, monkeypatch):
+        stream = FakeStream(TOXIC_CHUNKS)
+        analyzer = _streaming_analyzer(stream, monkeypatch)
+
+        with patch(GET_COLLECTOR, return_value=MetricsCollector()):
+            analysis = await analyzer.analyze_email_toxicity_async("You're pathetic", "a@b.com")
+
+        assert stream.consumed == 4
+        assert not analysis.safe
+
+    def test_malformed_stream_falls_back_to_repair(self, monkeypatch):
+        stream = FakeStream(['{"safe": true "horsemen_detected": [] "reasoning": "fine"}'])
+        analyzer = _streaming_analyzer(stream, monkeypatch)
+
+        with patch(GET_COLLECTOR, return_value=MetricsCollector()):
+            analysis = analyzer.analyze_email_toxicity("See you at 5", "a@b.com")
+
+        assert analysis.safe
+        assert analysis.reasoning == "fine"